@@ -16,7 +16,7 @@ implements: ERC20
 
 interface FundsAllocator:
     def getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS], _min_outgoing_tx: uint256, _withdraw_only: bool) -> (uint256, int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]): pure
-    def getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only: bool) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]): pure
+    def getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only: bool, _drift_band_bps: uint256) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]): pure
 
 # Number of potential lenging platform adapters.
 MAX_ADAPTERS : constant(uint256) = 5
@@ -52,9 +52,24 @@ vault_asset_balance_cache: transient(uint256)
 adapters_asset_balance_cache: transient(HashMap[address, uint256])
 total_asset_balance_cache: transient(uint256)
 
+# Adapter cache entries are packed as ((epoch + 1) << 192) | assets so a single load
+# tells us whether the entry is current. Bumping the epoch invalidates every adapter
+# at once and a zero asset balance remains distinguishable from "not cached".
+adapters_cache_epoch: transient(uint256)
+ADAPTER_CACHE_MASK: constant(uint256) = 2**192 - 1
+
+# Idle buffer policy. Deposits that leave no more than max_idle_assets sitting in the vault
+# skip adapter balancing. A deposit that overflows the buffer moves its own assets above the
+# target cash into the adapters, the owner or keeper can flush() the rest. The target cash is
+# idle_ratio_bps of totalAssets, at most max_idle_assets, or max_idle_assets if the ratio is zero.
+max_idle_assets: public(uint256)
+idle_ratio_bps: public(uint256)
+keeper: public(address)
+
 # Strategy Management
 current_proposer: public(address)
 min_proposer_payout: public(uint256)
+drift_band_bps: public(uint256)
 
 struct AdapterValue:
     ratio: uint256
@@ -155,6 +170,14 @@ event OwnerChanged:
     new_owner: indexed(address)
     old_owner: indexed(address)    
 
+event IdleBufferChanged:
+    max_idle_assets: uint256
+    idle_ratio_bps: uint256
+
+event KeeperChanged:
+    new_keeper: indexed(address)
+    old_keeper: indexed(address)
+
 
 @external
 def __init__(_name: String[64], _symbol: String[32], _decimals: uint8, _erc20asset : address, _governance: address, _funds_allocator: address, _max_slippage_percent: decimal):
@@ -241,6 +264,41 @@ def replaceFundsAllocator(_new_funds_allocator: address) -> bool:
     return True
 
 
+@external
+def set_idle_buffer(_max_idle_assets: uint256, _idle_ratio_bps: uint256 = 0) -> bool:
+    """
+    @notice set how many assets deposits may leave idle in the vault awaiting a flush.
+    @param _max_idle_assets deposits leaving no more than this in the vault skip adapter balancing, zero disables buffering
+    @param _idle_ratio_bps target cash ratio, in basis points of totalAssets, left idle when cash is moved into the adapters, zero keeps max_idle_assets
+    @return True
+    """
+    assert msg.sender == self.owner, "Only owner can set idle buffer."
+    assert _idle_ratio_bps <= 10000, "Idle ratio above 100%."
+
+    log IdleBufferChanged(_max_idle_assets, _idle_ratio_bps)
+
+    self.max_idle_assets = _max_idle_assets
+    self.idle_ratio_bps = _idle_ratio_bps
+
+    return True
+
+
+@external
+def replaceKeeper(_new_keeper: address) -> bool:
+    """
+    @notice replace the keeper allowed to flush the idle buffer.
+    @param _new_keeper address of the new keeper, may be empty to leave flushing to the owner.
+    @return True, if keeper was replaced
+    """
+    assert msg.sender == self.owner, "Only owner can replace the keeper."
+
+    log KeeperChanged(_new_keeper, self.keeper)
+
+    self.keeper = _new_keeper
+
+    return True
+
+
 # Can't simply have a public adapters variable due to this Vyper issue:
 # https://github.com/vyperlang/vyper/issues/2897
 @view
@@ -254,7 +312,7 @@ def adapter_list() -> DynArray[address, MAX_ADAPTERS]:
 
 
 @internal
-def _set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS], _min_proposer_payout : uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]) -> bool:
+def _set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS], _min_proposer_payout : uint256, _drift_band_bps : uint256, pregen_info: Bytes[4096]) -> bool:
     assert msg.sender == self.governance, "Only Governance DAO may set a new strategy."
     assert _proposer != empty(address), "Proposer can't be null address."
 
@@ -276,6 +334,8 @@ def _set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS
         self.current_proposer = _proposer
         self.min_proposer_payout = _min_proposer_payout
 
+    self.drift_band_bps = _drift_band_bps
+
     # Clear out all existing ratio allocations.
     for adapter in self.adapters:
         self.strategy[adapter].ratio = 0
@@ -293,16 +353,17 @@ def _set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS
 
 
 @external
-def set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS], _min_proposer_payout : uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> bool:
+def set_strategy(_proposer: address, _strategies : AdapterStrategy[MAX_ADAPTERS], _min_proposer_payout : uint256, _drift_band_bps : uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> bool:
     """
     @notice establishes new strategy of adapter ratios and minumum value of automatic txs into adapters
     @param _proposer address of wallet who proposed strategy and will be entitled to fees during its activation
     @param _strategies list of ratios for each adapter for funds allocation
     @param _min_proposer_payout for automated txs into adapters or automatic payout of fees to proposer upon activation of new strategy
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param _drift_band_bps adapters within this many basis points of their target are not rebalanced
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return True if strategy was activated, False overwise
     """
-    applied: bool = self._set_strategy(_proposer, _strategies, _min_proposer_payout, pregen_info)
+    applied: bool = self._set_strategy(_proposer, _strategies, _min_proposer_payout, _drift_band_bps, pregen_info)
     self._dirtyAssetCache()
     return applied
 
@@ -377,7 +438,7 @@ def _slippageAllowedBalance(_assetsToMove: uint256, _minAssetsToMove: uint256) -
 
 
 @internal
-def _remove_adapter(_adapter: address, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS], _rebalance: bool = True, _force: bool = False, _min_assets: uint256 = 0) -> bool:
+def _remove_adapter(_adapter: address, pregen_info: Bytes[4096], _rebalance: bool = True, _force: bool = False, _min_assets: uint256 = 0) -> bool:
     # Is this from the owner?    
     assert msg.sender == self.owner, "Only owner can remove Lending Adapters."
 
@@ -426,14 +487,14 @@ def _remove_adapter(_adapter: address, pregen_info: DynArray[Bytes[4096], MAX_AD
 
 
 @external
-def remove_adapter(_adapter: address, _rebalance: bool = True, _force: bool = False, _min_assets: uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> bool:
+def remove_adapter(_adapter: address, _rebalance: bool = True, _force: bool = False, _min_assets: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> bool:
     """
     @notice removes Adapter adapter from the 4626 vault.
     @param _adapter address to be removed 
     @param _rebalance if True will empty adapter before removal.
     @param _force causes adapter to be removed despite any slippage.
     @param _min_assets the minimum amount of assets that should be recovered from the adapter.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return True if adapter was removed, False otherwise
     """
     return self._remove_adapter(_adapter, pregen_info, _rebalance, _force, _min_assets)
@@ -499,9 +560,8 @@ def _dirtyAssetCache(_clearVaultBalance : bool = True, _clearAdapters : bool = T
         self.vault_asset_balance_cache = 0 
     if _clearAdapters:        
         if _adapter == empty(address):
-            # Clear them all
-            for adapter in self.adapters:
-                self.adapters_asset_balance_cache[adapter] = 0
+            # Clear them all by moving on to a new epoch.
+            self.adapters_cache_epoch += 1
         else:
             self.adapters_asset_balance_cache[_adapter] = 0
 
@@ -519,16 +579,26 @@ def _adapterAssets(_adapter: address) -> uint256:
     if _adapter == empty(address):
         return 0
 
-    result : uint256 = self.adapters_asset_balance_cache[_adapter]
-    if result != 0:
-        return result
+    cached : uint256 = self.adapters_asset_balance_cache[_adapter]
+    if cached >> 192 == self.adapters_cache_epoch + 1:
+        return cached & ADAPTER_CACHE_MASK
 
-    result = IAdapter(_adapter).totalAssets()
-    self.adapters_asset_balance_cache[_adapter] = result
+    result : uint256 = 0
+    max_withdraw: uint256 = 0
+    max_deposit: uint256 = 0
+    result, max_withdraw, max_deposit = self._getAdapterState(_adapter, True)
+    self._cacheAdapterAssets(_adapter, result)
     self.total_asset_balance_cache = 0
     return result
 
 
+@internal
+def _cacheAdapterAssets(_adapter: address, _assets: uint256):
+    # Balances too large to pack are simply never cached.
+    if _assets <= ADAPTER_CACHE_MASK:
+        self.adapters_asset_balance_cache[_adapter] = ((self.adapters_cache_epoch + 1) << 192) | _assets
+
+
 @internal
 def _totalAssetsCached() -> uint256:
     if self.total_asset_balance_cache > 0:
@@ -701,7 +771,7 @@ def _claimable_fees_by_me(_yield : FeeType, _asset_amount: uint256, _current_ass
 
 
 @internal
-def _claim_fees(_yield : FeeType, _asset_amount: uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS], _current_assets : uint256 = 0, _min_assets: uint256 = 0) -> uint256:
+def _claim_fees(_yield : FeeType, _asset_amount: uint256, pregen_info: Bytes[4096], _current_assets : uint256 = 0, _min_assets: uint256 = 0) -> uint256:
     yield_fees : uint256 = 0
     strat_fees : uint256 = 0
 
@@ -754,11 +824,11 @@ def _claim_fees(_yield : FeeType, _asset_amount: uint256, pregen_info: DynArray[
 
 
 @external
-def claim_yield_fees(_asset_request: uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def claim_yield_fees(_asset_request: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice used by 4626 vault owner to withdraw fees.
     @param _asset_request total assets desired for withdrawl. 
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return total assets transferred.    
     @dev If _asset_request is 0 then will withdrawl all eligible assets.
     """
@@ -766,11 +836,11 @@ def claim_yield_fees(_asset_request: uint256 = 0, pregen_info: DynArray[Bytes[40
 
 
 @external
-def claim_strategy_fees(_asset_request: uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def claim_strategy_fees(_asset_request: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice user by current Strategy proposer to withdraw fees.
     @param _asset_request total assets desired for withdrawl. 
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return total assets transferred.    
     @dev If _asset_request is 0 then will withdrawl all eligible assets.
     """
@@ -778,11 +848,11 @@ def claim_strategy_fees(_asset_request: uint256 = 0, pregen_info: DynArray[Bytes
 
 
 @external
-def claim_all_fees(_asset_request: uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def claim_all_fees(_asset_request: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice if 4626 vault owner and Strategy proposer are same wallet address, used to withdraw all fees at once.
     @param _asset_request total assets desired for withdrawl. 
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return total assets transferred.    
     @dev If _asset_request is 0 then will withdrawl all eligible assets.
     """
@@ -899,12 +969,12 @@ def previewMint(_share_amount: uint256) -> uint256:
 
 
 @external
-def mint(_share_amount: uint256, _receiver: address, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS] = empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def mint(_share_amount: uint256, _receiver: address, pregen_info: Bytes[4096] = empty(Bytes[4096])) -> uint256:
     """
     @notice This function mints asset qty that would be returned for this share_amount to receiver
     @param _share_amount Number amount of shares to evaluate
     @param _receiver Address of receiver to evaluate
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Asset value of _share_amount
     """
     assetqty : uint256 = self._convertToAssets(_share_amount, self._totalAssetsCached())
@@ -961,13 +1031,13 @@ def previewRedeem(_share_amount: uint256) -> uint256:
 
 
 @external
-def redeem(_share_amount: uint256, _receiver: address, _owner: address, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def redeem(_share_amount: uint256, _receiver: address, _owner: address, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice This function redeems asset qty that would be returned for this share_amount to receiver from owner
     @param _share_amount Number amount of shares to evaluate
     @param _receiver Address of receiver to evaluate
     @param _owner Address of owner of assets to evaluate
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Asset qty withdrawn
     """
     assetqty: uint256 = self._convertToAssets(_share_amount, self._totalAssetsCached())
@@ -997,15 +1067,35 @@ struct BalanceAdapter:
 
 
 @internal
-@view
-def _getAdapterMaxWithdraw(_adapter: address) -> int256:
+def _getAdapterState(_adapter: address, _assets_only: bool = False) -> (uint256, uint256, uint256):
     """
-    @dev Given an adapter's address return the maximum withdraw 
-    amount allowed for that adapter. 
+    @dev Given an adapter's address return its total assets, maximum withdraw
+    and maximum deposit. Uses the single IAdapter.state() call when the adapter
+    supports it, otherwise falls back to the individual calls. If _assets_only
+    is set the fallback skips the max withdraw/deposit calls and returns zeros.
+    state() is DELEGATECALL-ed, like deposit and withdraw, so it runs with our
+    storage. A legacy adapter has no state() so the DELEGATECALL fails.
+    """
+    result_ok: bool = False
+    response: Bytes[96] = empty(Bytes[96])
+    result_ok, response = raw_call(_adapter, method_id("state()"), max_outsize=96, is_delegate_call=True, revert_on_failure=False)
+    if result_ok and len(response) == 96:
+        return _abi_decode(response, (uint256, uint256, uint256))
+
+    if _assets_only:
+        return IAdapter(_adapter).totalAssets(), 0, 0
+    return IAdapter(_adapter).totalAssets(), IAdapter(_adapter).maxWithdraw(), IAdapter(_adapter).maxDeposit()
+
+
+@internal
+@pure
+def _getAdapterMaxWithdraw(_umax: uint256) -> int256:
+    """
+    @dev Given an adapter's maximum withdraw amount return it
+    as a negative number.
     """
     # If the value is higher than what can be represented by an int256 
     # make it the maximum value possible with an int256.
-    _umax : uint256 = IAdapter(_adapter).maxWithdraw()
     if _umax > convert(max_value(int256), uint256):
         _umax = convert(max_value(int256), uint256)
 
@@ -1013,15 +1103,14 @@ def _getAdapterMaxWithdraw(_adapter: address) -> int256:
 
 
 @internal
-@view
-def _getAdapterMaxDeposit(_adapter: address) -> int256:
+@pure
+def _getAdapterMaxDeposit(_umax: uint256) -> int256:
     """
-    @dev Given an adapter's address return the maximum deposit 
-    amount allowed for that adapter. This will be a negative number.
+    @dev Given an adapter's maximum deposit amount return it
+    as an int256.
     """
     # If the value is higher than what can be represented by an int256 
     # make it the maximum value possible with an int256.
-    _umax : uint256 = IAdapter(_adapter).maxDeposit()
     if _umax > convert(max_value(int256), uint256):
         return max_value(int256)
 
@@ -1043,12 +1132,20 @@ def _getCurrentBalances() -> (uint256, BalanceAdapter[MAX_ADAPTERS], uint256, ui
     pos: uint256 = 0
 
     for adapter in self.adapters:
+        adapter_assets: uint256 = 0
+        max_withdraw: uint256 = 0
+        max_deposit: uint256 = 0
+        adapter_assets, max_withdraw, max_deposit = self._getAdapterState(adapter)
+
+        # We already have a fresh value so refill the cache with it.
+        self._cacheAdapterAssets(adapter, adapter_assets)
+
         adapter_balances[pos].adapter = adapter
-        adapter_balances[pos].current = self._adapterAssets(adapter)
-        total_balance += adapter_balances[pos].current
+        adapter_balances[pos].current = adapter_assets
+        total_balance += adapter_assets
 
-        adapter_balances[pos].max_withdraw = self._getAdapterMaxWithdraw(adapter)
-        adapter_balances[pos].max_deposit = self._getAdapterMaxDeposit(adapter)
+        adapter_balances[pos].max_withdraw = self._getAdapterMaxWithdraw(max_withdraw)
+        adapter_balances[pos].max_deposit = self._getAdapterMaxDeposit(max_deposit)
 
         plan : AdapterValue = self.strategy[adapter]
 
@@ -1081,19 +1178,25 @@ def getCurrentBalances() -> (uint256, BalanceAdapter[MAX_ADAPTERS], uint256, uin
 @view
 def _getBalanceTxs(_target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only : bool) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]): 
     current_local_asset_balance : uint256 = ERC20(asset).balanceOf(self)
-    return FundsAllocator(self.funds_allocator).getBalanceTxs(current_local_asset_balance, _target_asset_balance, _min_proposer_payout, _total_assets, _total_ratios, _adapter_states, _withdraw_only)
+    return FundsAllocator(self.funds_allocator).getBalanceTxs(current_local_asset_balance, _target_asset_balance, _min_proposer_payout, _total_assets, _total_ratios, _adapter_states, _withdraw_only, self.drift_band_bps)
 
 
 @internal
-def _balanceAdapters(_target_asset_balance: uint256, _min_target_asset_balance: uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS], _withdraw_only : bool ) -> uint256:
+def _balanceAdapters(_target_asset_balance: uint256, _min_target_asset_balance: uint256, pregen_info: Bytes[4096], _withdraw_only : bool, _deposit_only : bool = False) -> uint256:
     # If _target_asset_balance is zero then we're looking at a deposit and _min_target_asset_balance
     # becomes the maximum slippage value (via _slippageAllowedBalance).
+    # If _deposit_only is set nothing is withdrawn from the adapters, only the vault's assets above
+    # _target_asset_balance are deposited and _min_target_asset_balance is the maximum slippage value.
 
     # Make sure we have enough assets to send to _receiver.
     txs: BalanceTX[MAX_ADAPTERS] = empty(BalanceTX[MAX_ADAPTERS])
     blocked_adapters: address[MAX_ADAPTERS] = empty(address[MAX_ADAPTERS])
 
-    min_total_asset_balance : uint256 = self._slippageAllowedBalance(_target_asset_balance, _min_target_asset_balance)
+    min_total_asset_balance : uint256 = 0
+    if _deposit_only:
+        min_total_asset_balance = self._slippageAllowedBalance(0, _min_target_asset_balance)
+    else:
+        min_total_asset_balance = self._slippageAllowedBalance(_target_asset_balance, _min_target_asset_balance)
 
     # If there are no adapters then nothing to do.
     if len(self.adapters) == 0: return ERC20(asset).balanceOf(self)
@@ -1133,31 +1236,33 @@ def _balanceAdapters(_target_asset_balance: uint256, _min_target_asset_balance:
             # It's possible due to slippage we may not have enough assets in the vault to
             # fulfill the entire deposit transfer.
             deposit_qty : uint256 = min(convert(dtx.qty, uint256), self._vaultAssets())
+            if _deposit_only:
+                # Without the withdraws there may be less to go around, never dip below the target.
+                if self._vaultAssets() <= _target_asset_balance: break
+                deposit_qty = min(deposit_qty, self._vaultAssets() - _target_asset_balance)
 
             self._adapter_deposit(dtx.adapter, deposit_qty, pregen_info)
 
         # Negative quanties indicate a withdraw from the adapter into the vault.
-        elif dtx.qty < 0:
+        elif dtx.qty < 0 and not _deposit_only:
             # Liquidate funds from lending adapter's adapter.
             qty: uint256 = convert(dtx.qty * -1, uint256)         
             assets_withdrawn : uint256 = self._adapter_withdraw(dtx.adapter, qty, self, pregen_info)
 
-    final_asset_balance : uint256 = self._totalAssetsCached()
-
     assert self._totalAssetsCached() >= min_total_asset_balance, "Slippage exceeded!"
 
     return self._vaultAssets()
 
 
 @external
-def balanceAdapters(_target_asset_balance: uint256, _min_tasset_balance: uint256 = 0, _withdraw_only : bool = False, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def balanceAdapters(_target_asset_balance: uint256, _min_tasset_balance: uint256 = 0, _withdraw_only : bool = False, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice The function provides a way to balance adapters
     @dev   returns the actual balances of assets held in the local vault (not including adapters) after balancing.
     @param _target_asset_balance Target amount for assets balance in vault (not including adapters).
     @param _min_tasset_balance Minimum total assets (including adapters) post transaction accounting for slippage.
     @param _withdraw_only If true no funds will move from vault into adapters during this tx.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     """
     assert msg.sender == self.owner, "only owner can call balanceAdapters"
 
@@ -1166,6 +1271,38 @@ def balanceAdapters(_target_asset_balance: uint256, _min_tasset_balance: uint256
     return ret
 
 
+@internal
+def _idleTarget() -> uint256:
+    """
+    @dev The cash to leave in the vault when moving idle assets into the adapters.
+    """
+    if self.idle_ratio_bps == 0:
+        return self.max_idle_assets
+    return min(self.max_idle_assets, self._totalAssetsCached() * self.idle_ratio_bps / 10000)
+
+
+@external
+def flush(_min_assets: uint256 = 0, pregen_info: Bytes[4096] = empty(Bytes[4096])) -> uint256:
+    """
+    @notice Moves the vault's assets above the target cash into the adapters below their strategy targets.
+    @dev   Unlike balanceAdapters nothing is withdrawn from the adapters, the rest of the portfolio is
+           left alone. Returns the assets left in the vault.
+    @param _min_assets Minimum value the moved assets must retain in the adapters, defaults to MAX_SLIPPAGE_PERCENT % below the amount moved.
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries.
+    """
+    assert msg.sender == self.owner or msg.sender == self.keeper, "Only owner or keeper can flush."
+    assert self.max_idle_assets > 0, "Idle buffer disabled."
+    target_assets : uint256 = self._idleTarget()
+    idle_assets : uint256 = self._vaultAssets()
+    assert idle_assets > target_assets, "Nothing to flush."
+    flush_assets : uint256 = idle_assets - target_assets
+    max_loss : uint256 = flush_assets - self._defaultSlippage(flush_assets, _min_assets)
+
+    ret: uint256 = self._balanceAdapters(target_assets, max_loss, pregen_info, False, True)
+    self._dirtyAssetCache()
+    return ret
+
+
 @internal
 def _mint(_receiver: address, _share_amount: uint256) -> uint256:
     """
@@ -1184,29 +1321,45 @@ def _mint(_receiver: address, _share_amount: uint256) -> uint256:
 
 @internal
 @view
-def _extract_pregen_info(_pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS], _adapter: address) -> Bytes[4096]:
-    #Only extract if pregeninfo len matches lending adapters
-    if len(_pregen_info) == len(self.adapters):
-        #find idx current adapter
-        idx: uint256 = 0
-        for adapter in self.adapters:
-            if _adapter == adapter:
-                return _pregen_info[idx]
-            idx+=1
-    return empty(Bytes[4096])
+def _extract_pregen_info(_pregen_info: Bytes[4096], _adapter: address) -> Bytes[4096]:
+    # pregen_info is a packed list of entries, only for the adapters that need one, in adapter order:
+    #   adapter index in self.adapters (1 byte) | payload length (2 bytes, big endian) | payload
+    # Every entry is checked, not just the one for _adapter, so a malformed list always reverts.
+    adapter_idx: uint256 = MAX_ADAPTERS
+    idx: uint256 = 0
+    for adapter in self.adapters:
+        if _adapter == adapter:
+            adapter_idx = idx
+        idx += 1
+
+    pos: uint256 = 0
+    min_idx: uint256 = 0
+    found_pos: uint256 = 0
+    found_len: uint256 = 0
+    # Indices must be increasing, so a sixth entry can't be valid.
+    for i in range(MAX_ADAPTERS + 1):
+        if pos == len(_pregen_info): break
+        entry_idx: uint256 = MAX_ADAPTERS
+        entry_len: uint256 = 0
+        if pos + 3 <= len(_pregen_info):
+            entry_idx = convert(slice(_pregen_info, pos, 1), uint256)
+            entry_len = convert(slice(_pregen_info, pos + 1, 2), uint256)
+        assert pos + 3 + entry_len <= len(_pregen_info), "pregen_info entry overruns the buffer."
+        assert entry_idx >= min_idx and entry_idx < len(self.adapters), "pregen_info adapter index out of range."
+        if entry_idx == adapter_idx:
+            found_pos = pos + 3
+            found_len = entry_len
+        min_idx = entry_idx + 1
+        pos += 3 + entry_len
+    return slice(_pregen_info, found_pos, found_len)
 
 
 @internal
-def _adapter_deposit(_adapter: address, _asset_amount: uint256, _pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]):
+def _adapter_deposit(_adapter: address, _asset_amount: uint256, _pregen_info: Bytes[4096]):
     pregen_info: Bytes[4096] = self._extract_pregen_info(_pregen_info, _adapter)
-    response: Bytes[32] = empty(Bytes[32])
-
-    starting_assets : uint256 = self._adapterAssets(_adapter)
-
-    response = raw_call(
+    raw_call(
         _adapter,
         _abi_encode(_asset_amount, pregen_info, method_id=method_id("deposit(uint256,bytes)")),
-        max_outsize=32,
         is_delegate_call=True,
         revert_on_failure=True
         )
@@ -1221,10 +1374,9 @@ def _adapter_deposit(_adapter: address, _asset_amount: uint256, _pregen_info: Dy
 
 
 @internal
-def _adapter_withdraw(_adapter: address, _asset_amount: uint256, _withdraw_to: address, _pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS], _force: bool = False) -> uint256:
+def _adapter_withdraw(_adapter: address, _asset_amount: uint256, _withdraw_to: address, _pregen_info: Bytes[4096], _force: bool = False) -> uint256:
     pregen_info: Bytes[4096] = self._extract_pregen_info(_pregen_info, _adapter)
     balbefore : uint256 = ERC20(asset).balanceOf(_withdraw_to)
-    response: Bytes[32] = empty(Bytes[32])
     result_ok : bool = True
 
     assert _adapter != empty(address), "EMPTY ADAPTER!"
@@ -1233,19 +1385,17 @@ def _adapter_withdraw(_adapter: address, _asset_amount: uint256, _withdraw_to: a
     if _force:
 
         # For revert_on_failure = True
-        result_ok, response = raw_call(
+        result_ok = raw_call(
             _adapter,
             _abi_encode(_asset_amount, _withdraw_to, pregen_info, method_id=method_id("withdraw(uint256,address,bytes)")),
-            max_outsize=32,
             is_delegate_call=True,
             revert_on_failure=False
             )
     else:
         # For revert_on_failure = False
-        response = raw_call(
+        raw_call(
             _adapter,
             _abi_encode(_asset_amount, _withdraw_to, pregen_info, method_id=method_id("withdraw(uint256,address,bytes)")),
-            max_outsize=32,
             is_delegate_call=True,
             revert_on_failure=True
             )
@@ -1262,7 +1412,7 @@ def _adapter_withdraw(_adapter: address, _asset_amount: uint256, _withdraw_to: a
 
 
 @internal
-def _deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]) -> (uint256, uint256):
+def _deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256, pregen_info: Bytes[4096]) -> (uint256, uint256):
     """
     returns shares minted, assets taken
     """
@@ -1286,7 +1436,16 @@ def _deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256,
     # Clear the asset cache for vault but not adapters.
     self._dirtyAssetCache(True, False)
 
-    bal_diff: uint256 = self._balanceAdapters(empty(uint256), _asset_amount - min_share_value, pregen_info, False)
+    # Deposits that keep the vault's idle assets within the idle buffer are left as cash.
+    idle_assets : uint256 = self._vaultAssets()
+    if idle_assets > self.max_idle_assets:
+        if self.max_idle_assets == 0:
+            self._balanceAdapters(empty(uint256), _asset_amount - min_share_value, pregen_info, False)
+        else:
+            # Only this deposit's own assets are moved, cash buffered by earlier deposits is left for
+            # flush() so this depositor isn't charged for the price impact of deploying it.
+            move_assets : uint256 = min(idle_assets - self._idleTarget(), _asset_amount)
+            self._balanceAdapters(idle_assets - move_assets, _asset_amount - min_share_value, pregen_info, False, True)
 
     total_after_assets : uint256 = self._totalAssetsCached()
     assert total_after_assets > total_starting_assets, "ERROR - deposit resulted in loss of assets!"
@@ -1322,13 +1481,13 @@ def _deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256,
 
 
 @external
-def deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256: 
+def deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256: 
     """
     @notice This function provides a way to transfer an asset amount from message sender to receiver
     @param _asset_amount Number amount of assets to evaluate
     @param _receiver Address of receiver to evaluate
     @param _min_shares Minmum number of shares that is acceptable. If 0 then apply MAX_SLIPPAGE_PERCENT % allowable slippage.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Share amount deposited to receiver
     """
     shares : uint256 = 0
@@ -1339,7 +1498,7 @@ def deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256 =
 
 
 @internal
-def _withdraw(_asset_amount: uint256, _receiver: address, _owner: address, _min_assets: uint256, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]) -> (uint256, uint256):
+def _withdraw(_asset_amount: uint256, _receiver: address, _owner: address, _min_assets: uint256, pregen_info: Bytes[4096]) -> (uint256, uint256):
     """
     returns shares consumed, assets returned
     """
@@ -1386,14 +1545,14 @@ def _withdraw(_asset_amount: uint256, _receiver: address, _owner: address, _min_
 
 
 @external
-def withdraw(_asset_amount: uint256,_receiver: address,_owner: address, _min_assets: uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256:
+def withdraw(_asset_amount: uint256,_receiver: address,_owner: address, _min_assets: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
     """
     @notice This function provides a way to withdraw an asset amount to receiver
     @param _asset_amount Number amount of assets to evaluate
     @param _receiver Address of receiver to evaluate
     @param _owner Address of owner of assets to evaluate
     @param _min_assets Minimum assets that must be returned (due to slippage) or else reverts. If not specified will be MAX_SLIPPAGE_PERCENT % by default.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Share amount withdrawn to receiver
     """
     shares : uint256 = 0
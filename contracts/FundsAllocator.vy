@@ -14,6 +14,11 @@ MAX_ADAPTERS : constant(uint256) = 5
 
 ADAPTER_BREAKS_LOSS_POINT : constant(decimal) = 0.05
 
+BASIS_POINTS : constant(uint256) = 10000
+
+# When set, deposits go to the single most underweight adapter instead of every underweight one.
+route_deposits : public(immutable(bool))
+
 
 # This structure must match definition in AdapterVault.vy
 struct BalanceTX:
@@ -32,6 +37,18 @@ struct BalanceAdapter:
     delta: int256
 
 
+@external
+def __init__(_route_deposits: bool):
+    """
+    @notice Constructor
+    @param _route_deposits If True, funds leaving the vault are sent to the adapter furthest below
+           its target, up to its deficit, with any remainder going to the next furthest below and so on.
+           Adapters above target are left alone, so the strategy ratios are reached over successive deposits. Rebalances that must raise funds
+           for the vault are still proportional. If False, every adapter is moved to its target.
+    """
+    route_deposits = _route_deposits
+
+
 @internal
 @pure
 def _getTargetBalancesWithdrawOnly(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS]) -> (int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]):
@@ -51,15 +68,45 @@ def _getTargetBalancesWithdrawOnly(_vault_balance: uint256, _d4626_asset_target:
     # How much more do we need to withdraw (aspirational)?
     target_withdraw_balance : uint256 = _d4626_asset_target - _vault_balance        
 
+    # Rank the adapters by how cheap it is to withdraw from them. Adapters that no longer take
+    # deposits come first (a matured Pendle market redeems 1:1 without a swap), then the ones
+    # furthest above their strategy target so the vault drifts back towards its ratios.
+    adapter_count : uint256 = 0
+    matured : bool[MAX_ADAPTERS] = empty(bool[MAX_ADAPTERS])
+    excess : int256[MAX_ADAPTERS] = empty(int256[MAX_ADAPTERS])
+    for pos in range(MAX_ADAPTERS):
+        adapter : BalanceAdapter = _adapter_balances[pos]
+        if adapter.adapter == empty(address): break
+        target : uint256 = 0
+        if _total_ratios > 0:
+            target = (_total_assets - _d4626_asset_target) * adapter.ratio / _total_ratios
+        matured[pos] = adapter.max_deposit == 0
+        excess[pos] = convert(adapter.current, int256) - convert(target, int256)
+        adapter_count += 1
+
+    order : uint256[MAX_ADAPTERS] = empty(uint256[MAX_ADAPTERS])
+    ranked : bool[MAX_ADAPTERS] = empty(bool[MAX_ADAPTERS])
+    for i in range(MAX_ADAPTERS):
+        if i == adapter_count: break
+        best : uint256 = MAX_ADAPTERS
+        for pos in range(MAX_ADAPTERS):
+            if pos == adapter_count: break
+            if ranked[pos]: continue
+            if best == MAX_ADAPTERS or (matured[pos] and not matured[best]) or \
+               (matured[pos] == matured[best] and excess[pos] > excess[best]):
+                best = pos
+        ranked[best] = True
+        order[i] = best
+
     # We're just going to walk through and empty adapters until we have 
     # adequate funds in the vault for this withdraw.
-    for pos in range(MAX_ADAPTERS):
+    for i in range(MAX_ADAPTERS):
         # Anything left to withdraw?
         if target_withdraw_balance == 0: break
-        adapter : BalanceAdapter = _adapter_balances[pos]
 
         # End of adapters?
-        if adapter.adapter == empty(address): break
+        if i == adapter_count: break
+        adapter : BalanceAdapter = _adapter_balances[order[i]]
 
         # If the adapter has been removed from the strategy then we must empty it!
         if adapter.ratio == 0 and adapter.current > 0:
@@ -88,7 +135,7 @@ def _getTargetBalancesWithdrawOnly(_vault_balance: uint256, _d4626_asset_target:
 
 @internal
 @pure
-def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS], _min_outgoing_tx: uint256, _withdraw_only : bool = False) -> (int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]):
+def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS], _min_outgoing_tx: uint256, _withdraw_only : bool, _drift_band_bps : uint256) -> (int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]):
     # BDM TODO : enforce ADAPTER_BREAKS_LOSS_POINT more completely than just during deposits.
     assert _d4626_asset_target <= _total_assets, "Not enough assets to fulfill d4626 target goals!"
 
@@ -109,6 +156,11 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
     blocked_adapters : address[MAX_ADAPTERS] = empty(address[MAX_ADAPTERS])
     blocked_pos : uint256 = 0
 
+    # Routing only applies when the vault isn't short of its own target.
+    route_deposit : bool = route_deposits and _vault_balance >= _d4626_asset_target
+    # Adapters a routed deposit may go to, each with the most it can take (at most its deficit).
+    routable : DynArray[BalanceAdapter, MAX_ADAPTERS] = empty(DynArray[BalanceAdapter, MAX_ADAPTERS])
+
     for pos in range(MAX_ADAPTERS):
         adapter : BalanceAdapter = _adapter_balances[pos]
         if adapter.adapter == empty(address): break
@@ -121,6 +173,12 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
             adapter.target = (total_adapter_target_assets * adapter.ratio) / _total_ratios      
             adapter.delta = convert(adapter.target, int256) - convert(adapter.current, int256)
 
+            # Close enough to target isn't worth a tx. Withdraws are only skipped if the vault
+            # doesn't need them to reach its own target.
+            if adapter.delta > 0 or _vault_balance >= _d4626_asset_target:
+                if convert(abs(adapter.delta), uint256) * BASIS_POINTS <= adapter.target * _drift_band_bps:
+                    adapter.delta = 0
+
             # Ensure the adapters will handle a deposit or withdrawl of the size requested.
             if adapter.delta > 0:
                 adapter.delta = min(adapter.delta, adapter.max_deposit) 
@@ -130,8 +188,8 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
             # Check for valid outgoing txs here.
             if adapter.delta > 0:
 
-                # Is an outgoing tx > min size?
-                if adapter.delta < convert(_min_outgoing_tx, int256):         
+                # Is an outgoing tx > min size? (A routed deposit is checked once its size is known.)
+                if adapter.delta < convert(_min_outgoing_tx, int256) and not route_deposit:
                     adapter.delta = 0
 
                 # Is the LP possibly compromised for an outgoing tx?
@@ -142,6 +200,16 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
                     blocked_pos += 1
                     adapter.delta = 0 # This will result in no tx being generated.
 
+                if route_deposit:
+                    # Remember the underweight adapters, the deposit is routed once all are known.
+                    if adapter.delta > 0:
+                        routable.append(adapter)
+                    adapter.delta = 0
+
+            elif route_deposit:
+                # Don't pay to pull funds out of an adapter just because it is over its target.
+                adapter.delta = 0
+
         adapter_result : int256 = convert(adapter.current, int256) + adapter.delta
         assert adapter_result >= 0, "Adapter resulting balance can't be less than zero!"
 
@@ -159,6 +227,33 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
             # txs depositing to adapters go last.
             out_txs.append(adapter)            
 
+    if route_deposit:
+        # Everything the vault can spare, including what was pulled from removed adapters, goes to the
+        # most underweight adapter up to its deficit. Any remainder goes to the next most underweight
+        # and so on, whatever no adapter needs stays in the vault.
+        spare : int256 = convert(_vault_balance - _d4626_asset_target, int256) + d4626_delta
+        routed : bool[MAX_ADAPTERS] = empty(bool[MAX_ADAPTERS])
+        for i in range(MAX_ADAPTERS):
+            if spare <= 0: break
+            best : uint256 = MAX_ADAPTERS
+            best_deficit : int256 = 0
+            for pos in range(MAX_ADAPTERS):
+                if pos == len(routable): break
+                if routed[pos]: continue
+                deficit : int256 = convert(routable[pos].target, int256) - convert(routable[pos].current, int256)
+                if best == MAX_ADAPTERS or deficit > best_deficit:
+                    best = pos
+                    best_deficit = deficit
+            if best == MAX_ADAPTERS: break
+            routed[best] = True
+
+            deposit_adapter : BalanceAdapter = routable[best]
+            deposit_adapter.delta = min(spare, deposit_adapter.delta)
+            if deposit_adapter.delta >= convert(_min_outgoing_tx, int256):
+                spare -= deposit_adapter.delta
+                d4626_delta -= deposit_adapter.delta
+                out_txs.append(deposit_adapter)
+
     # Stick outbound txs at the end.
     for adapter in out_txs:
         adapters[tx_count] = adapter
@@ -169,7 +264,7 @@ def _getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _t
 
 @external
 @pure
-def getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS], _min_outgoing_tx: uint256, _withdraw_only : bool = False) -> (int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]): 
+def getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_balances: BalanceAdapter[MAX_ADAPTERS], _min_outgoing_tx: uint256, _withdraw_only : bool = False, _drift_band_bps : uint256 = 0) -> (int256, uint256, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]): 
     """
     @dev    Returns: 
             # REMOVED 1) uint256 - the total asset allocation across all adapters (less _d4626_asset_target),
@@ -194,13 +289,17 @@ def getTargetBalances(_vault_balance: uint256, _d4626_asset_target: uint256, _to
 
     @param _min_outgoing_tx the minimum size of a tx depositing funds to an adapter (as set by the current strategy).
 
+    @param _withdraw_only if True only withdraws needed to reach _d4626_asset_target are planned.
+
+    @param _drift_band_bps adapters within this many basis points of their target get no tx (as set by the current strategy).
+
     """    
-    return self._getTargetBalances(_vault_balance, _d4626_asset_target, _total_assets, _total_ratios, _adapter_balances, _min_outgoing_tx, _withdraw_only)
+    return self._getTargetBalances(_vault_balance, _d4626_asset_target, _total_assets, _total_ratios, _adapter_balances, _min_outgoing_tx, _withdraw_only, _drift_band_bps)
 
 
 @internal
 @pure
-def _getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only : bool = False) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]): 
+def _getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only : bool, _drift_band_bps : uint256) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]): 
     # _BDM TODO : max_txs is ignored for now.    
     adapter_txs : BalanceTX[MAX_ADAPTERS] = empty(BalanceTX[MAX_ADAPTERS])
     blocked_adapters : address[MAX_ADAPTERS] = empty(address[MAX_ADAPTERS])
@@ -208,7 +307,7 @@ def _getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min
     d4626_delta : int256 = 0
     tx_count : uint256 = 0
 
-    d4626_delta, tx_count, adapter_states, blocked_adapters = self._getTargetBalances(_vault_balance, _target_asset_balance, _total_assets, _total_ratios, _adapter_states, _min_proposer_payout, _withdraw_only)
+    d4626_delta, tx_count, adapter_states, blocked_adapters = self._getTargetBalances(_vault_balance, _target_asset_balance, _total_assets, _total_ratios, _adapter_states, _min_proposer_payout, _withdraw_only, _drift_band_bps)
 
     pos : uint256 = 0
     for tx_bal in adapter_states:
@@ -220,5 +319,5 @@ def _getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min
 
 @external
 @view
-def getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only : bool = False) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]):  
-    return self._getBalanceTxs(_vault_balance, _target_asset_balance, _min_proposer_payout, _total_assets, _total_ratios, _adapter_states, _withdraw_only )
+def getBalanceTxs(_vault_balance: uint256, _target_asset_balance: uint256, _min_proposer_payout: uint256, _total_assets: uint256, _total_ratios: uint256, _adapter_states: BalanceAdapter[MAX_ADAPTERS], _withdraw_only : bool = False, _drift_band_bps : uint256 = 0) -> (BalanceTX[MAX_ADAPTERS], address[MAX_ADAPTERS]):  
+    return self._getBalanceTxs(_vault_balance, _target_asset_balance, _min_proposer_payout, _total_assets, _total_ratios, _adapter_states, _withdraw_only, _drift_band_bps)
@@ -60,6 +60,16 @@ struct AdapterStrategy:
 struct ProposedStrategy:
     LPRatios: AdapterStrategy[MAX_ADAPTERS]
     min_proposer_payout: uint256
+    drift_band_bps: uint256
+
+# For the batched submitStrategies/endorseStrategies/activateStrategies
+struct VaultProposedStrategy:
+    vault: address
+    strategy: ProposedStrategy
+
+struct VaultNonce:
+    vault: address
+    Nonce: uint256
 
 event StrategyProposal:
     strategy : Strategy
@@ -80,6 +90,7 @@ struct Strategy:
     ProposerAddress: address
     LPRatios: AdapterStrategy[MAX_ADAPTERS]
     min_proposer_payout: uint256
+    drift_band_bps: uint256
     TSubmitted: uint256
     TActivated: uint256
     Withdrawn: bool
@@ -93,22 +104,70 @@ contractOwner: public(address)
 MAX_GUARDS: constant(uint256) = 5
 MAX_ADAPTERS: constant(uint256) = 5
 MAX_VAULTS: constant(uint256) = 25
+MAX_DRIFT_BAND_BPS: constant(uint256) = 10000
 DEFAULT_MIN_PROPOSER_PAYOUT: constant(uint256) = 0  # TODO: Need a reasonable value here based on expected gas costs of paying proposal fees.
 LGov: public(DynArray[address, MAX_GUARDS])
 TDelay: public(uint256)
 no_guards: public(uint256)
 
-CurrentStrategyByVault: public(HashMap[address, Strategy])
-PendingStrategyByVault: public(HashMap[address, Strategy])
-
 VotesGCByVault: public(HashMap[address, HashMap[address, address]])
 MIN_GUARDS: constant(uint256) = 1
-NextNonceByVault: public(HashMap[address, uint256])
 VaultList: public(DynArray[address, MAX_VAULTS])
 
+# Position+1 of each guard in LGov and of each vault in VaultList, 0 if it isn't one.
+guard_index: HashMap[address, uint256]
+vault_index: HashMap[address, uint256]
+
+# Guards vote from a slot they keep while they are a guard, unlike their position in LGov
+# which removeGuard may change. guard_slots packs a VOTE_BITS wide field per slot holding
+# the generation it was last handed out at, 0 while it is free. Each strategy's votes are a
+# word with the same layout, holding (generation << 2) | VOTE_ENDORSE or VOTE_REJECT for
+# each slot that voted. A vote only counts while its generation matches the slot's, so votes
+# of a guard that has been removed or swapped out are dropped rather than passed on to
+# whoever gets the slot next.
+VOTE_BITS: constant(uint256) = 48
+VOTE_ENDORSE: constant(uint256) = 1
+VOTE_REJECT: constant(uint256) = 2
+
+# Why the pending strategy can't be activated (yet), see _activation_blocker
+ACTIVATION_ALLOWED: constant(uint256) = 0
+NO_PENDING_STRATEGY: constant(uint256) = 1
+STRATEGY_WITHDRAWN: constant(uint256) = 2
+STRATEGY_PREMATURE: constant(uint256) = 3
+STRATEGY_REJECTED: constant(uint256) = 4
+
+# EIP-712 signed endorsements, see endorseWithSignatures
+EIP712_NAME: constant(String[32]) = "AdapterVault Governance"
+EIP712_VERSION: constant(String[8]) = "1"
+EIP712_DOMAIN_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+# strategy is the keccak256 of the ABI encoded (LPRatios, min_proposer_payout, drift_band_bps)
+# of the pending strategy, so an endorsement only counts for the terms the guard read.
+ENDORSE_TYPEHASH: constant(bytes32) = keccak256("EndorseStrategy(uint256 Nonce,address vault,bytes32 strategy)")
+SECP256K1N_HALF: constant(uint256) = 57896044618658097711785492504343953926418782139537452191302581570759080747168 # secp256k1n / 2
+guard_vote_slot: HashMap[address, uint256]
+guard_slots: uint256
+last_guard_generation: uint256
+
+# A vault's current strategy and the pending one that may replace it are kept in two packed
+# records, they share one after activation. CurrentStrategyByVault()/PendingStrategyByVault()
+# rebuild the Strategy struct from them.
+struct StrategyRecord:
+    # ProposerAddress | TSubmitted << 160 | no_guards << 200 | Withdrawn << 208
+    header: uint256
+    # Nonce | drift_band_bps << 64 | LPRatios in use << 80 | min_proposer_payout << 128
+    terms: uint256
+    # adapter | ratio << 160, only the ones in use are written
+    ratios: uint256[MAX_ADAPTERS]
+    # Guard votes, see guard_slots
+    votes: uint256
+
+strategy_records: HashMap[address, StrategyRecord[2]]
+# current record | pending record << 1 | TActivated << 8
+strategy_index: HashMap[address, uint256]
+
 
 interface AdapterVault:
-    def set_strategy(Proposer: address, Strategies: AdapterStrategy[MAX_ADAPTERS], min_proposer_payout: uint256) -> bool: nonpayable
+    def set_strategy(Proposer: address, Strategies: AdapterStrategy[MAX_ADAPTERS], min_proposer_payout: uint256, drift_band_bps: uint256) -> bool: nonpayable
     def replaceGovernanceContract(NewGovernance: address) -> bool: nonpayable
 
 
@@ -126,18 +185,133 @@ def __init__(contractOwner: address, _tdelay: uint256):
 
 
 @internal
-def _submitStrategy(strategy: ProposedStrategy, vault: address) -> uint256:
-    assert msg.sender in self.LGov, "Only Guards may submit strategies."
+@pure
+def _slot_generation(_slots: uint256, _slot: uint256) -> uint256:
+    return (_slots >> (_slot * VOTE_BITS)) & (2**VOTE_BITS - 1)
+
+
+@internal
+@pure
+def _vote_of(_votes: uint256, _slots: uint256, _slot: uint256) -> uint256:
+    """
+    @return VOTE_ENDORSE or VOTE_REJECT if the guard in _slot has a vote in _votes, 0 otherwise.
+    """
+    field: uint256 = self._slot_generation(_votes, _slot)
+    if field >> 2 == 0 or field >> 2 != self._slot_generation(_slots, _slot):
+        return 0
+    return field & 3
+
+
+@internal
+@view
+def _tally(_votes: uint256) -> (uint256, uint256):
+    """
+    @return endorse and reject votes from current guards in _votes.
+    """
+    slots: uint256 = self.guard_slots
+    endorse_votes: uint256 = 0
+    reject_votes: uint256 = 0
+    for slot in range(MAX_GUARDS):
+        vote: uint256 = self._vote_of(_votes, slots, slot)
+        if vote == VOTE_ENDORSE:
+            endorse_votes += 1
+        elif vote == VOTE_REJECT:
+            reject_votes += 1
+    return endorse_votes, reject_votes
+
+
+@internal
+def _cast_vote(vault: address, _record: uint256, _guard: address, _vote: uint256):
+    slots: uint256 = self.guard_slots
+    slot: uint256 = self.guard_vote_slot[_guard]
+    votes: uint256 = self.strategy_records[vault][_record].votes
+
+    #Check to see that sender has not already voted
+    assert self._vote_of(votes, slots, slot) == 0, "Guard has already voted."
+
+    offset: uint256 = slot * VOTE_BITS
+    field: uint256 = (self._slot_generation(slots, slot) << 2) | _vote
+    self.strategy_records[vault][_record].votes = (votes & ~((2**VOTE_BITS - 1) << offset)) | (field << offset)
+
+
+@internal
+@view
+def _with_votes(_strat: Strategy, _votes: uint256) -> Strategy:
+    """
+    @notice fills in VotesEndorse/VotesReject with the current guards that have a vote in _votes.
+    """
+    strat: Strategy = _strat
+    slots: uint256 = self.guard_slots
+    for guard_addr in self.LGov:
+        vote: uint256 = self._vote_of(_votes, slots, self.guard_vote_slot[guard_addr])
+        if vote == VOTE_ENDORSE:
+            strat.VotesEndorse.append(guard_addr)
+        elif vote == VOTE_REJECT:
+            strat.VotesReject.append(guard_addr)
+    return strat
+
+
+@internal
+@view
+def _strategy(vault: address, _record: uint256) -> Strategy:
+    """
+    @notice unpacks a strategy record, without votes or TActivated.
+    """
+    strat: Strategy = empty(Strategy)
+    terms: uint256 = self.strategy_records[vault][_record].terms
+    strat.Nonce = terms & (2**64 - 1)
+    if strat.Nonce == 0:
+        return strat
+
+    header: uint256 = self.strategy_records[vault][_record].header
+    strat.ProposerAddress = convert(header & (2**160 - 1), address)
+    strat.TSubmitted = (header >> 160) & (2**40 - 1)
+    strat.no_guards = (header >> 200) & 255
+    strat.Withdrawn = (header >> 208) & 1 == 1
+    strat.drift_band_bps = (terms >> 64) & (2**16 - 1)
+    strat.min_proposer_payout = terms >> 128
+    ratios_in_use: uint256 = (terms >> 80) & 255
+    for i in range(MAX_ADAPTERS):
+        if i == ratios_in_use: break
+        word: uint256 = self.strategy_records[vault][_record].ratios[i]
+        strat.LPRatios[i] = AdapterStrategy({adapter: convert(word & (2**160 - 1), address), ratio: word >> 160})
+    strat.VaultAddress = vault
+    return strat
+
+
+@internal
+def _assign_vote_slot(GuardAddress: address, _slot: uint256):
+    generation: uint256 = self.last_guard_generation + 1
+    self.last_guard_generation = generation
+    offset: uint256 = _slot * VOTE_BITS
+    self.guard_slots = (self.guard_slots & ~((2**VOTE_BITS - 1) << offset)) | (generation << offset)
+    self.guard_vote_slot[GuardAddress] = _slot
+
 
-    if self.NextNonceByVault[vault] == 0:
-        self.NextNonceByVault[vault] += 1
+@internal
+def _free_vote_slot(GuardAddress: address):
+    offset: uint256 = self.guard_vote_slot[GuardAddress] * VOTE_BITS
+    self.guard_slots = self.guard_slots & ~((2**VOTE_BITS - 1) << offset)
+    self.guard_vote_slot[GuardAddress] = 0
+
+
+@internal
+def _submitStrategy(strategy: ProposedStrategy, vault: address) -> uint256:
+    assert self.guard_index[msg.sender] != 0, "Only Guards may submit strategies."
 
     # No using a Strategy function without a vault
     assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
-    assert vault in self.VaultList, "Vault not in vault list!"        
+    assert self.vault_index[vault] != 0, "Vault not in vault list!"        
+
+    assert strategy.drift_band_bps <= MAX_DRIFT_BAND_BPS, "Drift band can't exceed 100%."
+    assert strategy.min_proposer_payout < 2**128, "min_proposer_payout too large."
 
-    pending_strat: Strategy = self.PendingStrategyByVault[vault]
+    index: uint256 = self.strategy_index[vault]
+    current: uint256 = index & 1
+    pending: uint256 = (index >> 1) & 1
+    pending_header: uint256 = self.strategy_records[vault][pending].header
+    pending_nonce: uint256 = self.strategy_records[vault][pending].terms & (2**64 - 1)
 
     # Confirm there's no currently pending strategy for this vault so we can replace the old one.
 
@@ -145,16 +319,16 @@ def _submitStrategy(strategy: ProposedStrategy, vault: address) -> uint256:
     # Otherwise has it been withdrawn? 
     # Otherwise, has it been short circuited down voted? 
     # Has the period of protection from being replaced expired already?
+    endorse_votes : uint256 = 0
     reject_votes : uint256 = 0
-    for guard_addr in self.LGov:
-        if guard_addr in pending_strat.VotesReject:
-            reject_votes += 1
+    endorse_votes, reject_votes = self._tally(self.strategy_records[vault][pending].votes)
 
-    nonces_match : bool =  (self.CurrentStrategyByVault[vault].Nonce == pending_strat.Nonce)                
+    nonces_match : bool = (current == pending)
+    withdrawn : bool = (pending_header >> 208) & 1 == 1
     at_least_one_reject : bool = reject_votes > 0
-    strategy_rejected : bool = (reject_votes >= pending_strat.no_guards/2+1)
-    strategy_timedout : bool = (convert(block.timestamp, decimal) > (convert(pending_strat.TSubmitted, decimal)+(convert(self.TDelay, decimal))))
-    assert  nonces_match or (pending_strat.Withdrawn == True) or at_least_one_reject and \
+    strategy_rejected : bool = (reject_votes >= ((pending_header >> 200) & 255)/2+1)
+    strategy_timedout : bool = block.timestamp > ((pending_header >> 160) & (2**40 - 1)) + self.TDelay
+    assert  nonces_match or withdrawn or at_least_one_reject and \
             strategy_rejected or strategy_timedout, "Invalid proposed strategy!"
 
     # Confirm msg.sender Eligibility
@@ -162,21 +336,34 @@ def _submitStrategy(strategy: ProposedStrategy, vault: address) -> uint256:
 
     strat : Strategy = empty(Strategy)
 
-    strat.Nonce = self.NextNonceByVault[vault]
-    self.NextNonceByVault[vault] += 1
-
+    strat.Nonce = pending_nonce + 1
     strat.ProposerAddress = msg.sender
     strat.LPRatios = strategy.LPRatios
     strat.min_proposer_payout = strategy.min_proposer_payout
+    strat.drift_band_bps = strategy.drift_band_bps
     strat.TSubmitted = block.timestamp
     strat.TActivated = 0    
     strat.Withdrawn = False
     strat.no_guards = len(self.LGov)
-    strat.VotesEndorse = empty(DynArray[address, MAX_GUARDS])
-    strat.VotesReject = empty(DynArray[address, MAX_GUARDS])
     strat.VaultAddress = vault
 
-    self.PendingStrategyByVault[vault] = strat
+    ratios: uint256[MAX_ADAPTERS] = empty(uint256[MAX_ADAPTERS])
+    ratios_in_use: uint256 = 0
+    for i in range(MAX_ADAPTERS):
+        assert strategy.LPRatios[i].ratio < 2**96, "Ratio too large."
+        ratios[i] = convert(strategy.LPRatios[i].adapter, uint256) | (strategy.LPRatios[i].ratio << 160)
+        if ratios[i] != 0:
+            ratios_in_use = i + 1
+
+    # Write it over the record that isn't current, LPRatios past the ones in use are never read.
+    record: uint256 = 1 - current
+    for i in range(MAX_ADAPTERS):
+        if i == ratios_in_use: break
+        self.strategy_records[vault][record].ratios[i] = ratios[i]
+    self.strategy_records[vault][record].header = convert(msg.sender, uint256) | (block.timestamp << 160) | (strat.no_guards << 200)
+    self.strategy_records[vault][record].terms = strat.Nonce | (strat.drift_band_bps << 64) | (ratios_in_use << 80) | (strat.min_proposer_payout << 128)
+    self.strategy_records[vault][record].votes = 0
+    self.strategy_index[vault] = current | (record << 1) | ((index >> 8) << 8)
 
     log StrategyProposal(strat, msg.sender, strat.LPRatios, strategy.min_proposer_payout, vault)
 
@@ -194,6 +381,19 @@ def submitStrategy(strategy: ProposedStrategy, vault: address) -> uint256:
     return self._submitStrategy(strategy, vault)
 
 
+@external
+def submitStrategies(strategies: DynArray[VaultProposedStrategy, MAX_VAULTS]) -> DynArray[uint256, MAX_VAULTS]:
+    """
+    @notice submitStrategy for several vaults in one transaction, e.g. when they all roll to new markets
+    @param strategies The Proposed Strategy for each vault
+    @return The nonce for each strategy submitted, in the same order
+    """
+    nonces: DynArray[uint256, MAX_VAULTS] = []
+    for proposal in strategies:
+        nonces.append(self._submitStrategy(proposal.strategy, proposal.vault))
+    return nonces
+
+
 @external
 def withdrawStrategy(Nonce: uint256, vault: address):
     """
@@ -201,29 +401,57 @@ def withdrawStrategy(Nonce: uint256, vault: address):
     @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
     @param vault The vault address (for the Proposed Strategy) to evaluate
     """
-    pending_strat : Strategy = self.PendingStrategyByVault[vault]
+    index: uint256 = self.strategy_index[vault]
+    pending: uint256 = (index >> 1) & 1
 
     # No using a Strategy function without a vault
     assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
     #Check to see if vault is in vault list
-    assert vault in self.VaultList, "vault not in vault list!"  
+    assert self.vault_index[vault] != 0, "vault not in vault list!"  
 
     #Check to see that the pending strategy is not the current strategy
-    assert (self.CurrentStrategyByVault[vault].Nonce != pending_strat.Nonce), "Cannot withdraw Current Strategy"
+    assert index & 1 != pending, "Cannot withdraw Current Strategy"
 
     #Check to see that the pending strategy's nonce matches the nonce we want to withdraw
-    assert pending_strat.Nonce == Nonce, "Cannot Withdraw Strategy if its not Pending Strategy"
+    assert self.strategy_records[vault][pending].terms & (2**64 - 1) == Nonce, "Cannot Withdraw Strategy if its not Pending Strategy"
 
     #Check to see that sender is eligible to withdraw
-    assert pending_strat.ProposerAddress == msg.sender
+    header: uint256 = self.strategy_records[vault][pending].header
+    assert convert(header & (2**160 - 1), address) == msg.sender
 
     #Withdraw Pending Strategy
-    self.PendingStrategyByVault[vault].Withdrawn = True
+    self.strategy_records[vault][pending].header = header | (1 << 208)
 
     log StrategyWithdrawal(Nonce, vault)
 
 
+@internal
+def _endorseStrategy(Nonce: uint256, vault: address, _guard: address):
+    index: uint256 = self.strategy_index[vault]
+    pending: uint256 = (index >> 1) & 1
+
+    # No using a Strategy function without a vault
+    assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
+
+    #Check to see if vault is in vault list
+    assert self.vault_index[vault] != 0, "vault not in vault list!"  
+
+    #Check to see that the pending strategy is not the current strategy
+    assert index & 1 != pending, "Cannot Endorse Strategy thats already  Strategy"
+
+    #Check to see that the pending strategy's nonce matches the nonce we want to endorse
+    assert self.strategy_records[vault][pending].terms & (2**64 - 1) == Nonce, "Cannot Endorse Strategy if its not Pending Strategy"
+
+    #Check to see that sender is eligible to vote
+    assert self.guard_index[_guard] != 0, "Sender is not eligible to vote"
+
+    #Vote to endorse strategy
+    self._cast_vote(vault, pending, _guard, VOTE_ENDORSE)
+
+    log StrategyVote(Nonce, vault, _guard, True)
+
+
 @external
 def endorseStrategy(Nonce: uint256, vault: address):
     """
@@ -231,31 +459,120 @@ def endorseStrategy(Nonce: uint256, vault: address):
     @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
     @param vault The vault address (for the Proposed Strategy) to evaluate
     """
-    pending_strat : Strategy = self.PendingStrategyByVault[vault]
+    self._endorseStrategy(Nonce, vault, msg.sender)
 
-    # No using a Strategy function without a vault
-    assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
-    #Check to see if vault is in vault list
-    assert vault in self.VaultList, "vault not in vault list!"  
+@external
+def endorseStrategies(strategies: DynArray[VaultNonce, MAX_VAULTS]):
+    """
+    @notice endorseStrategy for several vaults in one transaction
+    @param strategies The vault and nonce of each Proposed Strategy to endorse
+    """
+    for strategy in strategies:
+        self._endorseStrategy(strategy.Nonce, strategy.vault, msg.sender)
 
-    #Check to see that the pending strategy is not the current strategy
-    assert self.CurrentStrategyByVault[vault].Nonce != pending_strat.Nonce, "Cannot Endorse Strategy thats already  Strategy"
 
-    #Check to see that the pending strategy's nonce matches the nonce we want to endorse
-    assert pending_strat.Nonce == Nonce, "Cannot Endorse Strategy if its not Pending Strategy"
+@internal
+@view
+def _domain_separator() -> bytes32:
+    return keccak256(_abi_encode(EIP712_DOMAIN_TYPEHASH, keccak256(EIP712_NAME), keccak256(EIP712_VERSION), chain.id, self))
 
-    #Check to see that sender is eligible to vote
-    assert msg.sender in self.LGov, "Sender is not eligible to vote"
 
-    #Check to see that sender has not already voted
-    assert msg.sender not in pending_strat.VotesReject
-    assert msg.sender not in pending_strat.VotesEndorse
+@internal
+@view
+def _pending_strategy_hash(vault: address) -> bytes32:
+    strat: Strategy = self._strategy(vault, (self.strategy_index[vault] >> 1) & 1)
+    return keccak256(_abi_encode(strat.LPRatios, strat.min_proposer_payout, strat.drift_band_bps))
+
+
+@internal
+@view
+def _endorsement_digest(Nonce: uint256, vault: address) -> bytes32:
+    struct_hash: bytes32 = keccak256(_abi_encode(ENDORSE_TYPEHASH, Nonce, vault, self._pending_strategy_hash(vault)))
+    return keccak256(concat(b"\x19\x01", self._domain_separator(), struct_hash))
 
-    #Vote to endorse strategy
-    self.PendingStrategyByVault[vault].VotesEndorse.append(msg.sender)
 
-    log StrategyVote(Nonce, vault, msg.sender, True)
+@internal
+@pure
+def _recover_signer(digest: bytes32, signature: Bytes[65]) -> address:
+    assert len(signature) == 65, "Invalid signature length."
+    r: uint256 = convert(extract32(signature, 0), uint256)
+    s: uint256 = convert(extract32(signature, 32), uint256)
+    v: uint256 = convert(slice(signature, 64, 1), uint256)
+    if v < 27:
+        v += 27
+    # Only the low-s form is accepted, as in OpenZeppelin's ECDSA.
+    if s > SECP256K1N_HALF:
+        return empty(address)
+    return ecrecover(digest, v, r, s)
+
+
+@internal
+@view
+def _activation_blocker(vault: address) -> uint256:
+    """
+    @notice the first reason activateStrategy would refuse the pending strategy now,
+            ACTIVATION_ALLOWED if there is none.
+    """
+    index: uint256 = self.strategy_index[vault]
+    pending: uint256 = (index >> 1) & 1
+    header: uint256 = self.strategy_records[vault][pending].header
+    #Confirm there is a currently pending strategy
+    if index & 1 == pending:
+        return NO_PENDING_STRATEGY
+    if (header >> 208) & 1 == 1:
+        return STRATEGY_WITHDRAWN
+
+    #Confirm strategy is approved by guards
+    endorse_votes : uint256 = 0
+    reject_votes : uint256 = 0
+    endorse_votes, reject_votes = self._tally(self.strategy_records[vault][pending].votes)
+    timed_out: bool = ((header >> 160) & (2**40 - 1)) + self.TDelay < block.timestamp
+    if endorse_votes < (len(self.LGov)/2)+1 and not timed_out:
+        return STRATEGY_PREMATURE
+    if reject_votes > endorse_votes:
+        return STRATEGY_REJECTED
+    return ACTIVATION_ALLOWED
+
+
+@external
+@view
+def DOMAIN_SEPARATOR() -> bytes32:
+    return self._domain_separator()
+
+
+@external
+@view
+def endorsementDigest(Nonce: uint256, vault: address) -> bytes32:
+    """
+    @notice The EIP-712 digest a guard signs for endorseWithSignatures, of
+            EndorseStrategy(uint256 Nonce,address vault,bytes32 strategy) in this contract's
+            domain, strategy being the hash of the vault's pending strategy.
+    """
+    return self._endorsement_digest(Nonce, vault)
+
+
+@external
+def endorseWithSignatures(Nonce: uint256, vault: address, signatures: DynArray[Bytes[65], MAX_GUARDS], activate: bool = False) -> bool:
+    """
+    @notice Records endorsements guards signed off-chain (see endorsementDigest), so one
+            transaction, sent by anyone, carries them all instead of one per guard.
+    @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
+    @param vault The vault address (for the Proposed Strategy) to evaluate
+    @param signatures 65 byte (r, s, v) signatures, one per guard
+    @param activate Also activate the strategy if activateStrategy would now accept it
+    @return True if the strategy was activated
+    """
+    digest: bytes32 = self._endorsement_digest(Nonce, vault)
+    for signature in signatures:
+        guard: address = self._recover_signer(digest, signature)
+        assert guard != empty(address), "Invalid signature."
+        self._endorseStrategy(Nonce, vault, guard)
+
+    if not activate or self._activation_blocker(vault) != ACTIVATION_ALLOWED:
+        return False
+    self._activateStrategy(Nonce, vault)
+    return True
 
 
 @external
@@ -265,33 +582,34 @@ def rejectStrategy(Nonce: uint256, vault: address, replacementStrategy : Propose
     @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
     @param vault The vault address (for the Proposed Strategy) to evaluate
     """
-    pending_strat : Strategy = self.PendingStrategyByVault[vault]
+    index: uint256 = self.strategy_index[vault]
+    pending: uint256 = (index >> 1) & 1
 
     # No using a Strategy function without a vault
     assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
     #Check to see if vault is in vault list
-    assert vault in self.VaultList, "vault not in vault list!"  
+    assert self.vault_index[vault] != 0, "vault not in vault list!"  
 
     #Check to see that the pending strategy is not the current strategy
-    assert self.CurrentStrategyByVault[vault].Nonce != pending_strat.Nonce, "Cannot Reject Strategy thats already Current Strategy"
+    assert index & 1 != pending, "Cannot Reject Strategy thats already Current Strategy"
 
     #Check to see that the pending strategy's nonce matches the nonce we want to reject
-    assert pending_strat.Nonce == Nonce, "Cannot Reject Strategy if its not Pending Strategy"
+    assert self.strategy_records[vault][pending].terms & (2**64 - 1) == Nonce, "Cannot Reject Strategy if its not Pending Strategy"
 
     #Check to see that sender is eligible to vote
-    assert msg.sender in self.LGov
-
-    #Check to see that sender has not already voted
-    assert msg.sender not in pending_strat.VotesReject
-    assert msg.sender not in pending_strat.VotesEndorse
+    assert self.guard_index[msg.sender] != 0
 
-    strategy_already_rejected : bool = (len(pending_strat.VotesReject) >= pending_strat.no_guards/2+1)
+    endorse_votes : uint256 = 0
+    reject_votes : uint256 = 0
+    endorse_votes, reject_votes = self._tally(self.strategy_records[vault][pending].votes)
+    no_guards: uint256 = (self.strategy_records[vault][pending].header >> 200) & 255
+    strategy_already_rejected : bool = (reject_votes >= no_guards/2+1)
 
     #Vote to reject strategy
-    self.PendingStrategyByVault[vault].VotesReject.append(msg.sender)
+    self._cast_vote(vault, pending, msg.sender, VOTE_REJECT)
 
-    strategy_ultimately_rejected : bool = (len(pending_strat.VotesReject) >= pending_strat.no_guards/2+1)
+    strategy_ultimately_rejected : bool = (reject_votes + 1 >= no_guards/2+1)
 
     # If there is a replacement strategy suggested and this is the vote that ultimately decides the thing...
     if replacementStrategy.LPRatios[0].adapter != empty(address): # Can't test against empty(ProposedStrategy) due to Vyper issue #2638.
@@ -302,49 +620,54 @@ def rejectStrategy(Nonce: uint256, vault: address, replacementStrategy : Propose
     log StrategyVote(Nonce, vault, msg.sender, False)
 
 
-@external
-def activateStrategy(Nonce: uint256, vault: address):
-    """
-    @notice This function provides a way to activate a proposed strategy (for a specific vault) which becomes the current strategy
-    @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
-    @param vault The vault address (for the Proposed Strategy) to evaluate
-    """
-    pending_strat : Strategy = self.PendingStrategyByVault[vault]
+@internal
+def _activateStrategy(Nonce: uint256, vault: address):
+    index: uint256 = self.strategy_index[vault]
+    pending: uint256 = (index >> 1) & 1
+    pending_strat : Strategy = self._strategy(vault, pending)
 
     # No using a Strategy function without a vault
     assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
     #Check to see if vault is in vault list
-    assert vault in self.VaultList, "vault not in vault list!"  
-
-    #Confirm there is a currently pending strategy
-    assert (self.CurrentStrategyByVault[vault].Nonce != pending_strat.Nonce), "Invalid Nonce."
-    assert (pending_strat.Withdrawn == False), "Strategy is withdrawn."
-
-    #Confirm strategy is approved by guards
-    endorse_votes : uint256 = 0
-    reject_votes : uint256 = 0
-    for guard_addr in self.LGov:
-        if guard_addr in pending_strat.VotesEndorse:
-            endorse_votes += 1
-        if guard_addr in pending_strat.VotesReject:
-            reject_votes += 1
+    assert self.vault_index[vault] != 0, "vault not in vault list!"  
 
-    assert (endorse_votes >= (len(self.LGov)/2)+1) or \
-           ((pending_strat.TSubmitted + self.TDelay) < block.timestamp), "Premature activation with insufficience endorsements."
-    assert reject_votes <= endorse_votes, "Strategy was rejected."
+    blocker: uint256 = self._activation_blocker(vault)
+    assert blocker != NO_PENDING_STRATEGY, "Invalid Nonce."
+    assert blocker != STRATEGY_WITHDRAWN, "Strategy is withdrawn."
+    assert blocker != STRATEGY_PREMATURE, "Premature activation with insufficience endorsements."
+    assert blocker != STRATEGY_REJECTED, "Strategy was rejected."
 
     #Confirm Pending Strategy is the Strategy we want to activate
     assert pending_strat.Nonce == Nonce, "Incorrect strategy nonce."
 
-    #Make Current Strategy and Activate Strategy
-    self.CurrentStrategyByVault[vault] = self.PendingStrategyByVault[vault]
+    #Make Current Strategy and Activate Strategy, the pending record becomes the current one
+    self.strategy_index[vault] = pending | (pending << 1) | (block.timestamp << 8)
+    pending_strat.TActivated = block.timestamp
+
+    AdapterVault(vault).set_strategy(pending_strat.ProposerAddress, pending_strat.LPRatios, pending_strat.min_proposer_payout, pending_strat.drift_band_bps)
+
+    log StrategyActivation(self._with_votes(pending_strat, self.strategy_records[vault][pending].votes), pending_strat.ProposerAddress, pending_strat.LPRatios, pending_strat.min_proposer_payout, vault)
 
-    AdapterVault(vault).set_strategy(self.CurrentStrategyByVault[vault].ProposerAddress, self.CurrentStrategyByVault[vault].LPRatios, pending_strat.min_proposer_payout)
 
-    self.CurrentStrategyByVault[vault].TActivated = block.timestamp
+@external
+def activateStrategy(Nonce: uint256, vault: address):
+    """
+    @notice This function provides a way to activate a proposed strategy (for a specific vault) which becomes the current strategy
+    @param Nonce Integer (for the Proposed Strategy, by Vault) to evaluate
+    @param vault The vault address (for the Proposed Strategy) to evaluate
+    """
+    self._activateStrategy(Nonce, vault)
+
 
-    log StrategyActivation(self.CurrentStrategyByVault[vault], self.CurrentStrategyByVault[vault].ProposerAddress, self.CurrentStrategyByVault[vault].LPRatios, pending_strat.min_proposer_payout, vault)
+@external
+def activateStrategies(strategies: DynArray[VaultNonce, MAX_VAULTS]):
+    """
+    @notice activateStrategy for several vaults in one transaction
+    @param strategies The vault and nonce of each Proposed Strategy to activate
+    """
+    for strategy in strategies:
+        self._activateStrategy(strategy.Nonce, strategy.vault)
  
 
 @external
@@ -363,10 +686,18 @@ def addGuard(GuardAddress: address):
     assert GuardAddress != empty(address), "Cannot add ZERO_ADDRESS"
 
     #Check to see that GuardAddress is not already in self.LGov
-    assert GuardAddress not in self.LGov, "Guard already exists"
+    assert self.guard_index[GuardAddress] == 0, "Guard already exists"
 
     #Add new guard address as the last in the list of guards
     self.LGov.append(GuardAddress)
+    self.guard_index[GuardAddress] = len(self.LGov)
+
+    #Give it the first free vote slot, there is one for as long as LGov has room
+    slots: uint256 = self.guard_slots
+    for slot in range(MAX_GUARDS):
+        if self._slot_generation(slots, slot) == 0:
+            self._assign_vote_slot(GuardAddress, slot)
+            break
 
     log NewGuard(GuardAddress)
 
@@ -387,20 +718,20 @@ def removeGuard(GuardAddress: address):
     # Correct size to zero offset position.
     last_index -= 1
     
-    #Run through list of guards to find the index of the one we want to remove
-    current_index: uint256 = 0
-    for guard_addr in self.LGov:
-        if guard_addr == GuardAddress: break
-        current_index += 1
-
     #Make sure that GuardAddress is a guard on the list of guards
-    assert GuardAddress == self.LGov[current_index], "GuardAddress not a current Guard."    
+    current_index: uint256 = self.guard_index[GuardAddress]
+    assert current_index != 0, "GuardAddress not a current Guard."    
+    current_index -= 1
 
-    # Replace Current Guard with last
-    self.LGov[current_index] = self.LGov[last_index]
+    # Replace Current Guard with last, it keeps its vote slot
+    last_guard: address = self.LGov[last_index]
+    self.LGov[current_index] = last_guard
+    self.guard_index[last_guard] = current_index + 1
 
     # Eliminate the redundant one at the end.
     self.LGov.pop()
+    self.guard_index[GuardAddress] = 0
+    self._free_vote_slot(GuardAddress)
 
     log GuardRemoved(GuardAddress)
 
@@ -419,19 +750,19 @@ def swapGuard(OldGuardAddress: address, NewGuardAddress: address):
     assert NewGuardAddress != empty(address), "Cannot add ZERO_ADDRESS"
 
     #Check that the guard we are swapping in is not on the list of guards already
-    assert NewGuardAddress not in self.LGov, "New Guard is already a Guard."
-
-    #Run through list of guards to find the index of the one we want to swap out
-    current_index: uint256 = 0 
-    for guard_addr in self.LGov:
-        if guard_addr == OldGuardAddress: break
-        current_index += 1
+    assert self.guard_index[NewGuardAddress] == 0, "New Guard is already a Guard."
 
     #Make sure that OldGuardAddress is a guard on the list of guards
-    assert OldGuardAddress == self.LGov[current_index], "OldGuardAddress not a current Guard."
+    current_index: uint256 = self.guard_index[OldGuardAddress]
+    assert current_index != 0, "OldGuardAddress not a current Guard."
 
-    #Replace OldGuardAddress with NewGuardAddress
-    self.LGov[current_index] = NewGuardAddress
+    #Replace OldGuardAddress with NewGuardAddress, in its vote slot without its votes
+    self.LGov[current_index - 1] = NewGuardAddress
+    self.guard_index[NewGuardAddress] = current_index
+    self.guard_index[OldGuardAddress] = 0
+    slot: uint256 = self.guard_vote_slot[OldGuardAddress]
+    self._free_vote_slot(OldGuardAddress)
+    self._assign_vote_slot(NewGuardAddress, slot)
 
     log GuardSwap(OldGuardAddress, NewGuardAddress)
 
@@ -447,13 +778,38 @@ def guards() -> DynArray[address, MAX_GUARDS]:
 @external
 @view
 def checkGuard(GuardAddress: address) -> bool:
-    return GuardAddress in self.LGov
+    return self.guard_index[GuardAddress] != 0
 
 
 @external
 @view
 def checkVault(VaultAddress: address) -> bool:
-    return VaultAddress in self.VaultList
+    return self.vault_index[VaultAddress] != 0
+
+
+@external
+@view
+def CurrentStrategyByVault(vault: address) -> Strategy:
+    index: uint256 = self.strategy_index[vault]
+    strat: Strategy = self._strategy(vault, index & 1)
+    strat.TActivated = index >> 8
+    return self._with_votes(strat, self.strategy_records[vault][index & 1].votes)
+
+
+@external
+@view
+def PendingStrategyByVault(vault: address) -> Strategy:
+    pending: uint256 = (self.strategy_index[vault] >> 1) & 1
+    return self._with_votes(self._strategy(vault, pending), self.strategy_records[vault][pending].votes)
+
+
+@external
+@view
+def NextNonceByVault(vault: address) -> uint256:
+    nonce: uint256 = self.strategy_records[vault][(self.strategy_index[vault] >> 1) & 1].terms & (2**64 - 1)
+    if nonce == 0:
+        return 0
+    return nonce + 1
 
 
 @external
@@ -470,13 +826,13 @@ def replaceGovernance(NewGovernance: address, vault: address):
     assert len(self.VaultList) > 0, "Cannot call Strategy function with no vault"
 
     #Check to see if vault is in vault list
-    assert vault in self.VaultList, "vault not in vault list!"  
+    assert self.vault_index[vault] != 0, "vault not in vault list!"  
 
     #Check if there are enough guards to change governance
     assert len(self.LGov) >= MIN_GUARDS
 
     #Check if sender is a guard
-    assert msg.sender in self.LGov
+    assert self.guard_index[msg.sender] != 0
 
     #Check if new contract address is not the current
     assert NewGovernance != self
@@ -523,10 +879,11 @@ def addVault(vault: address):
     assert vault != empty(address)
 
     # Must not already be in vault list
-    assert vault not in self.VaultList
+    assert self.vault_index[vault] == 0
 
     # Add vault to vault list
     self.VaultList.append(vault)
+    self.vault_index[vault] = len(self.VaultList)
 
     # Log new vault
     log NewVault(vault)
@@ -548,20 +905,19 @@ def removeVault(vault: address):
     # Correct size to zero offset position.
     last_vault -= 1
     
-    #Run through list of vaults to find the one we want to remove
-    current_vault: uint256 = 0
-    for vault_addr in self.VaultList:
-        if vault_addr == vault: break
-        current_vault += 1
-
     # Make sure that vault is the vault we want to remove from vault list
-    assert vault == self.VaultList[current_vault], "vault not a current vault."    
+    current_vault: uint256 = self.vault_index[vault]
+    assert current_vault != 0, "vault not a current vault."    
+    current_vault -= 1
 
     # Replace current vault with the last
-    self.VaultList[current_vault] = self.VaultList[last_vault]
+    moved_vault: address = self.VaultList[last_vault]
+    self.VaultList[current_vault] = moved_vault
+    self.vault_index[moved_vault] = current_vault + 1
 
     # Remove the last
     self.VaultList.pop()
+    self.vault_index[vault] = 0
 
     #Log Vault Removal
     log VaultRemoved(vault)
@@ -581,19 +937,16 @@ def swapVault(OldVaultAddress: address, NewVaultAddress: address):
     assert NewVaultAddress != empty(address)
 
     #Check that the vault we are swapping in is not on the list of vaults already
-    assert NewVaultAddress not in self.VaultList
-
-    #Run through list of vaults to find the one we want to swap out
-    current_vault: uint256 = 0 
-    for vault_addr in self.VaultList:
-        if vault_addr == OldVaultAddress: break
-        current_vault += 1
+    assert self.vault_index[NewVaultAddress] == 0
 
     #Make sure that OldVaultAddress is a vault on the list of vaults
-    assert OldVaultAddress == self.VaultList[current_vault]
+    current_vault: uint256 = self.vault_index[OldVaultAddress]
+    assert current_vault != 0
 
     #Replace OldVaultAddress with NewVaultAddress
-    self.VaultList[current_vault] = NewVaultAddress
+    self.VaultList[current_vault - 1] = NewVaultAddress
+    self.vault_index[NewVaultAddress] = current_vault
+    self.vault_index[OldVaultAddress] = 0
 
     # Log Vault Swap
     log VaultSwap(OldVaultAddress, NewVaultAddress)
@@ -110,7 +110,7 @@ interface PendleMarket:
 
 
 interface AdapterVault:
-    def deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256 = 0, pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])) -> uint256: nonpayable
+    def deposit(_asset_amount: uint256, _receiver: address, _min_shares : uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256: nonpayable
 
 event PTMigrated:
     user: indexed(address)
@@ -130,7 +130,6 @@ event Swapped:
 
 pendleRouter: immutable(address)
 uniSwapRouter: immutable(address)
-MAX_ADAPTERS : constant(uint256) = 5
 
 @external
 def __init__(_pendleRouter: address, _uniSwapRouter: address):
@@ -183,7 +182,7 @@ def zap_in_univ3(
     uni_minTokenOut: uint256,
     vault: address,
     min_shares: uint256,
-    pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])
+    pregen_info: Bytes[4096]=empty(Bytes[4096])
 ) -> uint256:
     """
     @notice This function provides a way to "migrate" users existing PT into AdapterVault of same asset
@@ -197,7 +196,7 @@ def zap_in_univ3(
     @param uni_minTokenOut Minimum amount of assets_out from uniswap
     @param vault The address of the AdapterVault we are depositing into
     @param min_shares Minmum number of shares that is acceptable. If 0 then apply MAX_SLIPPAGE_PERCENT % allowable slippage.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Share amount deposited to receiver
     @dev
         You would use pendle'2 REST API for limit order, and prepare pregen_info by calling each adapter.
@@ -251,7 +250,7 @@ def migrate(
     limit: LimitOrderData,
     vault: address,
     min_shares: uint256,
-    pregen_info: DynArray[Bytes[4096], MAX_ADAPTERS]=empty(DynArray[Bytes[4096], MAX_ADAPTERS])
+    pregen_info: Bytes[4096]=empty(Bytes[4096])
 ) -> uint256 :
     """
     @notice This function provides a way to "migrate" users existing PT into AdapterVault of same asset
@@ -261,7 +260,7 @@ def migrate(
     @param limit This could be populated from pendle's REST API for optimum trade fees.
     @param vault The address of the AdapterVault we are depositing into
     @param min_shares Minmum number of shares that is acceptable. If 0 then apply MAX_SLIPPAGE_PERCENT % allowable slippage.
-    @param pregen_info Optional list of bytes to be sent to each adapter. These are usually off-chain computed results which optimize the on-chain call
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
     @return Share amount deposited to receiver
     @dev
         You would use pendle'2 REST API for limit order, and prepare pregen_info by calling each adapter.
@@ -17,8 +17,10 @@ governance_impl: public(address)
 pendle_router: public(address)
 pendle_router_static: public(address)
 pendle_oracle: public(address)
+pendle_limit_router: public(address)
 
 MAX_ADAPTERS : constant(uint256) = 5
+MAX_VAULTS : constant(uint256) = 10
 
 event OwnerChanged:
     new_owner: indexed(address)
@@ -89,36 +91,40 @@ def update_governance(_governance_impl: address):
 
 @external
 @nonpayable
-def update_pendle_contracts(_pendle_router: address, _pendle_router_static: address, _pendle_oracle: address):
+def update_pendle_contracts(_pendle_router: address, _pendle_router_static: address, _pendle_oracle: address, _pendle_limit_router: address = empty(address)):
     assert msg.sender == self.owner, "Only owner can update contracts"
     self.pendle_router = _pendle_router
     self.pendle_router_static = _pendle_router_static
     self.pendle_oracle = _pendle_oracle
+    #Optional, adapters deployed without one reject limit orders in pregen_info
+    self.pendle_limit_router = _pendle_limit_router
 
 
-@external
-@nonpayable
-def deploy_pendle_vault(
-    _asset: address,
-    _pendle_market: address,
-    _name: String[64],
-    _symbol: String[32],
-    _decimals: uint8,
-    _max_slippage_percent: decimal,
-    _init_mint_amount: uint256
-    ) -> address:
-    """
-    @notice deploy a new AdapterVault with single adapter pointing to the mentioned pendle market
-    @param _asset the vault will be denominated in.
-    @param _pendle_market the vault will invest in
-    @param _name of shares token
-    @param _symbol identifier of shares token
-    @param _decimals increment for division of shares token 
-    @param _max_slippage_percent default maximum acceptable slippage for deposits/withdraws as a percentage
-    @param _init_mint_amount The amount asset to be deposited, and resulting shares burned.
-    """
+struct PendleVaultParams:
+    asset: address
+    pendle_market: address
+    name: String[64]
+    symbol: String[32]
+    decimals: uint8
+    max_slippage_percent: decimal
+    init_mint_amount: uint256
+
+struct FactoryConfig:
+    owner: address
+    adapter_vault_blueprint: address
+    pendle_adapter_blueprint: address
+    funds_allocator_impl: address
+    governance_impl: address
+    pendle_router: address
+    pendle_router_static: address
+    pendle_oracle: address
+    pendle_limit_router: address
+
+
+@internal
+@view
+def _deploy_config() -> FactoryConfig:
     assert msg.sender == self.owner, "Only owner may deploy a vault"
-    assert _init_mint_amount > 0, "Some amount shares must be burned"
 
     #more asserts to ensure required addresses have been populated
     assert self.adapter_vault_blueprint != empty(address), "adapter_vault_blueprint must be defined"
@@ -129,26 +135,44 @@ def deploy_pendle_vault(
     assert self.pendle_router_static != empty(address), "pendle_router_static must be defined"
     assert self.pendle_oracle != empty(address), "pendle_oracle must be defined"
 
+    return FactoryConfig({
+        owner: self.owner,
+        adapter_vault_blueprint: self.adapter_vault_blueprint,
+        pendle_adapter_blueprint: self.pendle_adapter_blueprint,
+        funds_allocator_impl: self.funds_allocator_impl,
+        governance_impl: self.governance_impl,
+        pendle_router: self.pendle_router,
+        pendle_router_static: self.pendle_router_static,
+        pendle_oracle: self.pendle_oracle,
+        pendle_limit_router: self.pendle_limit_router
+    })
+
+
+@internal
+def _deploy_pendle_vault(_config: FactoryConfig, _params: PendleVaultParams) -> address:
+    assert _params.init_mint_amount > 0, "Some amount shares must be burned"
+
     #deploy pendle adapter using blueprint
     adapter: address = create_from_blueprint(
-        self.pendle_adapter_blueprint,
-        _asset,
-        self.pendle_router,
-        self.pendle_router_static,
-        _pendle_market,
-        self.pendle_oracle,
+        _config.pendle_adapter_blueprint,
+        _params.asset,
+        _config.pendle_router,
+        _config.pendle_router_static,
+        _params.pendle_market,
+        _config.pendle_oracle,
+        _config.pendle_limit_router,
         code_offset=3
     )
     #deploy vault using blueprint
     vault: address = create_from_blueprint(
-        self.adapter_vault_blueprint,
-        _name,
-        _symbol,
-        _decimals,
-        _asset,
+        _config.adapter_vault_blueprint,
+        _params.name,
+        _params.symbol,
+        _params.decimals,
+        _params.asset,
         self,
-        self.funds_allocator_impl,
-        _max_slippage_percent,
+        _config.funds_allocator_impl,
+        _params.max_slippage_percent,
         code_offset=3
     )
     AdapterVault(vault).add_adapter(adapter)
@@ -158,23 +182,75 @@ def deploy_pendle_vault(
     strategy[0].ratio = 1
     AdapterVault(vault).set_strategy(msg.sender, strategy, 0)
     #mint some shares (take asset from owner)
-    ERC20(_asset).transferFrom(msg.sender, self, _init_mint_amount)
-    ERC20(_asset).approve(vault, _init_mint_amount)
+    ERC20(_params.asset).transferFrom(msg.sender, self, _params.init_mint_amount)
+    ERC20(_params.asset).approve(vault, _params.init_mint_amount)
     #Because of rounding issues
-    ERC4626(vault).deposit(ERC20(_asset).balanceOf(self), self)
+    ERC4626(vault).deposit(ERC20(_params.asset).balanceOf(self), self)
     #burn resulting shares
     ERC20(vault).transfer(empty(address), ERC20(vault).balanceOf(self))
     #assign governance contract
-    AdapterVault(vault).replaceGovernanceContract(self.governance_impl)
+    AdapterVault(vault).replaceGovernanceContract(_config.governance_impl)
     #Transfer ownership of vault to owner
-    AdapterVault(vault).replaceOwner(self.owner)
+    AdapterVault(vault).replaceOwner(_config.owner)
     #All done log it
     log PendleAdapterVaultDeployed(
         vault,
-        _asset,
-        _pendle_market,
-        self.adapter_vault_blueprint,
-        self.pendle_adapter_blueprint,
-        self.owner
+        _params.asset,
+        _params.pendle_market,
+        _config.adapter_vault_blueprint,
+        _config.pendle_adapter_blueprint,
+        _config.owner
     )
     return vault
+
+
+@external
+@nonpayable
+def deploy_pendle_vault(
+    _asset: address,
+    _pendle_market: address,
+    _name: String[64],
+    _symbol: String[32],
+    _decimals: uint8,
+    _max_slippage_percent: decimal,
+    _init_mint_amount: uint256
+    ) -> address:
+    """
+    @notice deploy a new AdapterVault with single adapter pointing to the mentioned pendle market
+    @param _asset the vault will be denominated in.
+    @param _pendle_market the vault will invest in
+    @param _name of shares token
+    @param _symbol identifier of shares token
+    @param _decimals increment for division of shares token 
+    @param _max_slippage_percent default maximum acceptable slippage for deposits/withdraws as a percentage
+    @param _init_mint_amount The amount asset to be deposited, and resulting shares burned.
+    """
+    return self._deploy_pendle_vault(
+        self._deploy_config(),
+        PendleVaultParams({
+            asset: _asset,
+            pendle_market: _pendle_market,
+            name: _name,
+            symbol: _symbol,
+            decimals: _decimals,
+            max_slippage_percent: _max_slippage_percent,
+            init_mint_amount: _init_mint_amount
+        })
+    )
+
+
+@external
+@nonpayable
+def deploy_pendle_vaults(_params: DynArray[PendleVaultParams, MAX_VAULTS]) -> DynArray[address, MAX_VAULTS]:
+    """
+    @notice deploy several AdapterVaults in one transaction, each with a single adapter pointing to its pendle market.
+            The factory configuration is read and checked once for the whole batch.
+    @param _params one PendleVaultParams per vault, same meaning as the arguments of deploy_pendle_vault
+    @return the deployed vault addresses, in the order of _params
+    """
+    assert len(_params) > 0, "No vaults to deploy"
+    config: FactoryConfig = self._deploy_config()
+    vaults: DynArray[address, MAX_VAULTS] = []
+    for params in _params:
+        vaults.append(self._deploy_pendle_vault(config, params))
+    return vaults
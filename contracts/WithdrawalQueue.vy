@@ -0,0 +1,213 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Adapter.FI Withdrawal Queue
+@license Copyright 2023, 2024 Biggest Lab Co Ltd, Benjamin Scherrey, Sajal Kayan, and Eike Caldeweyher
+@author BiggestLab (https://biggestlab.io) Benjamin Scherrey, Sajal Kayan
+@notice Asynchronous exits for an AdapterVault. Holders lock their shares in the current
+        epoch, a keeper redeems the whole epoch from the vault in a single transaction and
+        each holder then claims their pro-rata share of the assets received.
+"""
+from vyper.interfaces import ERC20
+
+interface AdapterVault:
+    def asset() -> address: view
+    def redeem(_share_amount: uint256, _receiver: address, _owner: address, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256: nonpayable
+
+vault: public(immutable(address))
+asset: public(immutable(address))
+
+owner: public(address)
+keeper: public(address)
+
+struct Epoch:
+    shares: uint256
+    assets: uint256
+
+# Requests are collected in current_epoch. Every epoch below it has been settled.
+current_epoch: public(uint256)
+epochs: public(HashMap[uint256, Epoch])
+requests: public(HashMap[address, HashMap[uint256, uint256]]) # owner -> epoch -> shares
+
+
+event WithdrawRequested:
+    owner: indexed(address)
+    epoch: indexed(uint256)
+    shares: uint256
+
+event WithdrawCancelled:
+    owner: indexed(address)
+    epoch: indexed(uint256)
+    shares: uint256
+
+event EpochSettled:
+    epoch: indexed(uint256)
+    shares: uint256
+    assets: uint256
+
+event WithdrawClaimed:
+    owner: indexed(address)
+    receiver: indexed(address)
+    epoch: indexed(uint256)
+    assets: uint256
+
+event OwnerChanged:
+    new_owner: indexed(address)
+    old_owner: indexed(address)
+
+event KeeperChanged:
+    new_keeper: indexed(address)
+    old_keeper: indexed(address)
+
+
+@external
+def __init__(_vault: address, _keeper: address):
+    """
+    @notice Constructor for the withdrawal queue of a single AdapterVault.
+    @param _vault AdapterVault whose shares are queued.
+    @param _keeper address allowed to settle epochs alongside the owner.
+    """
+    vault = _vault
+    asset = AdapterVault(_vault).asset()
+    self.owner = msg.sender
+    self.keeper = _keeper
+
+
+@external
+def replaceOwner(_new_owner: address) -> bool:
+    """
+    @notice replace the current owner with a new one.
+    @param _new_owner address of the new contract owner
+    @return True, if contract owner was replaced
+    """
+    assert msg.sender == self.owner, "Only existing owner can replace the owner."
+    assert _new_owner != empty(address), "Owner cannot be null address."
+
+    log OwnerChanged(_new_owner, self.owner)
+
+    self.owner = _new_owner
+
+    return True
+
+
+@external
+def replaceKeeper(_new_keeper: address) -> bool:
+    """
+    @notice replace the keeper allowed to settle epochs.
+    @param _new_keeper address of the new keeper, may be empty to leave settling to the owner.
+    @return True, if keeper was replaced
+    """
+    assert msg.sender == self.owner, "Only owner can replace the keeper."
+
+    log KeeperChanged(_new_keeper, self.keeper)
+
+    self.keeper = _new_keeper
+
+    return True
+
+
+@external
+def requestWithdraw(_shares: uint256) -> uint256:
+    """
+    @notice locks vault shares in the current epoch until it is settled.
+    @param _shares quantity of vault shares to exit. The queue must be approved to move them.
+    @return epoch the request was added to
+    """
+    assert _shares > 0, "Cannot request zero shares."
+
+    ERC20(vault).transferFrom(msg.sender, self, _shares)
+
+    epoch : uint256 = self.current_epoch
+    self.requests[msg.sender][epoch] += _shares
+    self.epochs[epoch].shares += _shares
+
+    log WithdrawRequested(msg.sender, epoch, _shares)
+
+    return epoch
+
+
+@external
+def cancelWithdraw(_shares: uint256) -> uint256:
+    """
+    @notice returns shares requested in the current epoch before it is settled.
+    @param _shares quantity of vault shares to take back.
+    @return shares still requested in the current epoch
+    """
+    epoch : uint256 = self.current_epoch
+    requested : uint256 = self.requests[msg.sender][epoch]
+    assert requested >= _shares, "Not enough shares requested."
+
+    self.requests[msg.sender][epoch] = requested - _shares
+    self.epochs[epoch].shares -= _shares
+
+    ERC20(vault).transfer(msg.sender, _shares)
+
+    log WithdrawCancelled(msg.sender, epoch, _shares)
+
+    return requested - _shares
+
+
+@external
+def settle(_min_assets: uint256 = 0, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256:
+    """
+    @notice redeems every share requested in the current epoch with a single vault redeem and opens the next epoch.
+    @param _min_assets Minimum assets that must be returned for the whole epoch (due to slippage) or else reverts. The vault's own MAX_SLIPPAGE_PERCENT % check always applies.
+    @param pregen_info Optional bytes for the adapters packed as (adapter index, length, payload) entries. These are usually off-chain computed results which optimize the on-chain call
+    @return assets received for the epoch
+    """
+    assert msg.sender == self.owner or msg.sender == self.keeper, "Only owner or keeper can settle."
+
+    epoch : uint256 = self.current_epoch
+    shares : uint256 = self.epochs[epoch].shares
+    assert shares > 0, "Nothing to settle."
+
+    assets : uint256 = AdapterVault(vault).redeem(shares, self, self, pregen_info)
+    assert assets >= _min_assets, "Slippage exceeded!"
+
+    self.epochs[epoch].assets = assets
+    self.current_epoch = epoch + 1
+
+    log EpochSettled(epoch, shares, assets)
+
+    return assets
+
+
+@external
+@view
+def claimable(_owner: address, _epoch: uint256) -> uint256:
+    """
+    @notice assets _owner can claim from a settled _epoch.
+    @param _owner address that requested the withdraw
+    @param _epoch epoch the request was made in
+    @return claimable assets, zero if the epoch is not settled yet
+    """
+    if _epoch >= self.current_epoch:
+        return 0
+    settled : Epoch = self.epochs[_epoch]
+    return self.requests[_owner][_epoch] * settled.assets / settled.shares
+
+
+@external
+def claim(_epoch: uint256, _receiver: address) -> uint256:
+    """
+    @notice sends the caller's pro-rata share of a settled epoch's assets to _receiver.
+    @param _epoch epoch the request was made in
+    @param _receiver address to receive the assets
+    @return assets transferred
+    @dev Rounding leaves at most a few wei per epoch behind in the queue.
+    """
+    assert _epoch < self.current_epoch, "Epoch not settled yet."
+    assert _receiver != empty(address), "Receiver cannot be zero."
+
+    shares : uint256 = self.requests[msg.sender][_epoch]
+    assert shares > 0, "Nothing to claim."
+    self.requests[msg.sender][_epoch] = 0
+
+    settled : Epoch = self.epochs[_epoch]
+    assets : uint256 = shares * settled.assets / settled.shares
+
+    ERC20(asset).transfer(_receiver, assets, default_return_value=True)
+
+    log WithdrawClaimed(msg.sender, _receiver, _epoch, assets)
+
+    return assets
@@ -29,6 +29,8 @@ def maxDeposit() -> uint256:
     """
     @notice returns the maximum possible asset amount thats depositable to this adapter
     @dev
+        Returning zero (e.g. a matured market) also ranks this adapter first when
+        the vault needs to raise funds, withdrawals from it being the cheapest.
         This method returns a valid response if it has been DELEGATECALL or 
         STATICCALL-ed from the AdapterVault contract it services. It is not intended
         to be called directly by third parties.
@@ -49,6 +51,27 @@ def totalAssets() -> uint256:
     return 0
 
 
+# Snapshot of the above three values in a single call.
+@external
+@nonpayable
+def state() -> (uint256, uint256, uint256):
+    """
+    @notice returns (totalAssets, maxWithdraw, maxDeposit) in a single call.
+    @dev
+        Lets the vault gather an adapter's balancing state with one external
+        call instead of three. The vault falls back to the individual calls
+        for adapters deployed before this method existed.
+        The vault DELEGATECALLs this method, so it runs with the vault's
+        storage: self and balances are the vault's, and any write lands in
+        the vault. It may only write (namespaced) transient storage, e.g. to
+        memoize an expensive lookup for the rest of the transaction.
+        This method returns a valid response if it has been DELEGATECALL-ed
+        from the AdapterVault contract it services. It is not intended to be
+        called directly by third parties.
+    """
+    return 0, max_value(uint256), max_value(uint256)
+
+
 # Deposit the asset into underlying LP. The tokens must be present inside the 4626 vault.
 @external
 def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
@@ -93,6 +93,12 @@ def totalAssets() -> uint256:
     return ERC20(aoriginalAsset).balanceOf(adapterLPAddr)
 
 
+@external
+@nonpayable
+def state() -> (uint256, uint256, uint256):
+    return ERC20(aoriginalAsset).balanceOf(adapterLPAddr), max_value(uint256), max_value(uint256)
+
+
 # Deposit the asset into underlying LP. The tokens must be present inside the 4626 vault.
 @external
 @nonpayable
@@ -0,0 +1,76 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@notice MockLPAdapter that only accepts the pregen_info it was constructed with,
+        used to check what the vault hands each adapter.
+"""
+
+from vyper.interfaces import ERC20
+from IAdapter import IAdapter as IAdapter
+
+implements: IAdapter
+
+aoriginalAsset: immutable(address)
+awrappedAsset: immutable(address)
+adapterLPAddr: immutable(address)
+expectedPregenInfo: immutable(Bytes[64])
+
+
+@external
+def __init__(_originalAsset: address, _wrappedAsset: address, _expectedPregenInfo: Bytes[64]):
+    aoriginalAsset = _originalAsset
+    awrappedAsset = _wrappedAsset
+    adapterLPAddr = self
+    expectedPregenInfo = _expectedPregenInfo
+
+
+@external
+@view
+def maxWithdraw() -> uint256:
+    return max_value(uint256)
+
+
+@external
+@view
+def maxDeposit() -> uint256:
+    return max_value(uint256)
+
+
+@external
+@view
+def totalAssets() -> uint256:
+    return ERC20(aoriginalAsset).balanceOf(adapterLPAddr)
+
+
+@external
+@nonpayable
+def state() -> (uint256, uint256, uint256):
+    return ERC20(aoriginalAsset).balanceOf(adapterLPAddr), max_value(uint256), max_value(uint256)
+
+
+@external
+@nonpayable
+def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
+    assert keccak256(pregen_info) == keccak256(expectedPregenInfo), "UNEXPECTED PREGEN INFO!"
+    ERC20(aoriginalAsset).transfer(adapterLPAddr, asset_amount, default_return_value=True)
+
+
+@external
+@nonpayable
+def withdraw(asset_amount: uint256 , withdraw_to: address, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256 :
+    assert keccak256(pregen_info) == keccak256(expectedPregenInfo), "UNEXPECTED PREGEN INFO!"
+    ERC20(aoriginalAsset).transferFrom(adapterLPAddr, withdraw_to, asset_amount, default_return_value=True)
+    return asset_amount
+
+
+@external
+def claimRewards(claimant: address):
+    pass
+
+
+@external
+@view
+def managed_tokens() -> DynArray[address, 10]:
+    ret: DynArray[address, 10] = empty(DynArray[address, 10])
+    ret.append(awrappedAsset)
+    return ret
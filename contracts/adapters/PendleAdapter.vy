@@ -63,19 +63,38 @@ struct FillOrderParams:
     signature: Bytes[100]
     makingAmount: uint256
 
+#Per kind of fill. Limit orders ride after the fixed size pregen_info (see PregenInfo) so
+#they get the rest of its Bytes[4096]: 3 fills with permit and signature at their bounds,
+#all 4 with the usual empty permit and 65 byte signature.
+MAX_LIMIT_FILLS: constant(uint256) = 2
+
 struct LimitOrderData:
     limitRouter: address
     epsSkipMarket: uint256
-    normalFills: DynArray[FillOrderParams,1]
-    flashFills: DynArray[FillOrderParams,1]
+    normalFills: DynArray[FillOrderParams,MAX_LIMIT_FILLS]
+    flashFills: DynArray[FillOrderParams,MAX_LIMIT_FILLS]
     optData: Bytes[100]
 
-struct PregenInfo: #13 words, so 416 bytes. Is there need to compress this for l2? future optimization.
+#Deposit pregen_info is _abi_encode(PregenInfo), optionally followed by _abi_encode(LimitOrderData)
+#with the limit orders to fill ahead of the AMM in the swapExactTokenForPt leg. Leave the
+#LimitOrderData out to only use the AMM.
+struct PregenInfo: #14 words (448 bytes). Is there need to compress this for l2? future optimization.
     assumed_asset_amount: uint256 #What asset amount is the below data corresponding to. Doesnt need to be exact
     mint_returns: uint256 #Expected PT gained when converting assumed_asset_amount to PT using mint method
     spot_returns: uint256 #Expected PT gained when converting assumed_asset_amount to PT using AMM method
     approx_params_swapExactYtForPt: ApproxParams #ApproxParams for swapping YT to PT (needed if deposit using mint method)
     approx_params_swapExactTokenForPt: ApproxParams #ApproxParams for swapping token to PT (needed if deposit using AMM method)
+    mint_fraction: uint256 #Share of the deposit (1e18 based) sent through the mint method, the rest goes through the AMM. Each leg uses its own ApproxParams above
+
+PREGEN_INFO_SIZE: constant(uint256) = 448
+
+#Withdraw pregen_info is _abi_encode(WithdrawPregenInfo), optionally followed by
+#_abi_encode(LimitOrderData) with the limit orders to fill ahead of the AMM when selling PT.
+struct WithdrawPregenInfo: #2 words (64 bytes)
+    assumed_asset_amount: uint256 #What asset amount is the below data corresponding to. Doesnt need to be exact, pt_amount is scaled to the actual amount
+    pt_amount: uint256 #PT to sell (or redeem once matured) to get exactly assumed_asset_amount, replaces the oracle based estimate
+
+WITHDRAW_PREGEN_INFO_SIZE: constant(uint256) = 64
 
 
 interface PendleRouter:
@@ -113,6 +132,7 @@ interface SYToken:
     def previewDeposit(tokenIn: address, amountTokenToDeposit: uint256) -> uint256: view
     def previewRedeem(tokenOut: address, amountSharesToRedeem: uint256) -> uint256: view
     def exchangeRate() -> uint256: view
+    def assetInfo() -> (uint8, address, uint8): view
     def deposit(receiver: address, tokenIn: address, amountTokenToDeposit: uint256, minSharesOut: uint256) -> uint256: nonpayable
 
 interface YieldToken:
@@ -129,17 +149,35 @@ implements: IAdapter
 
 ONE: constant(uint256) = 10**18
 TWAP_DURATION: constant(uint32) = 1200
+#A withdraw pregen_info may sell at most this much (1e18 based) more PT than the oracle
+#estimate, the vault's default slippage allowance.
+MAX_PREGEN_PT_EXCESS: constant(uint256) = 2 * 10**16
 asset: immutable(address)
 pendleRouter: immutable(address)
 pendleRouterStatic: immutable(address)
 pendleMarket: immutable(address)
 pendleOracle: immutable(address)
+#The router hands our tokens to the limitRouter of any LimitOrderData it gets, pregen_info
+#may only name this one. Empty disables limit orders.
+pendleLimitRouter: immutable(address)
 pt_token: immutable(address)
 yt_token: immutable(address)
 sy_token: immutable(address)
 adapterAddr: immutable(address)
 #Its immutable in pendle so we cache it here for cheaper access
 expiry: immutable(uint256)
+#True when asset is the SY's accounting asset (assetInfo), SY <-> asset is then just
+#SY.exchangeRate() and the previewDeposit/previewRedeem calls can be skipped.
+exchange_rate_conversion: immutable(bool)
+
+#Per-transaction memo of the PT rate: PT to asset when exchange_rate_conversion is set (the
+#SY exchange rate folded in), otherwise PT to SY. We run inside the vault via DELEGATECALL
+#so these slots live in the vault's transient storage, the key is namespaced by market to avoid
+#colliding with the vault's own transient variables or with other adapters.
+#Values are packed as (block.timestamp << 192) | rate.
+rate_cache_key: immutable(bytes32)
+pt_rate_cache: transient(HashMap[bytes32, uint256])
+RATE_MASK: constant(uint256) = 2**192 - 1
 
 @external
 def __init__(
@@ -147,7 +185,8 @@ def __init__(
     _pendleRouter: address,
     _pendleRouterStatic: address,
     _pendleMarket: address,
-    _pendleOracle: address
+    _pendleOracle: address,
+    _pendleLimitRouter: address
     ):
     _sy: address = empty(address)
     _pt: address = empty(address)
@@ -159,11 +198,19 @@ def __init__(
     yt_token = _yt
     asset = _asset
     pendleOracle = _pendleOracle
+    pendleLimitRouter = _pendleLimitRouter
     pendleRouter = _pendleRouter
     pendleRouterStatic = _pendleRouterStatic
     pendleMarket = _pendleMarket
     adapterAddr = self
     expiry = PendleMarket(_pendleMarket).expiry()
+    rate_cache_key = keccak256(concat(b"PendleAdapter.pt_to_sy_rate", convert(_pendleMarket, bytes20)))
+
+    asset_type: uint8 = 0
+    sy_asset: address = empty(address)
+    asset_decimals: uint8 = 0
+    asset_type, sy_asset, asset_decimals = SYToken(_sy).assetInfo()
+    exchange_rate_conversion = sy_asset == _asset
 
     #Check oracle's cardinality
     increaseCardinalityRequired: bool= False
@@ -200,22 +247,76 @@ def sy_to_asset(sy_amount: uint256) -> uint256:
 
 @internal
 @view
-def assetToPT(asset_amount: uint256) -> uint256:
+def fetchPtRate() -> uint256:
+    if self.is_matured():
+        #Redemption is fixed, no need for the TWAP. Each PT redeems for 1/pyIndex SY, where
+        #pyIndex is the larger of the SY exchange rate and the YT's stored index (same as
+        #pendle's oracle lib).
+        exchange_rate: uint256 = SYToken(sy_token).exchangeRate()
+        py_index: uint256 = max(exchange_rate, YieldToken(yt_token).pyIndexStored())
+        if exchange_rate_conversion:
+            return (exchange_rate * ONE) / py_index
+        return (ONE * ONE) / py_index
+    rate: uint256 = PendlePtLpOracle(pendleOracle).getPtToSyRate(pendleMarket, TWAP_DURATION)
+    if exchange_rate_conversion:
+        return (rate * SYToken(sy_token).exchangeRate()) / ONE
+    return rate
+
+@internal
+@view
+def ptRate() -> uint256:
+    #The TWAP cannot move within a block (observations are time weighted) and nothing
+    #we do moves the SY exchange rate, so a value memoized earlier in this transaction is exact.
+    cached: uint256 = self.pt_rate_cache[rate_cache_key]
+    if cached >> 192 == block.timestamp:
+        return cached & RATE_MASK
+    return self.fetchPtRate()
+
+@internal
+def cachedPtRate() -> uint256:
+    #Same as ptRate but remembers the result for the rest of the transaction.
+    cached: uint256 = self.pt_rate_cache[rate_cache_key]
+    if cached >> 192 == block.timestamp:
+        return cached & RATE_MASK
+    rate: uint256 = self.fetchPtRate()
+    if self != adapterAddr:
+        #Only memoize inside the vault's DELEGATECALL, a direct call may be a STATICCALL.
+        self.pt_rate_cache[rate_cache_key] = (block.timestamp << 192) | rate
+    return rate
+
+@internal
+@view
+def decode_limit(pregen_info: Bytes[4096], head_size: uint256) -> LimitOrderData:
+    #Limit orders trailing the fixed size part of pregen_info, if any
+    if len(pregen_info) == head_size:
+        return empty(LimitOrderData)
+    limit: LimitOrderData = _abi_decode(slice(pregen_info, head_size, len(pregen_info) - head_size), LimitOrderData)
+    if limit.limitRouter != empty(address):
+        assert limit.limitRouter == pendleLimitRouter, "limitRouter not allowed"
+    return limit
+
+@internal
+@view
+def assetToPT(asset_amount: uint256, rate: uint256) -> uint256:
     if asset_amount == 0:
         #optimization for empty adapter
         return 0
+    if exchange_rate_conversion:
+        #rate is already PT to asset, see fetchPtRate
+        return (asset_amount * ONE) / rate
     sy_amount: uint256 = self.asset_to_sy(asset_amount)
-    rate: uint256 = PendlePtLpOracle(pendleOracle).getPtToSyRate(pendleMarket, TWAP_DURATION)
     pt: uint256 = (sy_amount * ONE) / rate
     return pt
 
 @internal
 @view
-def PTToAsset(pt: uint256) -> uint256:
+def PTToAsset(pt: uint256, rate: uint256) -> uint256:
     if pt == 0 :
         #optimization for empty adapter
         return 0
-    rate: uint256 = PendlePtLpOracle(pendleOracle).getPtToSyRate(pendleMarket, TWAP_DURATION)
+    if exchange_rate_conversion:
+        #rate is already PT to asset, see fetchPtRate
+        return (pt * rate) / ONE
     sy_amount: uint256 = (pt * rate) / ONE
     return self.sy_to_asset(sy_amount)
 
@@ -230,7 +331,10 @@ def is_matured() -> bool:
 @view
 def _assetBalance() -> uint256:
     wrappedBalance: uint256 = ERC20(pt_token).balanceOf(self.vault_location()) #aToken
-    unWrappedBalance: uint256 = self.PTToAsset(wrappedBalance) #asset
+    if wrappedBalance == 0:
+        #optimization for empty adapter
+        return 0
+    unWrappedBalance: uint256 = self.PTToAsset(wrappedBalance, self.ptRate()) #asset
     return unWrappedBalance
 
 
@@ -275,6 +379,27 @@ def totalAssets() -> uint256:
     return self._assetBalance()
 
 
+@external
+@nonpayable
+def state() -> (uint256, uint256, uint256):
+    """
+    @notice returns (totalAssets, maxWithdraw, maxDeposit) in a single call.
+    @dev
+        totalAssets and maxWithdraw are the same value for Pendle, so the
+        PT balance and oracle are only queried once. The oracle rate is
+        memoized for the rest of the transaction, along with the SY exchange
+        rate where that is all it takes to convert SY to asset. Once matured
+        the oracle is skipped and the SY/YT index is used instead.
+    """
+    balance: uint256 = 0
+    pt: uint256 = ERC20(pt_token).balanceOf(self.vault_location())
+    if pt > 0:
+        balance = self.PTToAsset(pt, self.cachedPtRate())
+    if self.is_matured():
+        return balance, balance, 0
+    return balance, balance, max_value(uint256)
+
+
 @internal
 @view
 def estimate_spot_returns(asset_amount: uint256) -> uint256:
@@ -326,8 +451,10 @@ def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
         called directly by third parties.
     """
     pg: PregenInfo = empty(PregenInfo)
+    limit: LimitOrderData = empty(LimitOrderData)
     if len(pregen_info) > 0:
-        pg = _abi_decode(pregen_info, PregenInfo)
+        pg = _abi_decode(slice(pregen_info, 0, PREGEN_INFO_SIZE), PregenInfo)
+        limit = self.decode_limit(pregen_info, PREGEN_INFO_SIZE)
     else:
         #Info not provided, compute it expensively
         pg.approx_params_swapExactYtForPt = self.default_approx_params()
@@ -338,18 +465,23 @@ def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
         #we already paid the tax... why not reuse it...
         pg.approx_params_swapExactTokenForPt.guessOffchain = pg.spot_returns
         pg.approx_params_swapExactYtForPt.guessOffchain = ytToPTL
+        #All or nothing, only an off-chain search can find a better split
+        if pg.mint_returns > pg.spot_returns:
+            pg.mint_fraction = ONE
 
-    #mint if minting price is better, then sell the YT.
-    if pg.mint_returns > pg.spot_returns:
+    #Split the deposit between minting (then selling the YT) and the AMM.
+    mint_amount: uint256 = asset_amount * min(pg.mint_fraction, ONE) / ONE
+    swap_amount: uint256 = asset_amount - mint_amount
+
+    if mint_amount > 0:
         #Mint PY
         inp: TokenInput = empty(TokenInput)
         inp.tokenIn = asset
-        inp.netTokenIn = asset_amount
+        inp.netTokenIn = mint_amount
         inp.tokenMintSy = asset
-
         netPyOut: uint256 = 0
         netSyInterm: uint256 = 0
-        ERC20(asset).approve(pendleRouter, asset_amount)
+        ERC20(asset).approve(pendleRouter, mint_amount)
         #Mint PY+PT using asset
         netPyOut, netSyInterm = PendleRouter(pendleRouter).mintPyFromToken(
             self,
@@ -369,15 +501,14 @@ def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
             pg.approx_params_swapExactYtForPt
         )
 
-    else:
+    if swap_amount > 0:
         #swapExactTokenForPt
         inp: TokenInput = empty(TokenInput)
         inp.tokenIn = asset
-        inp.netTokenIn = asset_amount
+        inp.netTokenIn = swap_amount
         inp.tokenMintSy = asset
 
-        limit: LimitOrderData = empty(LimitOrderData)
-        ERC20(asset).approve(pendleRouter, asset_amount)
+        ERC20(asset).approve(pendleRouter, swap_amount)
         PendleRouter(pendleRouter).swapExactTokenForPt(
             self,
             pendleMarket,
@@ -397,17 +528,30 @@ def withdraw(asset_amount: uint256 , withdraw_to: address, pregen_info: Bytes[40
     @notice withdraw asset from AAVE.
     @param asset_amount The amount of asset we want to withdraw from Pendle
     @param withdraw_to The ultimate reciepent of the withdrawn assets
-    @param pregen_info optional argument of data computed off-chain to optimize the on-chain call
+    @param pregen_info optional ABI encoded WithdrawPregenInfo (plus trailing limit orders) computed off-chain, sizes the PT sold (capped near the oracle estimate) and can route through limit orders
     @dev
         This method is only valid if it has been DELEGATECALL-ed
         from the AdapterVault contract it services. It is not intended to be
         called directly by third parties.
     """
-    #NOTE: accepting pregen_info to satisfy the interface, but there is no need for
-    #it during withdraw, unless we find an alternate withdrawal method.
+    pt_amount: uint256 = 0
+    limit: LimitOrderData = empty(LimitOrderData)
+    #Compute the amount of PT we must consume based on oracle (or the redemption rate once matured)
+    pt_estimate: uint256 = self.assetToPT(asset_amount, self.cachedPtRate())
+    if len(pregen_info) > 0:
+        #Precomputed off-chain, it may account for the price impact the oracle doesn't see
+        wp: WithdrawPregenInfo = _abi_decode(slice(pregen_info, 0, WITHDRAW_PREGEN_INFO_SIZE), WithdrawPregenInfo)
+        pt_amount = wp.pt_amount
+        if wp.assumed_asset_amount > 0:
+            pt_amount = pt_amount * asset_amount / wp.assumed_asset_amount
+        #Anyone withdrawing can pass pregen_info, dont let it sell the vault's PT much below the oracle
+        pt_amount = min(pt_amount, pt_estimate * (ONE + MAX_PREGEN_PT_EXCESS) / ONE)
+        #Cant sell what we dont have, anything short shows up as slippage to the vault
+        pt_amount = min(pt_amount, ERC20(pt_token).balanceOf(self))
+        limit = self.decode_limit(pregen_info, WITHDRAW_PREGEN_INFO_SIZE)
+    else:
+        pt_amount = pt_estimate
 
-    #Compute the amount of PT we must consume based on oracle
-    pt_amount: uint256 = self.assetToPT(asset_amount)
     amount_withdrawn: uint256 = 0
     if self.is_matured():
         #redeemPyToToken
@@ -436,8 +580,6 @@ def withdraw(asset_amount: uint256 , withdraw_to: address, pregen_info: Bytes[40
         out.minTokenOut = 0 #remember slippage protection is by the vault
         out.tokenRedeemSy = asset
 
-        limit: LimitOrderData = empty(LimitOrderData)
-
         #positive yield needs to goto the vault, check note above for optimization
         netTokenOut: uint256 = 0
         netSyFee: uint256 = 0
@@ -493,6 +635,22 @@ def abi_helper() -> PregenInfo:
     """
     return empty(PregenInfo)
 
+@external
+@view
+def withdraw_abi_helper() -> WithdrawPregenInfo:
+    """
+    @notice This is just here so the WithdrawPregenInfo struct is visible in ABI
+    """
+    return empty(WithdrawPregenInfo)
+
+@external
+@view
+def limit_abi_helper() -> LimitOrderData:
+    """
+    @notice This is just here so the LimitOrderData struct that may trail a pregen_info is visible in ABI
+    """
+    return empty(LimitOrderData)
+
 @external
 @view
 def generate_pregen_info(asset_amount: uint256) -> Bytes[4096]:
@@ -518,6 +676,9 @@ def generate_pregen_info(asset_amount: uint256) -> Bytes[4096]:
     pg.approx_params_swapExactTokenForPt = self.default_approx_params()
     pg.approx_params_swapExactYtForPt.guessOffchain = ytToPT
     pg.approx_params_swapExactTokenForPt.guessOffchain = pg.spot_returns
+    #Whole amount through the better method, deployment/pendle_pregen.py can search for a split
+    if pg.mint_returns > pg.spot_returns:
+        pg.mint_fraction = ONE
 
     return _abi_encode(pg)
 
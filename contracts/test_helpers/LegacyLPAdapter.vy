@@ -0,0 +1,62 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+
+# Mirrors MockLPAdapter as it was before IAdapter.state() existed. Used to
+# verify the vault still works with adapters that don't implement it.
+
+from vyper.interfaces import ERC20
+
+aoriginalAsset: immutable(address)
+awrappedAsset: immutable(address)
+adapterLPAddr: immutable(address)
+
+
+@external
+def __init__(_originalAsset: address, _wrappedAsset: address):
+    aoriginalAsset = _originalAsset
+    awrappedAsset = _wrappedAsset
+    adapterLPAddr = self
+
+
+@external
+@view
+def maxWithdraw() -> uint256: 
+    return max_value(uint256)
+
+
+@external
+@view
+def maxDeposit() -> uint256: 
+    return max_value(uint256)
+
+
+@external
+@view
+def totalAssets() -> uint256:
+    return ERC20(aoriginalAsset).balanceOf(adapterLPAddr)
+
+
+@external
+@nonpayable
+def deposit(asset_amount: uint256, pregen_info: Bytes[4096]=empty(Bytes[4096])):
+    ERC20(aoriginalAsset).transfer(adapterLPAddr, asset_amount, default_return_value=True)
+
+
+@external
+@nonpayable
+def withdraw(asset_amount: uint256 , withdraw_to: address, pregen_info: Bytes[4096]=empty(Bytes[4096])) -> uint256 :
+    ERC20(aoriginalAsset).transferFrom(adapterLPAddr, withdraw_to, asset_amount, default_return_value=True)
+    return asset_amount
+
+
+@external
+def claimRewards(claimant: address):
+    pass
+
+
+@external
+@view
+def managed_tokens() -> DynArray[address, 10]:
+    ret: DynArray[address, 10] = empty(DynArray[address, 10])
+    ret.append(awrappedAsset)
+    return ret
@@ -0,0 +1,90 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle limit router
+@dev
+    Stand-in for Pendle's LimitRouter, for offline tests. Rather than matching signed orders
+    against their makers it is the maker of every order: it trades the PT and SY it holds at
+    pt_price SY per PT, whatever the order says. Only PT_FOR_SY and SY_FOR_PT orders, and no
+    signature, expiry or nonce checks.
+"""
+
+from vyper.interfaces import ERC20
+
+struct Order:
+    salt: uint256
+    expiry: uint256
+    nonce: uint256
+    orderType: uint8
+    token: address
+    YT: address
+    maker: address
+    receiver: address
+    makingAmount: uint256
+    lnImpliedRate: uint256
+    failSafeRate: uint256
+    permit: Bytes[100]
+
+struct FillOrderParams:
+    order: Order
+    signature: Bytes[100]
+    makingAmount: uint256
+
+interface YieldToken:
+    def SY() -> address: view
+    def PT() -> address: view
+
+ONE: constant(uint256) = 10**18
+#Pendle's OrderType, named after what the maker swaps for what
+SY_FOR_PT: constant(uint8) = 0
+PT_FOR_SY: constant(uint8) = 1
+
+owner: address
+pt_price: public(uint256)
+
+
+@external
+def __init__(_pt_price: uint256):
+    self.owner = msg.sender
+    self.pt_price = _pt_price
+
+
+@external
+def set_pt_price(_pt_price: uint256):
+    assert msg.sender == self.owner, "only owner can set pt price"
+    self.pt_price = _pt_price
+
+
+@external
+def fill(params: DynArray[FillOrderParams, 2], receiver: address, maxTaking: uint256) -> (uint256, uint256):
+    """
+    @notice fills params for up to maxTaking, pulling the taken tokens from msg.sender and
+            sending the made ones to receiver.
+    @return (made, taken)
+    """
+    actual_making: uint256 = 0
+    actual_taking: uint256 = 0
+    for p in params:
+        assert p.order.orderType == SY_FOR_PT or p.order.orderType == PT_FOR_SY, "order type not supported"
+        #SY_FOR_PT: the maker gives SY for PT
+        maker_sells_pt: bool = p.order.orderType == PT_FOR_SY
+        #Taken per unit made
+        price: uint256 = ONE * ONE / self.pt_price
+        token_made: address = YieldToken(p.order.YT).SY()
+        token_taken: address = YieldToken(p.order.YT).PT()
+        if maker_sells_pt:
+            price = self.pt_price
+            token_made = token_taken
+            token_taken = YieldToken(p.order.YT).SY()
+
+        making: uint256 = p.makingAmount
+        taking: uint256 = making * price / ONE
+        if actual_taking + taking > maxTaking:
+            #Partial fill
+            taking = maxTaking - actual_taking
+            making = taking * ONE / price
+        ERC20(token_taken).transferFrom(msg.sender, self, taking)
+        ERC20(token_made).transfer(receiver, making)
+        actual_making += making
+        actual_taking += taking
+    return actual_making, actual_taking
@@ -0,0 +1,181 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle market
+@dev
+    Stand-in for a Pendle PT/SY market, for offline tests. Instead of Pendle's logit curve it is
+    a constant product pool (PT reserve * SY reserve) with a fee taken from the input, so the
+    PT price in SY is total_sy / total_pt and trades move it. Like Pendle, trading stops at
+    expiry and inputs are pushed to the market before a swap. swapSyForExactPt hands the PT out
+    first and collects the SY through the caller's swapCallback, as the router needs for
+    swapExactYtForPt.
+"""
+
+from vyper.interfaces import ERC20
+
+interface PendleSwapCallback:
+    def swapCallback(ptToAccount: int256, syToAccount: int256, data: Bytes[256]): nonpayable
+
+ONE: constant(uint256) = 10**18
+FEE_DENOMINATOR: constant(uint256) = 10000
+MAX_REWARD_TOKENS: constant(uint256) = 20
+
+SY: immutable(address)
+PT: immutable(address)
+YT: immutable(address)
+expiry: public(immutable(uint256))
+fee_bps: public(uint256)
+owner: address
+
+total_pt: public(uint256)
+total_sy: public(uint256)
+
+reward_tokens: DynArray[address, MAX_REWARD_TOKENS]
+pending_rewards: HashMap[address, HashMap[address, uint256]]
+
+
+@external
+def __init__(_sy: address, _pt: address, _yt: address, _expiry: uint256, _fee_bps: uint256):
+    SY = _sy
+    PT = _pt
+    YT = _yt
+    expiry = _expiry
+    self.fee_bps = _fee_bps
+    self.owner = msg.sender
+
+
+@external
+@view
+def readTokens() -> (address, address, address):
+    return SY, PT, YT
+
+
+@internal
+@view
+def _isExpired() -> bool:
+    return expiry <= block.timestamp
+
+
+@external
+@view
+def isExpired() -> bool:
+    return self._isExpired()
+
+
+@internal
+@view
+def _amountOut(_amount_in: uint256, _reserve_in: uint256, _reserve_out: uint256) -> uint256:
+    amount_in: uint256 = _amount_in * (FEE_DENOMINATOR - self.fee_bps) / FEE_DENOMINATOR
+    return _reserve_out * amount_in / (_reserve_in + amount_in)
+
+
+@internal
+@view
+def _fee(_amount_in: uint256) -> uint256:
+    return _amount_in * self.fee_bps / FEE_DENOMINATOR
+
+
+@external
+@view
+def previewSwapExactSyForPt(exactSyIn: uint256) -> (uint256, uint256):
+    """
+    @return (PT out, fee in SY)
+    """
+    return self._amountOut(exactSyIn, self.total_sy, self.total_pt), self._fee(exactSyIn)
+
+
+@external
+@view
+def previewSwapExactPtForSy(exactPtIn: uint256) -> (uint256, uint256):
+    """
+    @return (SY out, fee in SY terms)
+    """
+    sy_out: uint256 = self._amountOut(exactPtIn, self.total_pt, self.total_sy)
+    return sy_out, self._fee(exactPtIn) * self.total_sy / self.total_pt
+
+
+@external
+@view
+def spotPtToSyRate() -> uint256:
+    return self.total_sy * ONE / self.total_pt
+
+
+@external
+def addLiquidity(ptIn: uint256, syIn: uint256):
+    """
+    @notice seeds the pool, no LP token is minted.
+    """
+    assert msg.sender == self.owner, "only owner can add liquidity"
+    ERC20(PT).transferFrom(msg.sender, self, ptIn)
+    ERC20(SY).transferFrom(msg.sender, self, syIn)
+    self.total_pt += ptIn
+    self.total_sy += syIn
+
+
+@external
+def swapExactSyForPt(receiver: address, exactSyIn: uint256) -> uint256:
+    assert not self._isExpired(), "market expired"
+    assert ERC20(SY).balanceOf(self) >= self.total_sy + exactSyIn, "SY not received"
+    pt_out: uint256 = self._amountOut(exactSyIn, self.total_sy, self.total_pt)
+    self.total_sy += exactSyIn
+    self.total_pt -= pt_out
+    ERC20(PT).transfer(receiver, pt_out)
+    return pt_out
+
+
+@external
+def swapExactPtForSy(receiver: address, exactPtIn: uint256) -> uint256:
+    assert not self._isExpired(), "market expired"
+    assert ERC20(PT).balanceOf(self) >= self.total_pt + exactPtIn, "PT not received"
+    sy_out: uint256 = self._amountOut(exactPtIn, self.total_pt, self.total_sy)
+    self.total_pt += exactPtIn
+    self.total_sy -= sy_out
+    ERC20(SY).transfer(receiver, sy_out)
+    return sy_out
+
+
+@external
+def swapSyForExactPt(receiver: address, exactPtOut: uint256, data: Bytes[256]) -> uint256:
+    """
+    @notice sends exactPtOut PT to receiver, then expects the caller's swapCallback to pay
+            enough SY for it. Whatever SY arrives is added to the pool.
+    @return SY paid
+    """
+    assert not self._isExpired(), "market expired"
+    ERC20(PT).transfer(receiver, exactPtOut)
+    PendleSwapCallback(msg.sender).swapCallback(convert(exactPtOut, int256), 0, data)
+
+    sy_in: uint256 = ERC20(SY).balanceOf(self) - self.total_sy
+    assert self._amountOut(sy_in, self.total_sy, self.total_pt) >= exactPtOut, "insufficient SY paid"
+    self.total_sy += sy_in
+    self.total_pt -= exactPtOut
+    return sy_in
+
+
+@external
+def addRewards(token: address, user: address, amount: uint256):
+    """
+    @notice makes amount of token claimable by user through redeemRewards.
+    """
+    ERC20(token).transferFrom(msg.sender, self, amount)
+    if token not in self.reward_tokens:
+        self.reward_tokens.append(token)
+    self.pending_rewards[user][token] += amount
+
+
+@external
+@view
+def getRewardTokens() -> DynArray[address, MAX_REWARD_TOKENS]:
+    return self.reward_tokens
+
+
+@external
+def redeemRewards(user: address) -> DynArray[uint256, MAX_REWARD_TOKENS]:
+    amounts: DynArray[uint256, MAX_REWARD_TOKENS] = []
+    for token in self.reward_tokens:
+        amount: uint256 = self.pending_rewards[user][token]
+        self.pending_rewards[user][token] = 0
+        if amount > 0:
+            ERC20(token).transfer(user, amount)
+        amounts.append(amount)
+    return amounts
@@ -0,0 +1,83 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle PT/LP oracle
+@dev
+    Stand-in for PendlePtLpOracle over MockPendleMarket, for offline tests. There is no TWAP:
+    a market's rate is its spot rate unless pinned with set_pt_to_sy_rate, which is how tests
+    keep the oracle still while trading moves the pool. After expiry it returns the redemption
+    rate 1/pyIndex like the real oracle. The duration argument is ignored.
+"""
+
+ONE: constant(uint256) = 10**18
+
+interface YieldToken:
+    def pyIndexStored() -> uint256: view
+    def previewMintPY(_sy_amount: uint256) -> uint256: view
+
+interface PendleMarket:
+    def readTokens() -> (address, address, address): view
+    def expiry() -> uint256: view
+    def spotPtToSyRate() -> uint256: view
+
+pinned_rate: public(HashMap[address, uint256])
+increase_cardinality_required: public(bool)
+oldest_observation_satisfied: public(bool)
+
+
+@external
+def __init__():
+    self.oldest_observation_satisfied = True
+
+
+@external
+def set_pt_to_sy_rate(_market: address, _rate: uint256):
+    """
+    @notice pins the market's PT to SY rate, 0 goes back to following the spot rate.
+    """
+    self.pinned_rate[_market] = _rate
+
+
+@external
+def set_oracle_state(_increase_cardinality_required: bool, _oldest_observation_satisfied: bool):
+    self.increase_cardinality_required = _increase_cardinality_required
+    self.oldest_observation_satisfied = _oldest_observation_satisfied
+
+
+@internal
+@view
+def _yt(_market: address) -> address:
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(_market).readTokens()
+    return yt
+
+
+@internal
+@view
+def _ptToSyRate(_market: address) -> uint256:
+    if PendleMarket(_market).expiry() <= block.timestamp:
+        #Each PT redeems for 1/pyIndex SY, previewMintPY(ONE) is the current pyIndex
+        return ONE * ONE / YieldToken(self._yt(_market)).previewMintPY(ONE)
+    if self.pinned_rate[_market] > 0:
+        return self.pinned_rate[_market]
+    return PendleMarket(_market).spotPtToSyRate()
+
+
+@external
+@view
+def getPtToSyRate(market: address, duration: uint32) -> uint256:
+    return self._ptToSyRate(market)
+
+
+@external
+@view
+def getPtToAssetRate(market: address, duration: uint32) -> uint256:
+    return YieldToken(self._yt(market)).previewMintPY(self._ptToSyRate(market))
+
+
+@external
+@view
+def getOracleState(market: address, duration: uint32) -> (bool, uint16, bool):
+    return self.increase_cardinality_required, 0, self.oldest_observation_satisfied
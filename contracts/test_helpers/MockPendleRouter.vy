@@ -0,0 +1,238 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle router
+@dev
+    Stand-in for the Pendle router actions PendleAdapter and PTMigrationRouter use, over
+    MockPendleSY/MockPendleYT/MockPendleMarket, for offline tests. The mock market has a closed
+    form curve, so swaps are computed exactly and ApproxParams are ignored. Token input/output
+    only supports the SY's own asset (no pendleSwap aggregator). Limit orders are filled through
+    MockPendleLimitRouter ahead of the market, normal fills only.
+"""
+
+from vyper.interfaces import ERC20
+
+struct ApproxParams:
+    guessMin: uint256
+    guessMax: uint256
+    guessOffchain: uint256
+    maxIteration: uint256
+    eps: uint256
+
+struct SwapData:
+    swapType: uint8
+    extRouter: address
+    extCalldata: Bytes[100]
+    needScale: bool
+
+struct TokenInput:
+    tokenIn: address
+    netTokenIn: uint256
+    tokenMintSy: address
+    pendleSwap: address
+    swapData: SwapData
+
+struct TokenOutput:
+    tokenOut: address
+    minTokenOut: uint256
+    tokenRedeemSy: address
+    pendleSwap: address
+    swapData: SwapData
+
+struct Order:
+    salt: uint256
+    expiry: uint256
+    nonce: uint256
+    orderType: uint8
+    token: address
+    YT: address
+    maker: address
+    receiver: address
+    makingAmount: uint256
+    lnImpliedRate: uint256
+    failSafeRate: uint256
+    permit: Bytes[100]
+
+struct FillOrderParams:
+    order: Order
+    signature: Bytes[100]
+    makingAmount: uint256
+
+struct LimitOrderData:
+    limitRouter: address
+    epsSkipMarket: uint256
+    normalFills: DynArray[FillOrderParams, 2]
+    flashFills: DynArray[FillOrderParams, 2]
+    optData: Bytes[100]
+
+interface SYToken:
+    def deposit(receiver: address, tokenIn: address, amountTokenToDeposit: uint256, minSharesOut: uint256) -> uint256: nonpayable
+    def redeem(receiver: address, amountSharesToRedeem: uint256, tokenOut: address, minTokenOut: uint256, burnFromInternalBalance: bool) -> uint256: nonpayable
+
+interface YieldToken:
+    def SY() -> address: view
+    def PT() -> address: view
+    def isExpired() -> bool: view
+    def previewRedeemPY(_py_amount: uint256) -> uint256: view
+    def mintPY(receiverPT: address, receiverYT: address) -> uint256: nonpayable
+    def redeemPY(receiver: address) -> uint256: nonpayable
+
+interface PendleMarket:
+    def readTokens() -> (address, address, address): view
+    def previewSwapExactSyForPt(exactSyIn: uint256) -> (uint256, uint256): view
+    def previewSwapExactPtForSy(exactPtIn: uint256) -> (uint256, uint256): view
+    def swapExactSyForPt(receiver: address, exactSyIn: uint256) -> uint256: nonpayable
+    def swapExactPtForSy(receiver: address, exactPtIn: uint256) -> uint256: nonpayable
+    def swapSyForExactPt(receiver: address, exactPtOut: uint256, data: Bytes[256]) -> uint256: nonpayable
+
+interface LimitRouter:
+    def fill(params: DynArray[FillOrderParams, 2], receiver: address, maxTaking: uint256) -> (uint256, uint256): nonpayable
+
+#Market a swapSyForExactPt callback is expected from
+callback_market: transient(address)
+
+
+@internal
+def _fill_limit(limit: LimitOrderData, receiver: address, token_taken: address, max_taking: uint256) -> (uint256, uint256):
+    """
+    @return (made, taken)
+    """
+    assert len(limit.flashFills) == 0, "flash fills not supported"
+    if len(limit.normalFills) == 0:
+        return 0, 0
+    ERC20(token_taken).approve(limit.limitRouter, max_taking)
+    return LimitRouter(limit.limitRouter).fill(limit.normalFills, receiver, max_taking)
+
+
+@internal
+def _token_to_sy(_sy: address, _receiver: address, _input: TokenInput) -> uint256:
+    ERC20(_input.tokenIn).transferFrom(msg.sender, self, _input.netTokenIn)
+    ERC20(_input.tokenIn).approve(_sy, _input.netTokenIn)
+    return SYToken(_sy).deposit(_receiver, _input.tokenIn, _input.netTokenIn, 0)
+
+
+@external
+def mintPyFromToken(receiver: address, YT: address, minPyOut: uint256, input: TokenInput) -> (uint256, uint256):
+    """
+    @return (PT and YT minted, SY used)
+    """
+    netSyInterm: uint256 = self._token_to_sy(YieldToken(YT).SY(), YT, input)
+    netPyOut: uint256 = YieldToken(YT).mintPY(receiver, receiver)
+    assert netPyOut >= minPyOut, "insufficient PY out"
+    return netPyOut, netSyInterm
+
+
+@external
+def redeemPyToToken(receiver: address, YT: address, netPyIn: uint256, output: TokenOutput) -> (uint256, uint256):
+    """
+    @return (token out, SY redeemed)
+    """
+    ERC20(YieldToken(YT).PT()).transferFrom(msg.sender, YT, netPyIn)
+    if not YieldToken(YT).isExpired():
+        ERC20(YT).transferFrom(msg.sender, YT, netPyIn)
+    netSyInterm: uint256 = YieldToken(YT).redeemPY(self)
+    netTokenOut: uint256 = SYToken(YieldToken(YT).SY()).redeem(receiver, netSyInterm, output.tokenOut, output.minTokenOut, False)
+    return netTokenOut, netSyInterm
+
+
+@external
+def swapExactTokenForPt(receiver: address, market: address, minPtOut: uint256, guessPtOut: ApproxParams, input: TokenInput, limit: LimitOrderData) -> (uint256, uint256, uint256):
+    """
+    @return (PT out, SY fee, SY swapped)
+    """
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+
+    netSyInterm: uint256 = 0
+    sy_to_market: uint256 = 0
+    netPtOut: uint256 = 0
+    if len(limit.normalFills) == 0:
+        netSyInterm = self._token_to_sy(sy, market, input)
+        sy_to_market = netSyInterm
+    else:
+        #Fill the orders first, the market gets what is left
+        netSyInterm = self._token_to_sy(sy, self, input)
+        sy_to_limit: uint256 = 0
+        netPtOut, sy_to_limit = self._fill_limit(limit, receiver, sy, netSyInterm)
+        sy_to_market = netSyInterm - sy_to_limit
+        ERC20(sy).transfer(market, sy_to_market)
+
+    netSyFee: uint256 = 0
+    if sy_to_market > 0:
+        netSyFee = PendleMarket(market).previewSwapExactSyForPt(sy_to_market)[1]
+        netPtOut += PendleMarket(market).swapExactSyForPt(receiver, sy_to_market)
+    assert netPtOut >= minPtOut, "insufficient PT out"
+    return netPtOut, netSyFee, netSyInterm
+
+
+@external
+def swapExactPtForToken(receiver: address, market: address, exactPtIn: uint256, output: TokenOutput, limit: LimitOrderData) -> (uint256, uint256, uint256):
+    """
+    @return (token out, SY fee, SY swapped)
+    """
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+
+    netSyInterm: uint256 = 0
+    pt_to_market: uint256 = exactPtIn
+    if len(limit.normalFills) == 0:
+        ERC20(pt).transferFrom(msg.sender, market, exactPtIn)
+    else:
+        #Fill the orders first, the market gets what is left
+        ERC20(pt).transferFrom(msg.sender, self, exactPtIn)
+        pt_to_limit: uint256 = 0
+        netSyInterm, pt_to_limit = self._fill_limit(limit, self, pt, exactPtIn)
+        pt_to_market = exactPtIn - pt_to_limit
+        ERC20(pt).transfer(market, pt_to_market)
+
+    netSyFee: uint256 = 0
+    if pt_to_market > 0:
+        netSyFee = PendleMarket(market).previewSwapExactPtForSy(pt_to_market)[1]
+        netSyInterm += PendleMarket(market).swapExactPtForSy(self, pt_to_market)
+    netTokenOut: uint256 = SYToken(sy).redeem(receiver, netSyInterm, output.tokenOut, output.minTokenOut, False)
+    return netTokenOut, netSyFee, netSyInterm
+
+
+@external
+def swapExactYtForPt(receiver: address, market: address, exactYtIn: uint256, minPtOut: uint256, guessTotalPtFromSwap: ApproxParams) -> (uint256, uint256):
+    """
+    @notice buys totalPtSwapped PT from the market, paying with the SY that exactYtIn of it
+            redeems for together with the YT. The rest of the PT goes to receiver.
+    @return (PT out, SY fee)
+    """
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+
+    ERC20(yt).transferFrom(msg.sender, self, exactYtIn)
+    sy_from_py: uint256 = YieldToken(yt).previewRedeemPY(exactYtIn)
+    totalPtSwapped: uint256 = 0
+    netSyFee: uint256 = 0
+    totalPtSwapped, netSyFee = PendleMarket(market).previewSwapExactSyForPt(sy_from_py)
+    assert totalPtSwapped > exactYtIn, "YT has no value"
+
+    self.callback_market = market
+    PendleMarket(market).swapSyForExactPt(self, totalPtSwapped, _abi_encode(yt, exactYtIn))
+    self.callback_market = empty(address)
+
+    netPtOut: uint256 = totalPtSwapped - exactYtIn
+    assert netPtOut >= minPtOut, "insufficient PT out"
+    ERC20(pt).transfer(receiver, netPtOut)
+    return netPtOut, netSyFee
+
+
+@external
+def swapCallback(ptToAccount: int256, syToAccount: int256, data: Bytes[256]):
+    #Pay for the PT of swapExactYtForPt by redeeming part of it with the YT, straight to the market.
+    assert msg.sender == self.callback_market, "unexpected callback"
+    yt: address = empty(address)
+    yt_amount: uint256 = 0
+    yt, yt_amount = _abi_decode(data, (address, uint256))
+    ERC20(YieldToken(yt).PT()).transfer(yt, yt_amount)
+    ERC20(yt).transfer(yt, yt_amount)
+    YieldToken(yt).redeemPY(msg.sender)
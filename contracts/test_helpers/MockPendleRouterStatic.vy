@@ -0,0 +1,73 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle router-static
+@dev
+    Quotes for MockPendleRouter, for offline tests. The mock market's curve is closed form so
+    these match what the router will do exactly. priceImpact and exchangeRateAfter are not
+    modelled and always 0.
+"""
+
+interface SYToken:
+    def previewDeposit(tokenIn: address, amountTokenToDeposit: uint256) -> uint256: view
+
+interface YieldToken:
+    def SY() -> address: view
+    def previewMintPY(_sy_amount: uint256) -> uint256: view
+    def previewRedeemPY(_py_amount: uint256) -> uint256: view
+
+interface PendleMarket:
+    def readTokens() -> (address, address, address): view
+    def previewSwapExactSyForPt(exactSyIn: uint256) -> (uint256, uint256): view
+    def spotPtToSyRate() -> uint256: view
+
+
+@external
+@view
+def getPtToAssetRate(market: address) -> uint256:
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+    return YieldToken(yt).previewMintPY(PendleMarket(market).spotPtToSyRate())
+
+
+@external
+@view
+def mintPyFromTokenStatic(YT: address, tokenIn: address, netTokenIn: uint256) -> uint256:
+    return YieldToken(YT).previewMintPY(SYToken(YieldToken(YT).SY()).previewDeposit(tokenIn, netTokenIn))
+
+
+@external
+@view
+def swapExactYtForPtStatic(market: address, exactYtIn: uint256) -> (uint256, uint256, uint256, uint256, uint256):
+    """
+    @return (PT out, total PT swapped, SY fee, price impact, exchange rate after)
+    """
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+    totalPtSwapped: uint256 = 0
+    netSyFee: uint256 = 0
+    totalPtSwapped, netSyFee = PendleMarket(market).previewSwapExactSyForPt(YieldToken(yt).previewRedeemPY(exactYtIn))
+    if totalPtSwapped <= exactYtIn:
+        return 0, totalPtSwapped, netSyFee, 0, 0
+    return totalPtSwapped - exactYtIn, totalPtSwapped, netSyFee, 0, 0
+
+
+@external
+@view
+def swapExactTokenForPtStatic(market: address, tokenIn: address, netTokenIn: uint256) -> (uint256, uint256, uint256, uint256, uint256):
+    """
+    @return (PT out, SY minted, SY fee, price impact, exchange rate after)
+    """
+    sy: address = empty(address)
+    pt: address = empty(address)
+    yt: address = empty(address)
+    sy, pt, yt = PendleMarket(market).readTokens()
+    netSyMinted: uint256 = SYToken(sy).previewDeposit(tokenIn, netTokenIn)
+    netPtOut: uint256 = 0
+    netSyFee: uint256 = 0
+    netPtOut, netSyFee = PendleMarket(market).previewSwapExactSyForPt(netSyMinted)
+    return netPtOut, netSyMinted, netSyFee, 0, 0
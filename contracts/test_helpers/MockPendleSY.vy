@@ -0,0 +1,162 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle SY token
+@dev
+    Stand-in for a Pendle SY (standardized yield) token over a single asset, for offline tests.
+    Each SY is worth exchangeRate() asset (1e18 based). Tests simulate yield with
+    set_exchange_rate, the extra asset backing it has to be minted to this contract.
+    Losses (a slashing) with slash_exchange_rate.
+    When deployed with an accounting asset other than asset (like SY-wstETH accounting in
+    stETH) it wraps asset 1:1 instead, and exchangeRate() is in the accounting asset.
+"""
+
+from vyper.interfaces import ERC20
+
+implements: ERC20
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+event Approval:
+    owner: indexed(address)
+    spender: indexed(address)
+    value: uint256
+
+ONE: constant(uint256) = 10**18
+
+name: public(String[64])
+symbol: public(String[32])
+decimals: public(uint8)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+totalSupply: public(uint256)
+
+asset: immutable(address)
+accounting_asset: immutable(address)
+owner: address
+exchangeRate: public(uint256)
+
+
+@external
+def __init__(_asset: address, _accounting_asset: address, _name: String[64], _symbol: String[32]):
+    asset = _asset
+    accounting_asset = _accounting_asset
+    self.name = _name
+    self.symbol = _symbol
+    self.decimals = 18
+    self.owner = msg.sender
+    self.exchangeRate = ONE
+
+
+@internal
+def _transfer(_from: address, _to: address, _value: uint256):
+    assert self.balanceOf[_from] >= _value, "SY transfer insufficient funds."
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+
+
+@external
+def transfer(_to : address, _value : uint256) -> bool:
+    self._transfer(msg.sender, _to, _value)
+    return True
+
+
+@external
+def transferFrom(_from : address, _to : address, _value : uint256) -> bool:
+    assert self.allowance[_from][msg.sender] >= _value, "SY transfer insufficient allowance."
+    self.allowance[_from][msg.sender] -= _value
+    self._transfer(_from, _to, _value)
+    return True
+
+
+@external
+def approve(_spender : address, _value : uint256) -> bool:
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+
+@external
+def set_exchange_rate(_rate: uint256):
+    #Like the real thing, the rate of an SY never goes down.
+    assert msg.sender == self.owner, "only owner can set exchange rate"
+    assert _rate >= self.exchangeRate, "exchange rate can't decrease"
+    self.exchangeRate = _rate
+
+
+@external
+def slash_exchange_rate(_rate: uint256):
+    #The exception: a slashed yield token. The YT keeps its stored index (pyIndexStored)
+    #above the new rate, so each PT redeems for less asset from then on.
+    assert msg.sender == self.owner, "only owner can set exchange rate"
+    assert _rate < self.exchangeRate, "use set_exchange_rate"
+    self.exchangeRate = _rate
+
+
+@external
+@view
+def assetInfo() -> (uint8, address, uint8):
+    #(AssetType.TOKEN, asset, decimals)
+    return 0, accounting_asset, 18
+
+
+@external
+@view
+def yieldToken() -> address:
+    return asset
+
+
+@internal
+@view
+def _asset_per_sy() -> uint256:
+    if accounting_asset != asset:
+        return ONE
+    return self.exchangeRate
+
+
+@external
+@view
+def previewDeposit(tokenIn: address, amountTokenToDeposit: uint256) -> uint256:
+    assert tokenIn == asset, "SY: invalid tokenIn"
+    return amountTokenToDeposit * ONE / self._asset_per_sy()
+
+
+@external
+@view
+def previewRedeem(tokenOut: address, amountSharesToRedeem: uint256) -> uint256:
+    assert tokenOut == asset, "SY: invalid tokenOut"
+    return amountSharesToRedeem * self._asset_per_sy() / ONE
+
+
+@external
+def deposit(receiver: address, tokenIn: address, amountTokenToDeposit: uint256, minSharesOut: uint256) -> uint256:
+    assert tokenIn == asset, "SY: invalid tokenIn"
+    shares: uint256 = amountTokenToDeposit * ONE / self._asset_per_sy()
+    assert shares >= minSharesOut, "SY: insufficient shares out"
+    ERC20(asset).transferFrom(msg.sender, self, amountTokenToDeposit)
+    self.totalSupply += shares
+    self.balanceOf[receiver] += shares
+    log Transfer(empty(address), receiver, shares)
+    return shares
+
+
+@external
+def redeem(receiver: address, amountSharesToRedeem: uint256, tokenOut: address, minTokenOut: uint256, burnFromInternalBalance: bool) -> uint256:
+    assert tokenOut == asset, "SY: invalid tokenOut"
+    #burnFromInternalBalance: the shares were sent to this contract beforehand.
+    owner: address = msg.sender
+    if burnFromInternalBalance:
+        owner = self
+    assert self.balanceOf[owner] >= amountSharesToRedeem, "SY: redeem insufficient funds."
+    self.balanceOf[owner] -= amountSharesToRedeem
+    self.totalSupply -= amountSharesToRedeem
+    log Transfer(owner, empty(address), amountSharesToRedeem)
+
+    amount: uint256 = amountSharesToRedeem * self._asset_per_sy() / ONE
+    assert amount >= minTokenOut, "SY: insufficient token out"
+    ERC20(asset).transfer(receiver, amount)
+    return amount
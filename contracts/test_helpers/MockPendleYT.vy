@@ -0,0 +1,167 @@
+#pragma version 0.3.10
+#pragma evm-version cancun
+"""
+@title Mock Pendle YT token
+@dev
+    Stand-in for a Pendle YT, which also mints and redeems PT+YT (PY) against SY, for offline
+    tests. PT is a contracts/test_helpers/ERC20.vy whose minter must be handed to this contract.
+    One PY is worth 1/pyIndex SY, pyIndex being the highest SY exchange rate seen so far.
+    Interest owed to YT holders is not tracked, it simply stays in this contract.
+    Like Pendle, SY/PT/YT are pushed to this contract before calling mintPY/redeemPY.
+"""
+
+from vyper.interfaces import ERC20
+
+implements: ERC20
+
+interface SYToken:
+    def exchangeRate() -> uint256: view
+
+interface PTToken:
+    def mint(_to: address, _value: uint256) -> bool: nonpayable
+    def burn(_value: uint256): nonpayable
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+event Approval:
+    owner: indexed(address)
+    spender: indexed(address)
+    value: uint256
+
+ONE: constant(uint256) = 10**18
+
+name: public(String[64])
+symbol: public(String[32])
+decimals: public(uint8)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+totalSupply: public(uint256)
+
+SY: public(immutable(address))
+PT: public(immutable(address))
+expiry: public(immutable(uint256))
+
+pyIndexStored: public(uint256)
+pyIndexLastUpdatedBlock: public(uint128)
+#SY held on behalf of outstanding PY, anything above it was pushed in for mintPY
+sy_reserve: uint256
+
+
+@external
+def __init__(_sy: address, _pt: address, _expiry: uint256, _name: String[64], _symbol: String[32]):
+    SY = _sy
+    PT = _pt
+    expiry = _expiry
+    self.name = _name
+    self.symbol = _symbol
+    self.decimals = 18
+    self.pyIndexStored = SYToken(_sy).exchangeRate()
+    self.pyIndexLastUpdatedBlock = convert(block.number, uint128)
+
+
+@internal
+def _transfer(_from: address, _to: address, _value: uint256):
+    assert self.balanceOf[_from] >= _value, "YT transfer insufficient funds."
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+
+
+@external
+def transfer(_to : address, _value : uint256) -> bool:
+    self._transfer(msg.sender, _to, _value)
+    return True
+
+
+@external
+def transferFrom(_from : address, _to : address, _value : uint256) -> bool:
+    assert self.allowance[_from][msg.sender] >= _value, "YT transfer insufficient allowance."
+    self.allowance[_from][msg.sender] -= _value
+    self._transfer(_from, _to, _value)
+    return True
+
+
+@external
+def approve(_spender : address, _value : uint256) -> bool:
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+
+@internal
+@view
+def _pyIndex() -> uint256:
+    return max(SYToken(SY).exchangeRate(), self.pyIndexStored)
+
+
+@internal
+def _updatePyIndex() -> uint256:
+    index: uint256 = self._pyIndex()
+    if index != self.pyIndexStored:
+        self.pyIndexStored = index
+        self.pyIndexLastUpdatedBlock = convert(block.number, uint128)
+    return index
+
+
+@external
+@view
+def isExpired() -> bool:
+    return expiry <= block.timestamp
+
+
+@external
+@view
+def doCacheIndexSameBlock() -> bool:
+    return False
+
+
+@external
+def pyIndexCurrent() -> uint256:
+    return self._updatePyIndex()
+
+
+@external
+@view
+def previewMintPY(_sy_amount: uint256) -> uint256:
+    return _sy_amount * self._pyIndex() / ONE
+
+
+@external
+@view
+def previewRedeemPY(_py_amount: uint256) -> uint256:
+    return _py_amount * ONE / self._pyIndex()
+
+
+@external
+def mintPY(receiverPT: address, receiverYT: address) -> uint256:
+    assert expiry > block.timestamp, "YT: expired"
+    sy_balance: uint256 = ERC20(SY).balanceOf(self)
+    sy_in: uint256 = sy_balance - self.sy_reserve
+    self.sy_reserve = sy_balance
+
+    amount: uint256 = sy_in * self._updatePyIndex() / ONE
+    PTToken(PT).mint(receiverPT, amount)
+    self.totalSupply += amount
+    self.balanceOf[receiverYT] += amount
+    log Transfer(empty(address), receiverYT, amount)
+    return amount
+
+
+@external
+def redeemPY(receiver: address) -> uint256:
+    #All PT held here was pushed in for redemption, so is the YT (only needed before expiry).
+    amount: uint256 = ERC20(PT).balanceOf(self)
+    if expiry > block.timestamp:
+        assert self.balanceOf[self] >= amount, "YT: insufficient YT"
+        self.balanceOf[self] -= amount
+        self.totalSupply -= amount
+        log Transfer(self, empty(address), amount)
+    PTToken(PT).burn(amount)
+
+    sy_out: uint256 = amount * ONE / self._updatePyIndex()
+    self.sy_reserve -= sy_out
+    ERC20(SY).transfer(receiver, sy_out)
+    return sy_out
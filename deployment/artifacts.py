@@ -0,0 +1,179 @@
+#Compiled contracts, shared by the tests, run4626.py and the deployment scripts.
+#
+#boa.load()/boa.load_partial() go back to boa's cache on every call: it unpickles the
+#compiler output again (several MB for AdapterVault) and its key only covers the contract's
+#own source, not the interfaces it imports. factory() keeps one VyperDeployer per contract
+#for the life of the process, and stores the compiler output on disk under a fingerprint of
+#the compiler version, the compiler settings, the source and every imported interface, so
+#a fresh process only compiles what actually changed.
+#
+#The pickled CompilerData holds the bytecode and ABI along with the source maps boa needs
+#for dev reasons and stack traces, so contracts deployed from it behave as boa.load()'s do.
+#Point ADAPTERVAULT_ARTIFACT_DIR elsewhere to move the cache, delete it to start over.
+#
+#Unpickling runs whatever code the file asks for, so the cache has to be private to the user:
+#it defaults to their own cache directory ($XDG_CACHE_HOME, else ~/.cache), is created 0700
+#and its files 0600, and a directory or file owned by someone else or writable by group or
+#others is never read (nor written, everything is then compiled in process). Don't point
+#ADAPTERVAULT_ARTIFACT_DIR at a shared location.
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import stat
+import warnings
+from importlib.metadata import version
+from pathlib import Path
+
+import vyper
+from boa.contracts.vyper.compiler_utils import anchor_compiler_settings
+from boa.contracts.vyper.vyper_contract import VyperDeployer
+from vyper.cli.utils import get_interface_file_path
+from vyper.cli.vyper_compile import get_interface_codes
+
+ARTIFACT_DIR = os.environ.get(
+    "ADAPTERVAULT_ARTIFACT_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", "~/.cache"), "adaptervault", "artifacts"),
+)
+
+ADAPTER_VAULT = "contracts/AdapterVault.vy"
+PENDLE_ADAPTER = "contracts/adapters/PendleAdapter.vy"
+GOVERNANCE = "contracts/Governance.vy"
+FUNDS_ALLOCATOR = "contracts/FundsAllocator.vy"
+PENDLE_VAULT_FACTORY = "contracts/PendleVaultFactory.vy"
+PT_MIGRATION_ROUTER = "contracts/PTMigrationRouter.vy"
+WITHDRAWAL_QUEUE = "contracts/WithdrawalQueue.vy"
+
+_IMPORT = re.compile(r"^(?:from\s+(\.*)([\w.]*)\s+import\s+(\w+)|import\s+([\w.]+)\s+as)", re.MULTILINE)
+
+_factories = {}
+
+
+def _imported_files(path: Path, source: str) -> list:
+    """
+    The interface files source imports, resolved as vyper's get_interface_codes() does but
+    from the import lines alone, which is far cheaper than parsing the contract. Builtins
+    (vyper.interfaces) are covered by the compiler version.
+    """
+    found = []
+    for dots, module, name, plain in _IMPORT.findall(source):
+        if plain:
+            import_path = plain.replace(".", "/")
+        elif module == "vyper.interfaces" and not dots:
+            continue
+        else:
+            prefix = "../" * (len(dots) - 1) if len(dots) > 1 else "./" * len(dots)
+            import_path = prefix + module.replace(".", "/") + "/" + name
+        base_paths = [path.parent] if import_path.startswith(".") else [path.parent, Path(".")]
+        try:
+            found.append(get_interface_file_path(base_paths, import_path))
+        except FileNotFoundError:
+            #The compiler will report it
+            pass
+    return found
+
+
+def fingerprint(path, compiler_args: dict = None) -> str:
+    """
+    Hash of everything the compiler output depends on.
+    """
+    path = Path(path)
+    source = path.read_text()
+    h = hashlib.sha256()
+    #boa's version too, a pickle only loads into the classes it was written from
+    h.update(("%s+%s boa %s" % (vyper.__version__, vyper.__commit__, version("titanoboa"))).encode())
+    h.update(json.dumps(compiler_args or {}, sort_keys=True, default=str).encode())
+    h.update(source.encode())
+    for dep in _imported_files(path, source):
+        h.update(str(dep).encode())
+        h.update(dep.read_bytes())
+    return h.hexdigest()
+
+
+def _artifact_path(path: Path, digest: str) -> Path:
+    return Path(os.path.expanduser(ARTIFACT_DIR)) / ("%s-%s.pickle" % (path.stem, digest[:32]))
+
+
+def _private(path: Path) -> bool:
+    """
+    True if path belongs to this user and nobody else can write to it.
+    """
+    st = path.stat()
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _cache_dir(artifact: Path) -> bool:
+    """
+    Creates the artifact directory if needed, False (with a warning) if it isn't private.
+    """
+    artifact.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if _private(artifact.parent):
+        return True
+    warnings.warn("not caching compiler output in %s, it isn't private to this user" % artifact.parent)
+    return False
+
+
+def _compile(path: Path, compiler_args: dict):
+    name = str(path)
+    source = path.read_text()
+    interface_codes = get_interface_codes(Path("."), {name: source})[name]
+    data = VyperDeployer.create_compiler_data(source, name, interface_codes=interface_codes, **compiler_args)
+    with anchor_compiler_settings(data):
+        _ = data.bytecode, data.bytecode_runtime
+    return data
+
+
+def _load_or_compile(path: Path, compiler_args: dict):
+    artifact = _artifact_path(path, fingerprint(path, compiler_args))
+    use_cache = _cache_dir(artifact)
+    if use_cache and artifact.is_file() and _private(artifact):
+        try:
+            with open(artifact, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            #Truncated, compile it again
+            pass
+
+    data = _compile(path, compiler_args)
+    if use_cache:
+        tmp = artifact.with_suffix(".%d.tmp" % os.getpid())
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            pickle.dump(data, f)
+        os.replace(tmp, artifact)
+    return data
+
+
+def factory(path, compiler_args: dict = None) -> VyperDeployer:
+    """
+    Drop-in for boa.load_partial(path): factory(path).deploy(*args), .at(address) or
+    .deploy_as_blueprint(). Compiled at most once per process and once per change on disk.
+    """
+    compiler_args = compiler_args or {}
+    key = (str(path), fingerprint(path, compiler_args))
+    if key not in _factories:
+        _factories[key] = VyperDeployer(_load_or_compile(Path(path), compiler_args), filename=str(path))
+    return _factories[key]
+
+
+def vault_factory() -> VyperDeployer:
+    return factory(ADAPTER_VAULT)
+
+def pendle_adapter_factory() -> VyperDeployer:
+    return factory(PENDLE_ADAPTER)
+
+def governance_factory() -> VyperDeployer:
+    return factory(GOVERNANCE)
+
+def funds_allocator_factory() -> VyperDeployer:
+    return factory(FUNDS_ALLOCATOR)
+
+def pendle_vault_factory_factory() -> VyperDeployer:
+    return factory(PENDLE_VAULT_FACTORY)
+
+def migration_router_factory() -> VyperDeployer:
+    return factory(PT_MIGRATION_ROUTER)
+
+def withdrawal_queue_factory() -> VyperDeployer:
+    return factory(WITHDRAWAL_QUEUE)
@@ -2,6 +2,7 @@ import deploy_arbitrum
 import deploy_mainnet
 import sys
 import boa, os, json
+from artifacts import pendle_adapter_factory
 from eth_account import Account
 from decimal import Decimal
 from web3 import Web3
@@ -28,11 +29,13 @@ if "__main__" in __name__:
         PENDLE_ROUTER = deploy_arbitrum.PENDLE_ROUTER
         PENDLE_ROUTER_STATIC = deploy_arbitrum.PENDLE_ROUTER_STATIC
         PENDLE_ORACLE = deploy_arbitrum.PENDLE_ORACLE        
+        PENDLE_LIMIT_ROUTER = deploy_arbitrum.PENDLE_LIMIT_ROUTER
     elif net == "mainnet":
         assert cid == 1, "not on correct RPC"
         PENDLE_ROUTER = deploy_mainnet.PENDLE_ROUTER
         PENDLE_ROUTER_STATIC = deploy_mainnet.PENDLE_ROUTER_STATIC
         PENDLE_ORACLE = deploy_mainnet.PENDLE_ORACLE
+        PENDLE_LIMIT_ROUTER = deploy_mainnet.PENDLE_LIMIT_ROUTER
     else:
         raise Exception("network not implemented")
     assert rpc is not None and rpc != "", "RPC_URL MUST BE PROVIDED!!!"
@@ -60,23 +63,24 @@ if "__main__" in __name__:
 
     print("estimated gas price is: ", gas_price/10**9, " gwei")
     input("Going to deploy adapter (ctrl+c to abort, enter to continue)")
-    adapter = boa.load(
-        "contracts/adapters/PendleAdapter.vy",
+    adapter = pendle_adapter_factory().deploy(
         ASSET,
         PENDLE_ROUTER,
         PENDLE_ROUTER_STATIC,
         MARKET,
-        PENDLE_ORACLE
+        PENDLE_ORACLE,
+        PENDLE_LIMIT_ROUTER
     )
     print(adapter)
 
 
-    init_args = eth_abi.encode(['address' , "address", "address", "address", "address"], [
+    init_args = eth_abi.encode(['address' , "address", "address", "address", "address", "address"], [
         ASSET,
         PENDLE_ROUTER,
         PENDLE_ROUTER_STATIC,
         MARKET,
-        PENDLE_ORACLE
+        PENDLE_ORACLE,
+        PENDLE_LIMIT_ROUTER
       ]).hex()
 
 
@@ -1,5 +1,7 @@
 import boa, os, json
+from artifacts import vault_factory, pendle_adapter_factory, governance_factory, funds_allocator_factory, pendle_vault_factory_factory, migration_router_factory
 from eth_account import Account
+import pendle_vault_batch
 from decimal import Decimal
 
 NOTHING="0x0000000000000000000000000000000000000000"
@@ -10,6 +12,7 @@ MULTISIG = "0x7B2cF15De19Ac87b50DDdA3Da7F2F300AE74B47f"
 PENDLE_ROUTER="0x00000000005BBB0EF59571E58418F9a4357b68A0"
 PENDLE_ROUTER_STATIC="0xAdB09F65bd90d19e3148D9ccb693F3161C6DB3E8"
 PENDLE_ORACLE="0x1Fd95db7B7C0067De8D45C0cb35D59796adfD187"
+PENDLE_LIMIT_ROUTER=NOTHING #Pendle's LimitRouter, adapters reject limit orders while unset
 #---- chain specific stuff --- 
 
 
@@ -53,12 +56,21 @@ def generate(market, asset):
     _asset = boa.load_partial("contracts/test_helpers/ERC20.vy").at(asset)
     bal = _asset.balanceOf(MULTISIG)
     print(bal)
-    factory = boa.load_partial("contracts/PendleVaultFactory.vy").at(PENDLE_FACTORY)
+    factory = pendle_vault_factory_factory().at(PENDLE_FACTORY)
     args = [asset, market, name, symbol, decimals, Decimal(2.0), bal]
     print("args = ", args)
     print("0x" + factory.deploy_pendle_vault.prepare_calldata(asset, market, name, symbol, decimals, Decimal(2.0), bal).hex())
 
 
+def generate_batch(vaults):
+    #vaults: [(market, asset, init_mint_amount), ...], the MULTISIG must hold and approve the sum per asset
+    rpc = os.environ.get("RPC_URL")
+    assert rpc is not None and rpc != "", "RPC_URL MUST BE PROVIDED!!!"
+    boa.set_network_env(rpc)
+    factory = pendle_vault_factory_factory().at(PENDLE_FACTORY)
+    return pendle_vault_batch.generate_batch(factory, vaults)
+
+
 if "__main__" in __name__:
     rpc = os.environ.get("RPC_URL")
     assert rpc is not None and rpc != "", "RPC_URL MUST BE PROVIDED!!!"
@@ -71,7 +83,7 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 1534994 * gas_price/10**18, " ETH")
         input("Going to deploy PendleAdapter blueprint (ctrl+c to abort, enter to continue)")
-        pa = boa.load_partial("contracts/adapters/PendleAdapter.vy")
+        pa = pendle_adapter_factory()
         pa.deploy_as_blueprint() #1,534,994
         exit()
     else:
@@ -80,7 +92,7 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 5343449 * gas_price/10**18, " ETH")
         input("Going to deploy AdapterVault blueprint (ctrl+c to abort, enter to continue)")
-        pa = boa.load_partial("contracts/AdapterVault.vy")
+        pa = vault_factory()
         pa.deploy_as_blueprint() #5,343,449
         exit()
     else:
@@ -89,7 +101,7 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 713222 * gas_price/10**18, " ETH")
         input("Going to deploy FundsAllocator (ctrl+c to abort, enter to continue)")
-        pa = boa.load("contracts/FundsAllocator.vy") #713222
+        pa = funds_allocator_factory().deploy(False) #713222
         print(pa) 
         exit()
     else:
@@ -98,7 +110,7 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 2846735 * gas_price/10**18, " ETH")
         input("Going to deploy Governance (ctrl+c to abort, enter to continue)")
-        pa = boa.load("contracts/Governance.vy", MULTISIG, 60*60*24*30) #2846735
+        pa = governance_factory().deploy(MULTISIG, 60*60*24*30) #2846735
         print(pa) 
         exit()
     else:
@@ -107,7 +119,7 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 896928 * gas_price/10**18, " ETH")
         input("Going to deploy PendleVaultFactory (ctrl+c to abort, enter to continue)")
-        pa = boa.load("contracts/PendleVaultFactory.vy") #896928
+        pa = pendle_vault_factory_factory().deploy() #896928
         print(pa) 
         exit()
     else:
@@ -116,21 +128,22 @@ if "__main__" in __name__:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 896928 * gas_price/10**18, " ETH")
         input("Going to deploy PTMigrationRouter (ctrl+c to abort, enter to continue)")
-        pa = boa.load("contracts/PTMigrationRouter.vy", PENDLE_ROUTER) #896928
+        pa = migration_router_factory().deploy(PENDLE_ROUTER) #896928
         print(pa) 
         exit()
     else:
         print("PT_MIGRATOR already exists: ", PT_MIGRATOR)
     #Ensure all values for factory are correct... bottom-up, change owner last
-    factory = boa.load_partial("contracts/PendleVaultFactory.vy").at(PENDLE_FACTORY)
-    if factory.pendle_router() != PENDLE_ROUTER or factory.pendle_router_static() != PENDLE_ROUTER_STATIC or factory.pendle_oracle() != PENDLE_ORACLE:
+    factory = pendle_vault_factory_factory().at(PENDLE_FACTORY)
+    if factory.pendle_router() != PENDLE_ROUTER or factory.pendle_router_static() != PENDLE_ROUTER_STATIC or factory.pendle_oracle() != PENDLE_ORACLE or factory.pendle_limit_router() != PENDLE_LIMIT_ROUTER:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
         print("estimated gas cost: ", 90807 * gas_price/10**18, " ETH")
         input("Going to deploy set pendle settings into factory (ctrl+c to abort, enter to continue)")
         factory.update_pendle_contracts(
             PENDLE_ROUTER,
             PENDLE_ROUTER_STATIC,
-            PENDLE_ORACLE
+            PENDLE_ORACLE,
+            PENDLE_LIMIT_ROUTER
         ) #90807
     if factory.governance_impl() != GOVERNANCE:
         print("estimated gas price is: ", gas_price/10**9, " gwei")
@@ -0,0 +1,395 @@
+#Python model of contracts/FundsAllocator.vy for offline planning.
+#
+#get_target_balances() mirrors FundsAllocator.getTargetBalances bit for bit (pass the
+#allocator's route_deposits flag along): same
+#integer rounding (ADAPTER_BREAKS_LOSS_POINT goes through Vyper's 10 decimal fixed
+#point), same tx ordering (withdraws first, then deposits, each in adapter order or
+#most underweight first when routing)
+#and it raises FundsAllocatorRevert wherever the contract would revert.
+#
+#get_target_balances_batch() evaluates the same logic over NumPy arrays of
+#adapter states, one scenario per row, so strategies can be swept over millions
+#of states without going through the EVM.
+
+from decimal import Decimal
+from collections import namedtuple
+from math import gcd
+
+import numpy as np
+
+MAX_ADAPTERS = 5 #Must match FundsAllocator.vy
+ADAPTER_BREAKS_LOSS_POINT = Decimal("0.05") #Must match FundsAllocator.vy
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+#Vyper decimals are int168 scaled by 10**10.
+DECIMAL_DIVISOR = 10**10
+MAX_DECIMAL = 2**167 - 1
+BREAKS_LOSS_POINT_SCALED = int(ADAPTER_BREAKS_LOSS_POINT * DECIMAL_DIVISOR)
+#Same floor as the decimal math above with the fraction reduced, so it can't overflow int64.
+_LOSS_GCD = gcd(BREAKS_LOSS_POINT_SCALED, DECIMAL_DIVISOR)
+BREAKS_LOSS_NUMERATOR = BREAKS_LOSS_POINT_SCALED // _LOSS_GCD
+BREAKS_LOSS_DENOMINATOR = DECIMAL_DIVISOR // _LOSS_GCD
+
+BASIS_POINTS = 10000 #Must match FundsAllocator.vy
+
+MAX_UINT256 = 2**256 - 1
+MIN_INT256 = -2**255
+MAX_INT256 = 2**255 - 1
+
+#Batch mode never leaves these bounds, so none of the contract's overflow checks can fire.
+MAX_BATCH_AMOUNT = 2**128
+MAX_BATCH_RATIO = 2**64
+#Below these the batch runs on int64, above them on exact (slower) Python ints.
+MAX_INT64_AMOUNT = 2**59
+MAX_INT64 = 2**63 - 1
+
+# Field order matches the BalanceAdapter struct so instances compare equal to what boa returns.
+BalanceAdapter = namedtuple(
+    "BalanceAdapter",
+    ["adapter", "current", "last_value", "max_deposit", "max_withdraw", "ratio", "target", "delta"],
+)
+
+EMPTY_BALANCE_ADAPTER = BalanceAdapter(ZERO_ADDRESS, 0, 0, 0, 0, 0, 0, 0)
+
+BatchResult = namedtuple(
+    "BatchResult",
+    ["reverted", "d4626_delta", "tx_count", "tx_adapter", "tx_target", "tx_delta", "blocked"],
+)
+
+
+class FundsAllocatorRevert(Exception):
+    pass
+
+
+def _uint256(value):
+    if not 0 <= value <= MAX_UINT256:
+        raise FundsAllocatorRevert("uint256 overflow")
+    return value
+
+
+def _int256(value):
+    if not MIN_INT256 <= value <= MAX_INT256:
+        raise FundsAllocatorRevert("int256 overflow")
+    return value
+
+
+def _div(a, b):
+    if b == 0:
+        raise FundsAllocatorRevert("division by zero")
+    return a // b
+
+
+def _brakes_limit(last_value):
+    # last_value - convert(convert(last_value, decimal) * ADAPTER_BREAKS_LOSS_POINT, uint256)
+    if last_value > MAX_DECIMAL // DECIMAL_DIVISOR:
+        raise FundsAllocatorRevert("decimal overflow")
+    loss = (last_value * DECIMAL_DIVISOR * BREAKS_LOSS_POINT_SCALED) // DECIMAL_DIVISOR
+    return last_value - loss // DECIMAL_DIVISOR
+
+
+def _as_balance_adapter(adapter):
+    return adapter if isinstance(adapter, BalanceAdapter) else BalanceAdapter(*adapter)
+
+
+def _withdraw_order(d4626_asset_target, total_assets, total_ratios, adapter_balances):
+    # Adapters that take no deposits first, then the ones furthest above target, ties by position.
+    keys = []
+    for pos, adapter in enumerate(adapter_balances):
+        if adapter.adapter == ZERO_ADDRESS: break
+        target = 0
+        if total_ratios > 0:
+            target = _uint256((total_assets - d4626_asset_target) * adapter.ratio) // total_ratios
+        excess = _int256(_int256(adapter.current) - _int256(target))
+        keys.append((adapter.max_deposit != 0, -excess, pos))
+    return [pos for _, _, pos in sorted(keys)]
+
+
+def _get_target_balances_withdraw_only(vault_balance, d4626_asset_target, total_assets, total_ratios, adapter_balances):
+    d4626_delta = 0
+    adapters = []
+
+    if vault_balance >= d4626_asset_target:
+        return d4626_delta, 0, [EMPTY_BALANCE_ADAPTER] * MAX_ADAPTERS, [ZERO_ADDRESS] * MAX_ADAPTERS
+
+    target_withdraw_balance = d4626_asset_target - vault_balance
+
+    for pos in _withdraw_order(d4626_asset_target, total_assets, total_ratios, adapter_balances):
+        if target_withdraw_balance == 0: break
+        adapter = adapter_balances[pos]
+
+        if adapter.ratio == 0 and adapter.current > 0:
+            delta = min(-_int256(adapter.current), adapter.max_withdraw)
+            adapter = adapter._replace(target=0, delta=delta)
+            withdraw = _uint256(_int256(-delta))
+            target_withdraw_balance -= min(withdraw, target_withdraw_balance)
+
+        elif adapter.current > 0:
+            withdraw = min(target_withdraw_balance, adapter.current)
+            target_withdraw_balance -= withdraw
+            adapter = adapter._replace(delta=-_int256(withdraw))
+
+        if adapter.delta != 0:
+            d4626_delta = _int256(d4626_delta + _int256(-adapter.delta))
+            adapters.append(adapter)
+
+        if _int256(_int256(adapter.current) + adapter.delta) < 0:
+            raise FundsAllocatorRevert("Adapter resulting balance can't be less than zero!")
+
+    if target_withdraw_balance != 0:
+        raise FundsAllocatorRevert("ERROR - Unable to fulfill this withdraw!")
+
+    tx_count = len(adapters)
+    adapters += [EMPTY_BALANCE_ADAPTER] * (MAX_ADAPTERS - tx_count)
+    return d4626_delta, tx_count, adapters, [ZERO_ADDRESS] * MAX_ADAPTERS
+
+
+def get_target_balances(vault_balance, d4626_asset_target, total_assets, total_ratios, adapter_balances, min_outgoing_tx, withdraw_only=False, drift_band_bps=0, route_deposits=False):
+    """
+    Same arguments and return values as FundsAllocator.getTargetBalances:
+    (d4626_delta, tx_count, BalanceAdapter[MAX_ADAPTERS], address[MAX_ADAPTERS]).
+    adapter_balances may hold up to MAX_ADAPTERS BalanceAdapter (or plain) tuples.
+    route_deposits is the route_deposits() flag of the FundsAllocator being modelled.
+    Raises FundsAllocatorRevert where the contract would revert.
+    """
+    assert len(adapter_balances) <= MAX_ADAPTERS, "too many adapters"
+    adapter_balances = [_as_balance_adapter(a) for a in adapter_balances]
+    adapter_balances += [EMPTY_BALANCE_ADAPTER] * (MAX_ADAPTERS - len(adapter_balances))
+
+    if d4626_asset_target > total_assets:
+        raise FundsAllocatorRevert("Not enough assets to fulfill d4626 target goals!")
+
+    if withdraw_only:
+        return _get_target_balances_withdraw_only(vault_balance, d4626_asset_target, total_assets, total_ratios, adapter_balances)
+
+    total_adapter_target_assets = total_assets - d4626_asset_target
+
+    d4626_delta = 0
+    in_txs = []
+    out_txs = []
+    blocked_adapters = []
+
+    route_deposit = route_deposits and vault_balance >= d4626_asset_target
+    routable = []
+
+    for adapter in adapter_balances:
+        if adapter.adapter == ZERO_ADDRESS: break
+
+        if adapter.ratio == 0 and adapter.current > 0:
+            adapter = adapter._replace(target=0, delta=max(-_int256(adapter.current), adapter.max_withdraw))
+        else:
+            target = _div(_uint256(total_adapter_target_assets * adapter.ratio), total_ratios)
+            delta = _int256(_int256(target) - _int256(adapter.current))
+
+            if delta > 0 or vault_balance >= d4626_asset_target:
+                if _uint256(abs(delta) * BASIS_POINTS) <= _uint256(target * drift_band_bps):
+                    delta = 0
+
+            if delta > 0:
+                delta = min(delta, adapter.max_deposit)
+            elif delta < 0:
+                delta = max(delta, adapter.max_withdraw)
+
+            if delta > 0:
+                if delta < _int256(min_outgoing_tx) and not route_deposit:
+                    delta = 0
+
+                if adapter.current < _brakes_limit(adapter.last_value):
+                    blocked_adapters.append(adapter.adapter)
+                    delta = 0
+
+                if route_deposit:
+                    if delta > 0:
+                        routable.append(adapter._replace(target=target, delta=delta))
+                    delta = 0
+
+            elif route_deposit:
+                delta = 0
+
+            adapter = adapter._replace(target=target, delta=delta)
+
+        if _int256(_int256(adapter.current) + adapter.delta) < 0:
+            raise FundsAllocatorRevert("Adapter resulting balance can't be less than zero!")
+
+        d4626_delta = _int256(d4626_delta + _int256(-adapter.delta))
+
+        if adapter.delta == 0: continue
+
+        if adapter.delta < 0:
+            in_txs.append(adapter)
+        else:
+            out_txs.append(adapter)
+
+    if route_deposit:
+        # Most underweight first (earliest slot on ties), each up to its deficit.
+        spare = _int256(_int256(vault_balance - d4626_asset_target) + d4626_delta)
+        for adapter in sorted(routable, key=lambda a: -(_int256(a.target) - _int256(a.current))):
+            if spare <= 0: break
+            delta = min(spare, adapter.delta)
+            if delta >= _int256(min_outgoing_tx):
+                spare -= delta
+                d4626_delta = _int256(d4626_delta - delta)
+                out_txs.append(adapter._replace(delta=delta))
+
+    adapters = in_txs + out_txs
+    tx_count = len(adapters)
+    adapters += [EMPTY_BALANCE_ADAPTER] * (MAX_ADAPTERS - tx_count)
+    blocked_adapters += [ZERO_ADDRESS] * (MAX_ADAPTERS - len(blocked_adapters))
+    return d4626_delta, tx_count, adapters, blocked_adapters
+
+
+def get_balance_txs(vault_balance, target_asset_balance, min_proposer_payout, total_assets, total_ratios, adapter_states, withdraw_only=False, drift_band_bps=0, route_deposits=False):
+    """
+    Same as FundsAllocator.getBalanceTxs: ([(qty, adapter)] * MAX_ADAPTERS, address[MAX_ADAPTERS]).
+    """
+    _, _, adapters, blocked_adapters = get_target_balances(vault_balance, target_asset_balance, total_assets, total_ratios, adapter_states, min_proposer_payout, withdraw_only, drift_band_bps, route_deposits)
+    return [(a.delta, a.adapter) for a in adapters], blocked_adapters
+
+
+def _batch_dtype(amounts, ratios):
+    biggest_amount = max((int(np.max(np.abs(a))) for a in amounts if a.size), default=0)
+    biggest_ratio = int(np.max(ratios)) if ratios.size else 0
+    assert biggest_amount < MAX_BATCH_AMOUNT, "batch amounts must be below 2**128"
+    assert biggest_ratio < MAX_BATCH_RATIO, "batch ratios must be below 2**64"
+    if biggest_amount < MAX_INT64_AMOUNT and biggest_amount * max(biggest_ratio, 1) <= MAX_INT64:
+        return np.int64
+    return object
+
+
+def get_target_balances_batch(vault_balance, d4626_asset_target, total_assets, total_ratios, current, last_value, max_deposit, max_withdraw, ratio, min_outgoing_tx, adapter_count=MAX_ADAPTERS, withdraw_only=False, drift_band_bps=0, route_deposits=False):
+    """
+    Vectorized get_target_balances() over N scenarios.
+
+    current, last_value, max_deposit, max_withdraw and ratio are (N, MAX_ADAPTERS)
+    arrays holding the BalanceAdapter fields of each adapter slot; the remaining
+    arguments are scalars or (N,) arrays. Slots at or beyond adapter_count are
+    treated as empty adapters. Amounts must be below 2**128, ratios below 2**64 and
+    drift_band_bps (scalar or (N,)) at most BASIS_POINTS.
+
+    Returns a BatchResult of arrays:
+        reverted    (N,)   True where the contract would revert, other fields are then meaningless.
+        d4626_delta (N,)
+        tx_count    (N,)
+        tx_adapter  (N, MAX_ADAPTERS) slot index of each planned tx in execution order, -1 when empty.
+        tx_target   (N, MAX_ADAPTERS) BalanceAdapter.target of each planned tx.
+        tx_delta    (N, MAX_ADAPTERS) BalanceAdapter.delta of each planned tx.
+        blocked     (N, MAX_ADAPTERS) True for slots the allocator reports as blocked.
+    Input target and delta fields are taken to be zero, as AdapterVault passes them.
+    """
+    ratio = np.asarray(ratio)
+    rows = ratio.shape[0]
+    columns = [np.asarray(c) for c in (current, last_value, max_deposit, max_withdraw)]
+    scalars = [np.broadcast_to(np.asarray(s), (rows,)) for s in (vault_balance, d4626_asset_target, total_assets, total_ratios, min_outgoing_tx)]
+    dtype = _batch_dtype(columns + scalars, ratio)
+    drift_band_bps = np.broadcast_to(np.asarray(drift_band_bps), (rows,))
+    assert int(np.max(drift_band_bps, initial=0)) <= BASIS_POINTS, "drift_band_bps can't exceed BASIS_POINTS"
+    drift_band_bps = drift_band_bps.astype(dtype)
+
+    current, last_value, max_deposit, max_withdraw = [c.astype(dtype) for c in columns]
+    ratio = ratio.astype(dtype)
+    vault_balance, d4626_asset_target, total_assets, total_ratios, min_outgoing_tx = [s.astype(dtype) for s in scalars]
+
+    present = np.broadcast_to(np.arange(MAX_ADAPTERS) < np.asarray(adapter_count)[..., None], (rows, MAX_ADAPTERS))
+    zero = np.zeros(rows, dtype=dtype)
+
+    reverted = d4626_asset_target > total_assets
+    d4626_delta = zero.copy()
+    target = np.zeros((rows, MAX_ADAPTERS), dtype=dtype)
+    delta = np.zeros((rows, MAX_ADAPTERS), dtype=dtype)
+    blocked = np.zeros((rows, MAX_ADAPTERS), dtype=bool)
+    # Sort key giving the contract's tx order: withdraws, then deposits, each by slot
+    # (withdraw only txs follow the cost ranking instead, routed deposits their deficit).
+    order = np.full((rows, MAX_ADAPTERS), 2 * MAX_ADAPTERS)
+
+    if withdraw_only:
+        # Same ranking as _withdraw_order(): no deposits first, then most over target, then slot.
+        total_adapter_assets = np.where(reverted, zero, total_assets - d4626_asset_target)
+        safe_total_ratios = np.where(total_ratios == 0, 1, total_ratios).astype(dtype)
+        targets = np.where((total_ratios > 0)[:, None], (total_adapter_assets[:, None] * ratio) // safe_total_ratios[:, None], 0)
+        by_excess = np.argsort(targets - current, axis=1, kind="stable")
+        rank = np.take_along_axis(np.where(present, np.where(max_deposit == 0, 0, 1), 2), by_excess, axis=1)
+        withdraw_order = np.take_along_axis(by_excess, np.argsort(rank, axis=1, kind="stable"), axis=1)
+
+        row_index = np.arange(rows)
+        needed = d4626_asset_target > vault_balance
+        target_withdraw_balance = np.where(needed, d4626_asset_target - vault_balance, zero)
+        live = needed.copy()
+        for step in range(MAX_ADAPTERS):
+            pos = withdraw_order[:, step]
+            live &= (target_withdraw_balance != 0) & present[row_index, pos]
+            cur = current[row_index, pos]
+            removed = live & (ratio[row_index, pos] == 0) & (cur > 0)
+            draining = live & ~removed & (cur > 0)
+
+            removed_delta = np.minimum(-cur, max_withdraw[row_index, pos])
+            withdraw = np.where(removed, np.minimum(-removed_delta, target_withdraw_balance), np.minimum(target_withdraw_balance, cur))
+            target_withdraw_balance = np.where(removed | draining, target_withdraw_balance - withdraw, target_withdraw_balance)
+            pos_delta = np.where(removed, removed_delta, np.where(draining, -withdraw, zero))
+
+            delta[row_index, pos] = pos_delta
+            d4626_delta -= pos_delta
+            order[row_index, pos] = np.where(pos_delta != 0, step, order[row_index, pos])
+            reverted |= live & (cur + pos_delta < 0)
+        reverted |= target_withdraw_balance != 0
+    else:
+        total_adapter_target_assets = np.where(reverted, zero, total_assets - d4626_asset_target)
+        brakes = last_value - (last_value * BREAKS_LOSS_NUMERATOR) // BREAKS_LOSS_DENOMINATOR
+        route = route_deposits & (vault_balance >= d4626_asset_target)
+        routable = np.zeros((rows, MAX_ADAPTERS), dtype=bool)
+        routable_delta = np.zeros((rows, MAX_ADAPTERS), dtype=dtype)
+        deficit = np.zeros((rows, MAX_ADAPTERS), dtype=dtype)
+        safe_total_ratios = np.where(total_ratios == 0, 1, total_ratios).astype(dtype)
+        for pos in range(MAX_ADAPTERS):
+            live = present[:, pos]
+            cur = current[:, pos]
+            removed = live & (ratio[:, pos] == 0) & (cur > 0)
+            balanced = live & ~removed
+            reverted |= balanced & (total_ratios == 0)
+
+            pos_target = np.where(balanced, (total_adapter_target_assets * ratio[:, pos]) // safe_total_ratios, zero)
+            pos_delta = pos_target - cur
+            # |delta| * BASIS_POINTS <= target * band, split up so it can't overflow int64.
+            band = (pos_target // BASIS_POINTS) * drift_band_bps + ((pos_target % BASIS_POINTS) * drift_band_bps) // BASIS_POINTS
+            in_band = ((pos_delta > 0) | (vault_balance >= d4626_asset_target)) & (np.abs(pos_delta) <= band)
+            pos_delta = np.where(in_band, zero, pos_delta)
+            pos_delta = np.where(pos_delta > 0, np.minimum(pos_delta, max_deposit[:, pos]),
+                                 np.where(pos_delta < 0, np.maximum(pos_delta, max_withdraw[:, pos]), pos_delta))
+            outgoing = balanced & (pos_delta > 0)
+            pos_blocked = outgoing & (cur < brakes[:, pos])
+            pos_delta = np.where(outgoing & (((pos_delta < min_outgoing_tx) & ~route) | pos_blocked), zero, pos_delta)
+
+            routable[:, pos] = route & outgoing & ~pos_blocked
+            routable_delta[:, pos] = pos_delta
+            deficit[:, pos] = pos_target - cur
+
+            pos_delta = np.where(removed, np.maximum(-cur, max_withdraw[:, pos]), np.where(balanced & ~route, pos_delta, zero))
+
+            target[:, pos] = pos_target
+            delta[:, pos] = pos_delta
+            blocked[:, pos] = pos_blocked
+            d4626_delta -= pos_delta
+            order[:, pos] = np.where(pos_delta < 0, pos, np.where(pos_delta > 0, MAX_ADAPTERS + pos, order[:, pos]))
+            reverted |= live & (cur + pos_delta < 0)
+
+        # Routed deposits: most underweight first (earliest slot on ties), each up to its deficit.
+        row_index = np.arange(rows)
+        spare = np.where(route, vault_balance - d4626_asset_target, zero) + d4626_delta
+        by_deficit = np.argsort(-deficit, axis=1, kind="stable")
+        by_deficit = np.take_along_axis(by_deficit, np.argsort(np.take_along_axis(~routable, by_deficit, axis=1), axis=1, kind="stable"), axis=1)
+        for step in range(MAX_ADAPTERS):
+            pos = by_deficit[:, step]
+            routed_delta = np.minimum(spare, routable_delta[row_index, pos])
+            routed = routable[row_index, pos] & (spare > 0) & (routed_delta >= min_outgoing_tx)
+            delta[row_index, pos] = np.where(routed, routed_delta, delta[row_index, pos])
+            spare -= np.where(routed, routed_delta, zero)
+            d4626_delta -= np.where(routed, routed_delta, zero)
+            order[row_index, pos] = np.where(routed, MAX_ADAPTERS + step, order[row_index, pos])
+
+    tx_count = (order < 2 * MAX_ADAPTERS).sum(axis=1)
+    by_order = np.argsort(order, axis=1, kind="stable")
+    has_tx = np.arange(MAX_ADAPTERS) < tx_count[:, None]
+    tx_adapter = np.where(has_tx, by_order, -1)
+    tx_target = np.where(has_tx, np.take_along_axis(target, by_order, axis=1), 0)
+    tx_delta = np.where(has_tx, np.take_along_axis(delta, by_order, axis=1), 0)
+
+    return BatchResult(reverted, d4626_delta, tx_count, tx_adapter, tx_target, tx_delta, blocked)
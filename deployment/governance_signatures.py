@@ -0,0 +1,73 @@
+#Off-chain endorsements for Governance.endorseWithSignatures. Each guard signs the EIP-712
+#message EndorseStrategy(Nonce, vault, strategy) for a pending strategy, then anyone can submit
+#all the signatures (and optionally activate the strategy) in a single transaction. The
+#message carries the hash of the strategy's terms, so a signature only endorses what the
+#guard was shown.
+
+from eth_abi import encode
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_utils import keccak
+
+# Must match EIP712_NAME/EIP712_VERSION in contracts/Governance.vy.
+DOMAIN_NAME = "AdapterVault Governance"
+DOMAIN_VERSION = "1"
+
+ENDORSE_TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "EndorseStrategy": [
+        {"name": "Nonce", "type": "uint256"},
+        {"name": "vault", "type": "address"},
+        {"name": "strategy", "type": "bytes32"},
+    ],
+}
+
+
+def strategy_hash(strategy) -> bytes:
+    """
+    keccak256 of a ProposedStrategy (LPRatios, min_proposer_payout, drift_band_bps) as
+    Governance hashes the pending strategy.
+    """
+    lp_ratios, min_proposer_payout, drift_band_bps = strategy
+    return keccak(encode(["(address,uint256)[5]", "uint256", "uint256"],
+                         [[(str(a), r) for a, r in lp_ratios], min_proposer_payout, drift_band_bps]))
+
+
+def endorsement_typed_data(governance: str, chain_id: int, nonce: int, vault: str, strategy) -> dict:
+    """
+    The typed data a guard signs to endorse strategy nonce of vault, as accepted by
+    eth_account and eth_signTypedData_v4 wallets. strategy is the pending ProposedStrategy
+    (LPRatios, min_proposer_payout, drift_band_bps).
+    """
+    return {
+        "types": ENDORSE_TYPES,
+        "primaryType": "EndorseStrategy",
+        "domain": {
+            "name": DOMAIN_NAME,
+            "version": DOMAIN_VERSION,
+            "chainId": chain_id,
+            "verifyingContract": str(governance),
+        },
+        "message": {"Nonce": nonce, "vault": str(vault), "strategy": strategy_hash(strategy)},
+    }
+
+
+def sign_endorsement(private_key, governance: str, chain_id: int, nonce: int, vault: str, strategy) -> bytes:
+    """
+    Returns the 65 byte (r, s, v) signature endorseWithSignatures expects.
+    """
+    full_message = endorsement_typed_data(governance, chain_id, nonce, vault, strategy)
+    return bytes(Account.sign_typed_data(private_key, full_message=full_message).signature)
+
+
+def endorsement_digest(governance: str, chain_id: int, nonce: int, vault: str, strategy) -> bytes:
+    """
+    Same as Governance.endorsementDigest(nonce, vault) while strategy is pending.
+    """
+    signable = encode_typed_data(full_message=endorsement_typed_data(governance, chain_id, nonce, vault, strategy))
+    return keccak(b"\x19" + signable.version + signable.header + signable.body)
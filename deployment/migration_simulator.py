@@ -3,6 +3,7 @@ import deploy_mainnet
 from deploy_adapter import pendle_Market
 import sys
 import boa, os, json
+from artifacts import vault_factory
 from eth_account import Account
 from decimal import Decimal
 from web3 import Web3
@@ -47,7 +48,7 @@ if "__main__" in __name__:
 
     market_old = pendle_Market(MARKET_OLD)
     market_new = pendle_Market(MARKET_NEW)
-    vault = boa.load_partial("contracts/AdapterVault.vy").at(VAULT)
+    vault = vault_factory().at(VAULT)
     ASSET = vault.asset()
     SY_OLD, PT_OLD, _ = market_old.readTokens()
     SY_NEW, PT_NEW, _ = market_new.readTokens()
@@ -0,0 +1,584 @@
+#Python port of the Pendle V2 market math (MarketMathCore, LogExpMath, PYIndex) and
+#of the router's ApproxParams binary searches, for building pregen_info offline.
+#
+#Everything is integer math with Solidity's rounding (signed division truncates
+#towards zero), so for a given market state the results match the router's own
+#computation. The state is a single read of:
+#   PendleMarket.readState(router) -> totalPt, totalSy, totalLp, treasury, scalarRoot,
+#                                     expiry, lnFeeRateRoot, reserveFeePercent, lastLnImpliedRate
+#plus the PY index, max(SY.exchangeRate(), YT.pyIndexStored()), and the block timestamp.
+#Note the state must be read for the router, its fee may differ from the market default.
+
+from collections import namedtuple
+
+from deployment.pendle_pregen import (
+    ONE,
+    ApproxParams,
+    PregenInfo,
+    WithdrawPregenInfo,
+    EMPTY_LIMIT_ORDER_DATA,
+    split_pregen_info,
+)
+
+PERCENTAGE_DECIMALS = 100
+DAY = 86400
+IMPLIED_RATE_TIME = 365 * DAY
+MAX_MARKET_PROPORTION = ONE * 96 // 100
+
+MarketState = namedtuple(
+    "MarketState",
+    [
+        "total_pt",
+        "total_sy",
+        "scalar_root",
+        "expiry",
+        "ln_fee_rate_root",
+        "reserve_fee_percent",
+        "last_ln_implied_rate",
+    ],
+)
+
+
+
+def market_state(read_state):
+    """
+    MarketState from the tuple PendleMarket.readState(router) returns.
+    """
+    total_pt, total_sy, _total_lp, _treasury, scalar_root, expiry, ln_fee_rate_root, reserve_fee_percent, last_ln_implied_rate = read_state
+    return MarketState(total_pt, total_sy, scalar_root, expiry, ln_fee_rate_root, reserve_fee_percent, last_ln_implied_rate)
+
+
+MarketPreCompute = namedtuple("MarketPreCompute", ["rate_scalar", "total_asset", "rate_anchor", "fee_rate"])
+
+
+class PendleMathError(Exception):
+    """
+    Raised wherever the Solidity code would revert.
+    """
+
+
+def _div(a, b):
+    #Solidity signed division, truncates towards zero.
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def div_down(a, b):
+    return _div(a * ONE, b)
+
+
+def mul_down(a, b):
+    return _div(a * b, ONE)
+
+
+# LogExpMath (18 decimal fixed point), as used by Pendle.
+
+ONE_20 = 10**20
+ONE_36 = 10**36
+MAX_NATURAL_EXPONENT = 130 * ONE
+MIN_NATURAL_EXPONENT = -41 * ONE
+LN_36_LOWER_BOUND = ONE - 10**17
+LN_36_UPPER_BOUND = ONE + 10**17
+
+X0, A0 = 128 * ONE, 38877084059945950922200000000000000000000000000000000000 #no decimals
+X1, A1 = 64 * ONE, 6235149080811616882910000000 #no decimals
+#20 decimals from here on
+_EXP_TABLE = [
+    (3200000000000000000000, 7896296018268069516100000000000000),
+    (1600000000000000000000, 888611052050787263676000000),
+    (800000000000000000000, 298095798704172827474000),
+    (400000000000000000000, 5459815003314423907810),
+    (200000000000000000000, 738905609893065022723),
+    (100000000000000000000, 271828182845904523536),
+    (50000000000000000000, 164872127070012814685),
+    (25000000000000000000, 128402541668774148407),
+]
+_LN_TABLE = _EXP_TABLE + [
+    (12500000000000000000, 113314845306682631683),
+    (6250000000000000000, 106449445891785942956),
+]
+
+
+def exp(x):
+    if not MIN_NATURAL_EXPONENT <= x <= MAX_NATURAL_EXPONENT:
+        raise PendleMathError("Invalid exponent")
+    if x < 0:
+        return (ONE * ONE) // exp(-x)
+
+    if x >= X0:
+        x -= X0
+        first_an = A0
+    elif x >= X1:
+        x -= X1
+        first_an = A1
+    else:
+        first_an = 1
+
+    x *= 100
+    product = ONE_20
+    for xn, an in _EXP_TABLE:
+        if x >= xn:
+            x -= xn
+            product = (product * an) // ONE_20
+
+    series_sum = ONE_20
+    term = x
+    series_sum += term
+    for n in range(2, 13):
+        term = ((term * x) // ONE_20) // n
+        series_sum += term
+
+    return (((product * series_sum) // ONE_20) * first_an) // 100
+
+
+def _ln(a):
+    if a < ONE:
+        return -_ln((ONE * ONE) // a)
+
+    total = 0
+    if a >= A0 * ONE:
+        a //= A0
+        total += X0
+    if a >= A1 * ONE:
+        a //= A1
+        total += X1
+
+    total *= 100
+    a *= 100
+    for xn, an in _LN_TABLE:
+        if a >= an:
+            a = (a * ONE_20) // an
+            total += xn
+
+    z = ((a - ONE_20) * ONE_20) // (a + ONE_20)
+    z_squared = (z * z) // ONE_20
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11):
+        num = (num * z_squared) // ONE_20
+        series_sum += num // n
+
+    return (total + series_sum * 2) // 100
+
+
+def _ln_36(x):
+    x *= ONE
+    z = _div((x - ONE_36) * ONE_36, x + ONE_36)
+    z_squared = _div(z * z, ONE_36)
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11, 13, 15):
+        num = _div(num * z_squared, ONE_36)
+        series_sum += _div(num, n)
+    return series_sum * 2
+
+
+def ln(a):
+    if a <= 0:
+        raise PendleMathError("out of bounds")
+    if LN_36_LOWER_BOUND < a < LN_36_UPPER_BOUND:
+        return _div(_ln_36(a), ONE)
+    return _ln(a)
+
+
+# PYIndex
+
+def sy_to_asset(index, sy_amount):
+    return _div(sy_amount * index, ONE)
+
+
+def sy_to_asset_up(index, sy_amount):
+    return _div(sy_amount * index + ONE - 1, ONE)
+
+
+def asset_to_sy(index, asset_amount):
+    return _div(asset_amount * ONE, index)
+
+
+def asset_to_sy_up(index, asset_amount):
+    return _div(asset_amount * ONE + index - 1, index)
+
+
+# MarketMathCore
+
+def _exchange_rate_from_implied_rate(ln_implied_rate, time_to_expiry):
+    rt = (ln_implied_rate * time_to_expiry) // IMPLIED_RATE_TIME
+    return exp(rt)
+
+
+def _log_proportion(proportion):
+    if proportion == ONE:
+        raise PendleMathError("MarketProportionMustNotEqualOne")
+    logit_p = div_down(proportion, ONE - proportion)
+    return ln(logit_p)
+
+
+def _exchange_rate(total_pt, total_asset, rate_scalar, rate_anchor, net_pt_to_account):
+    numerator = total_pt - net_pt_to_account
+    if numerator < 0:
+        raise PendleMathError("subNoNeg")
+    proportion = div_down(numerator, total_pt + total_asset)
+    if proportion > MAX_MARKET_PROPORTION:
+        raise PendleMathError("MarketProportionTooHigh")
+    exchange_rate = div_down(_log_proportion(proportion), rate_scalar) + rate_anchor
+    if exchange_rate < ONE:
+        raise PendleMathError("MarketExchangeRateBelowOne")
+    return exchange_rate
+
+
+def market_pre_compute(state, index, block_time):
+    if state.expiry <= block_time:
+        raise PendleMathError("MarketExpired")
+    time_to_expiry = state.expiry - block_time
+
+    rate_scalar = (state.scalar_root * IMPLIED_RATE_TIME) // time_to_expiry
+    if rate_scalar <= 0:
+        raise PendleMathError("MarketRateScalarBelowZero")
+
+    total_asset = sy_to_asset(index, state.total_sy)
+    if state.total_pt == 0 or total_asset == 0:
+        raise PendleMathError("MarketZeroTotalPtOrTotalAsset")
+
+    new_exchange_rate = _exchange_rate_from_implied_rate(state.last_ln_implied_rate, time_to_expiry)
+    if new_exchange_rate < ONE:
+        raise PendleMathError("MarketExchangeRateBelowOne")
+    proportion = div_down(state.total_pt, state.total_pt + total_asset)
+    rate_anchor = new_exchange_rate - div_down(_log_proportion(proportion), rate_scalar)
+
+    fee_rate = _exchange_rate_from_implied_rate(state.ln_fee_rate_root, time_to_expiry)
+    return MarketPreCompute(rate_scalar, total_asset, rate_anchor, fee_rate)
+
+
+def calc_trade(state, comp, index, net_pt_to_account):
+    """
+    Returns (net_sy_to_account, net_sy_fee, net_sy_to_reserve) for a trade of
+    net_pt_to_account PT (positive buys PT from the market, negative sells it).
+    """
+    pre_fee_exchange_rate = _exchange_rate(
+        state.total_pt, comp.total_asset, comp.rate_scalar, comp.rate_anchor, net_pt_to_account
+    )
+    pre_fee_asset_to_account = -div_down(net_pt_to_account, pre_fee_exchange_rate)
+
+    if net_pt_to_account > 0:
+        if div_down(pre_fee_exchange_rate, comp.fee_rate) < ONE:
+            raise PendleMathError("MarketExchangeRateBelowOne")
+        fee = mul_down(pre_fee_asset_to_account, ONE - comp.fee_rate)
+    else:
+        fee = -_div(pre_fee_asset_to_account * (ONE - comp.fee_rate), comp.fee_rate)
+
+    net_asset_to_reserve = _div(fee * state.reserve_fee_percent, PERCENTAGE_DECIMALS)
+    net_asset_to_account = pre_fee_asset_to_account - fee
+
+    if net_asset_to_account < 0:
+        net_sy_to_account = asset_to_sy_up(index, net_asset_to_account)
+    else:
+        net_sy_to_account = asset_to_sy(index, net_asset_to_account)
+    return net_sy_to_account, asset_to_sy(index, fee), asset_to_sy(index, net_asset_to_reserve)
+
+
+def _ln_implied_rate(total_pt, total_asset, rate_scalar, rate_anchor, time_to_expiry):
+    exchange_rate = _exchange_rate(total_pt, total_asset, rate_scalar, rate_anchor, 0)
+    return (ln(exchange_rate) * IMPLIED_RATE_TIME) // time_to_expiry
+
+
+def execute_trade(state, comp, index, block_time, net_pt_to_account):
+    """
+    Market state after a trade (MarketMathCore.executeTradeCore), the next trade in the
+    same block prices off the implied rate this one leaves behind.
+    """
+    net_sy_to_account, _, net_sy_to_reserve = calc_trade(state, comp, index, net_pt_to_account)
+    total_pt = state.total_pt - net_pt_to_account
+    total_sy = state.total_sy - (net_sy_to_account + net_sy_to_reserve)
+    if total_pt < 0 or total_sy < 0:
+        raise PendleMathError("subNoNeg")
+    last_ln_implied_rate = _ln_implied_rate(
+        total_pt, sy_to_asset(index, total_sy), comp.rate_scalar, comp.rate_anchor, state.expiry - block_time
+    )
+    if last_ln_implied_rate == 0:
+        raise PendleMathError("MarketZeroLnImpliedRate")
+    return state._replace(total_pt=total_pt, total_sy=total_sy, last_ln_implied_rate=last_ln_implied_rate)
+
+
+def calc_max_pt_out(state, comp):
+    logit_p = exp(mul_down(comp.fee_rate - comp.rate_anchor, comp.rate_scalar))
+    proportion = div_down(logit_p, logit_p + ONE)
+    numerator = mul_down(proportion, state.total_pt + comp.total_asset)
+    max_pt_out = state.total_pt - numerator
+    #Same 99.9% haircut as the router
+    return (max_pt_out * 999) // 1000
+
+
+def calc_sy_in(state, comp, index, net_pt_out):
+    net_sy_to_account, net_sy_fee, _ = calc_trade(state, comp, index, net_pt_out)
+    return -net_sy_to_account, net_sy_fee
+
+
+def _is_a_smaller_approx_b(a, b, eps):
+    return a <= b and a >= mul_down(b, ONE - eps)
+
+
+class Market:
+    """
+    A snapshot of a Pendle market: state as returned by readState(router), the PY
+    index and the block timestamp the trades are assumed to happen at.
+    """
+
+    def __init__(self, state, index, block_time):
+        self.state = state
+        self.index = index
+        self.block_time = block_time
+        self.comp = market_pre_compute(state, index, block_time)
+        self.max_pt_out = calc_max_pt_out(state, self.comp)
+
+    def _sy_in(self, net_pt_out):
+        #None where the market would revert, which only happens for too large trades.
+        if net_pt_out <= 0:
+            return 0, 0
+        try:
+            return calc_sy_in(self.state, self.comp, self.index, net_pt_out)
+        except PendleMathError:
+            return None
+
+    def _largest_pt_out(self, cost, budget, upper=None):
+        """
+        Largest PT in [0, upper] (max_pt_out by default) with cost(pt) <= budget, cost being monotonic
+        and None where the market would revert. A few secant steps land within a
+        few wei of the answer, a short bracket search then makes it exact.
+        """
+        if upper is None:
+            upper = self.max_pt_out
+
+        def over(pt):
+            if pt <= 0:
+                return -budget
+            c = cost(pt)
+            return None if c is None else c - budget
+
+        x0, f0 = 0, -budget
+        x1 = min(max(budget, 1), upper)
+        f1 = over(x1)
+        for _ in range(64):
+            if f1 is None:
+                x1 = (x0 + x1) // 2
+                f1 = over(x1)
+                continue
+            if f1 == f0 or abs(x1 - x0) <= 1:
+                break
+            x2 = min(max(x1 - f1 * (x1 - x0) // (f1 - f0), 0), upper)
+            x0, f0 = x1, f1
+            x1 = x2
+            f1 = over(x1)
+
+        #Bracket [lo, hi) around x1 with lo affordable and hi not, widening as needed.
+        step = 1
+        lo, hi = x1, x1 + 1
+        while lo > 0 and (over(lo) is None or over(lo) > 0):
+            hi, lo = lo, max(lo - step, 0)
+            step *= 2
+        step = 1
+        while hi <= upper and over(hi) is not None and over(hi) <= 0:
+            lo, hi = hi, min(hi + step, upper + 1)
+            step *= 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            f = over(mid)
+            if f is not None and f <= 0:
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    def swap_exact_sy_for_pt(self, exact_sy_in):
+        """
+        Largest PT out the router accepts for exact_sy_in SY: (net_pt_out, net_sy_fee).
+        """
+        def sy_in(pt):
+            res = self._sy_in(pt)
+            return None if res is None else res[0]
+
+        net_pt_out = self._largest_pt_out(sy_in, exact_sy_in)
+        return net_pt_out, self._sy_in(net_pt_out)[1]
+
+    def swap_exact_yt_for_pt(self, exact_yt_in):
+        """
+        Selling YT for PT: the router buys total_pt_swapped PT, redeems part of it with
+        the YT to pay for them and keeps the rest. Returns (net_pt_out, total_pt_swapped, net_sy_fee)
+        for the largest total_pt_swapped that can be repaid with exact_yt_in YT.
+        """
+        def asset_to_repay(pt):
+            res = self._sy_in(pt)
+            return None if res is None else sy_to_asset_up(self.index, res[0])
+
+        total_pt_swapped = self._largest_pt_out(asset_to_repay, exact_yt_in)
+        net_sy_owed, net_sy_fee = self._sy_in(total_pt_swapped)
+        return total_pt_swapped - sy_to_asset_up(self.index, net_sy_owed), total_pt_swapped, net_sy_fee
+
+    def max_pt_in(self):
+        #Selling more than this pushes the market past MAX_MARKET_PROPORTION
+        return mul_down(MAX_MARKET_PROPORTION, self.state.total_pt + self.comp.total_asset) - self.state.total_pt
+
+    def swap_pt_for_exact_sy(self, exact_sy_out):
+        """
+        Smallest PT that sells for at least exact_sy_out SY (swapExactPtForSy), None
+        if the market can't pay that much.
+        """
+        def sy_out(pt):
+            try:
+                return calc_trade(self.state, self.comp, self.index, -pt)[0]
+            except PendleMathError:
+                return None
+
+        if exact_sy_out <= 0:
+            return 0
+        upper = self.max_pt_in()
+        pt_in = self._largest_pt_out(sy_out, exact_sy_out - 1, upper) + 1
+        if pt_in > upper:
+            return None
+        return pt_in
+
+    def after_trade(self, net_pt_to_account):
+        """
+        The market as the next trade in the same block sees it.
+        """
+        state = execute_trade(self.state, self.comp, self.index, self.block_time, net_pt_to_account)
+        return Market(state, self.index, self.block_time)
+
+    def mint_py_from_sy(self, sy_amount):
+        return sy_to_asset(self.index, sy_amount)
+
+    def approx_swap_exact_sy_for_pt(self, exact_sy_in, approx):
+        """
+        The router's binary search (MarketApproxPtInLib.approxSwapExactSyForPt).
+        Returns (net_pt_out, net_sy_fee, iterations), raises if it doesn't converge.
+        """
+        def check(guess):
+            net_sy_in, net_sy_fee = calc_sy_in(self.state, self.comp, self.index, guess)
+            if net_sy_in > exact_sy_in:
+                return None, False
+            return (guess, net_sy_fee), _is_a_smaller_approx_b(net_sy_in, exact_sy_in, approx.eps)
+
+        if approx.guessOffchain == 0:
+            approx = approx._replace(
+                guessMin=max(approx.guessMin, sy_to_asset(self.index, exact_sy_in)),
+                guessMax=min(approx.guessMax, self.max_pt_out),
+            )
+        return self._approx(approx, check)
+
+    def approx_swap_exact_yt_for_pt(self, exact_yt_in, approx):
+        """
+        The router's binary search (MarketApproxPtOutLib.approxSwapExactYtForPt).
+        Returns (net_pt_out, total_pt_swapped, net_sy_fee, iterations).
+        """
+        def check(guess):
+            net_sy_owed, net_sy_fee = calc_sy_in(self.state, self.comp, self.index, guess)
+            net_asset_to_repay = sy_to_asset_up(self.index, net_sy_owed)
+            if net_asset_to_repay > exact_yt_in:
+                return None, False
+            return (guess - net_asset_to_repay, guess, net_sy_fee), _is_a_smaller_approx_b(
+                net_asset_to_repay, exact_yt_in, approx.eps
+            )
+
+        if approx.guessOffchain == 0:
+            approx = approx._replace(
+                guessMin=max(approx.guessMin, exact_yt_in),
+                guessMax=min(approx.guessMax, self.max_pt_out),
+            )
+        return self._approx(approx, check)
+
+    def _approx(self, approx, check):
+        if approx.guessMin > approx.guessMax or approx.eps > ONE:
+            raise PendleMathError("ApproxParamsInvalid")
+        guess_min, guess_max = approx.guessMin, approx.guessMax
+        for iteration in range(approx.maxIteration):
+            if iteration == 0 and approx.guessOffchain != 0:
+                guess = approx.guessOffchain
+            elif guess_min <= guess_max:
+                guess = (guess_min + guess_max) // 2
+            else:
+                raise PendleMathError("ApproxFail")
+            try:
+                result, done = check(guess)
+            except PendleMathError:
+                #Too large a trade, same as overshooting
+                result, done = None, False
+            if done:
+                return result + (iteration + 1,)
+            if result is None:
+                guess_max = guess - 1
+            else:
+                guess_min = guess
+        raise PendleMathError("ApproxFail")
+
+    def approx_params(self, guess, slack=10**12, eps=10**14, max_iteration=30):
+        """
+        ApproxParams centred on an exact guess: the router checks it first and only
+        falls back to searching guess +/- slack (1e18 based) if the market moved.
+        """
+        margin = max(mul_down(guess, slack), 1)
+        return ApproxParams(max(guess - margin, 0), guess + margin, guess, max_iteration, eps)
+
+
+class PendleMarketModel:
+    """
+    Offline stand-in for PendleAdapter's on-chain estimates. asset_to_sy converts a
+    deposit to SY like SY.previewDeposit(asset, amount) would, sy_for_asset gives the
+    SY that SY.previewRedeem turns into at least the given asset amount (only needed
+    for withdraw_pregen_info).
+    """
+
+    def __init__(self, market, asset_to_sy, sy_for_asset=None):
+        self.market = market
+        self.asset_to_sy = asset_to_sy
+        self.sy_for_asset = sy_for_asset
+
+    def estimate_spot_returns(self, asset_amount):
+        #Same as PendleAdapter.estimate_spot_returns
+        net_pt_out, _ = self.market.swap_exact_sy_for_pt(self.asset_to_sy(asset_amount))
+        return net_pt_out
+
+    def estimate_mint_returns(self, asset_amount):
+        #Same as PendleAdapter.estimate_mint_returns: (total PT, YT leg's total_pt_swapped)
+        py_amount = self.market.mint_py_from_sy(self.asset_to_sy(asset_amount))
+        net_pt_out, total_pt_swapped, _ = self.market.swap_exact_yt_for_pt(py_amount)
+        return py_amount + net_pt_out, total_pt_swapped
+
+    def estimate_split(self, mint_amount, swap_amount):
+        """
+        Split estimator for deployment/pendle_pregen.py. Legs run in the order
+        PendleAdapter.deposit() executes them, so the AMM leg is priced off the
+        market the YT sale left behind.
+        """
+        market = self.market
+        mint_pt, yt_guess, swap_pt = 0, 0, 0
+        if mint_amount > 0:
+            py_amount = market.mint_py_from_sy(self.asset_to_sy(mint_amount))
+            net_pt_out, yt_guess, _ = market.swap_exact_yt_for_pt(py_amount)
+            mint_pt = py_amount + net_pt_out
+            if yt_guess > 0:
+                market = market.after_trade(yt_guess)
+        if swap_amount > 0:
+            swap_pt, _ = market.swap_exact_sy_for_pt(self.asset_to_sy(swap_amount))
+        return mint_pt, yt_guess, swap_pt
+
+    def pregen_info(self, asset_amount, slack=10**12):
+        """
+        PendleAdapter deposit pregen_info with the best mint/swap split and ApproxParams
+        narrowed around exact guesses, so the router's search ends on its first guess.
+        """
+        pg = split_pregen_info(asset_amount, self.estimate_split)
+        return pg._replace(
+            approx_params_swapExactYtForPt=self.market.approx_params(pg.approx_params_swapExactYtForPt.guessOffchain, slack),
+            approx_params_swapExactTokenForPt=self.market.approx_params(pg.approx_params_swapExactTokenForPt.guessOffchain, slack),
+        )
+
+    def withdraw_pregen_info(self, asset_amount, limit=EMPTY_LIMIT_ORDER_DATA):
+        """
+        PendleAdapter withdraw pregen_info selling exactly the PT the AMM needs for
+        asset_amount, optionally filling limit orders first (in which case the AMM only
+        sees what the fills leave over and pt_amount errs on the generous side, the
+        excess stays in the vault as asset).
+        """
+        pt_amount = self.market.swap_pt_for_exact_sy(self.sy_for_asset(asset_amount))
+        if pt_amount is None:
+            raise PendleMathError("MarketInsufficientLiquidity")
+        return WithdrawPregenInfo(asset_amount, pt_amount, limit)
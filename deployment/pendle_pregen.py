@@ -0,0 +1,200 @@
+#Off-chain builder for PendleAdapter's deposit pregen_info (and encoding of its
+#withdraw pregen_info, see WithdrawPregenInfo).
+#
+#PendleAdapter.generate_pregen_info() only compares sending the whole deposit through
+#mintPyFromToken+swapExactYtForPt against swapExactTokenForPt. For large deposits the
+#best result is usually a split: both legs push their own price, so PT out is maximised
+#where their marginal returns meet. best_mint_fraction() searches for that split given
+#an estimator for both legs (router-static eth_calls via independent_legs(), or a local
+#model of the market such as deployment/pendle_math.py), and split_pregen_info() packs
+#the result together with per-leg ApproxParams guesses.
+
+from collections import namedtuple
+
+from eth_abi import decode, encode
+
+ONE = 10**18
+MAX_UINT256 = 2**256 - 1
+
+# Field order matches the structs in contracts/adapters/PendleAdapter.vy.
+ApproxParams = namedtuple("ApproxParams", ["guessMin", "guessMax", "guessOffchain", "maxIteration", "eps"])
+
+Order = namedtuple(
+    "Order",
+    ["salt", "expiry", "nonce", "orderType", "token", "YT", "maker", "receiver", "makingAmount", "lnImpliedRate", "failSafeRate", "permit"],
+)
+FillOrderParams = namedtuple("FillOrderParams", ["order", "signature", "makingAmount"])
+LimitOrderData = namedtuple("LimitOrderData", ["limitRouter", "epsSkipMarket", "normalFills", "flashFills", "optData"])
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+EMPTY_LIMIT_ORDER_DATA = LimitOrderData(ZERO_ADDRESS, 0, [], [], b"")
+
+#On-chain the limit orders are not part of either struct but trail it in pregen_info (see
+#encode_pregen_info), they are kept as the last field here for convenience.
+WithdrawPregenInfo = namedtuple(
+    "WithdrawPregenInfo", ["assumed_asset_amount", "pt_amount", "limit"], defaults=[EMPTY_LIMIT_ORDER_DATA]
+)
+
+PregenInfo = namedtuple(
+    "PregenInfo",
+    [
+        "assumed_asset_amount",
+        "mint_returns",
+        "spot_returns",
+        "approx_params_swapExactYtForPt",
+        "approx_params_swapExactTokenForPt",
+        "mint_fraction",
+        "limit",
+    ],
+    defaults=[EMPTY_LIMIT_ORDER_DATA],
+)
+
+APPROX_PARAMS_ABI = "(uint256,uint256,uint256,uint256,uint256)"
+ORDER_ABI = "(uint256,uint256,uint256,uint8,address,address,address,address,uint256,uint256,uint256,bytes)"
+FILL_ORDER_PARAMS_ABI = "(%s,bytes,uint256)" % ORDER_ABI
+LIMIT_ORDER_DATA_ABI = "(address,uint256,%s[],%s[],bytes)" % (FILL_ORDER_PARAMS_ABI, FILL_ORDER_PARAMS_ABI)
+PREGEN_INFO_ABI = "(uint256,uint256,uint256,%s,%s,uint256)" % (APPROX_PARAMS_ABI, APPROX_PARAMS_ABI)
+WITHDRAW_PREGEN_INFO_ABI = "(uint256,uint256)"
+
+#Must match PendleAdapter.vy
+PREGEN_INFO_SIZE = 448
+WITHDRAW_PREGEN_INFO_SIZE = 64
+MAX_LIMIT_FILLS = 2
+MAX_FILL_BYTES = 100
+
+
+def default_approx_params(guess_offchain=0):
+    """
+    Same as PendleAdapter.default_approx_params, optionally seeded with a guess.
+    """
+    return ApproxParams(0, MAX_UINT256, guess_offchain, 256, 10**14)
+
+
+def _check_limit(limit):
+    assert len(limit.normalFills) <= MAX_LIMIT_FILLS and len(limit.flashFills) <= MAX_LIMIT_FILLS, "too many fills"
+    for fill in limit.normalFills + limit.flashFills:
+        assert len(fill.signature) <= MAX_FILL_BYTES and len(fill.order.permit) <= MAX_FILL_BYTES, "fill too large"
+    assert len(limit.optData) <= MAX_FILL_BYTES, "optData too large"
+
+
+def _decode_limit(raw):
+    fills = lambda raw_fills: [FillOrderParams(Order(*f[0]), f[1], f[2]) for f in raw_fills]
+    return LimitOrderData(raw[0], raw[1], fills(raw[2]), fills(raw[3]), raw[4])
+
+
+def _encode_with_limit(struct_abi, fields, limit):
+    #The limit orders only trail the fixed size struct when there is something to fill
+    data = encode([struct_abi], [fields])
+    if limit.normalFills or limit.flashFills:
+        _check_limit(limit)
+        data += encode([LIMIT_ORDER_DATA_ABI], [limit])
+    return data
+
+
+def _decode_with_limit(struct_abi, size, data):
+    (raw,) = decode([struct_abi], data[:size])
+    limit = EMPTY_LIMIT_ORDER_DATA
+    if len(data) > size:
+        (raw_limit,) = decode([LIMIT_ORDER_DATA_ABI], data[size:])
+        limit = _decode_limit(raw_limit)
+    return raw, limit
+
+
+def encode_pregen_info(pg):
+    """
+    ABI encodes a PregenInfo the way PendleAdapter.deposit() decodes it: the fixed size
+    struct, followed by pg.limit only if it has fills.
+    """
+    return _encode_with_limit(PREGEN_INFO_ABI, pg[:-1], pg.limit)
+
+
+def decode_pregen_info(data):
+    raw, limit = _decode_with_limit(PREGEN_INFO_ABI, PREGEN_INFO_SIZE, data)
+    return PregenInfo(raw[0], raw[1], raw[2], ApproxParams(*raw[3]), ApproxParams(*raw[4]), raw[5], limit)
+
+
+def encode_withdraw_pregen_info(wp):
+    """
+    ABI encodes a WithdrawPregenInfo the way PendleAdapter.withdraw() decodes it: the fixed
+    size struct, followed by wp.limit only if it has fills.
+    """
+    return _encode_with_limit(WITHDRAW_PREGEN_INFO_ABI, wp[:-1], wp.limit)
+
+
+def decode_withdraw_pregen_info(data):
+    raw, limit = _decode_with_limit(WITHDRAW_PREGEN_INFO_ABI, WITHDRAW_PREGEN_INFO_SIZE, data)
+    return WithdrawPregenInfo(raw[0], raw[1], limit)
+
+
+def _leg_amounts(asset_amount, mint_fraction):
+    #Same rounding as PendleAdapter.deposit()
+    mint_amount = asset_amount * mint_fraction // ONE
+    return mint_amount, asset_amount - mint_amount
+
+
+def independent_legs(mint_estimate, swap_estimate):
+    """
+    Builds a split estimator out of per-leg estimators that behave like
+    PendleAdapter.estimate_mint_returns / estimate_spot_returns:
+    mint_estimate(amount) -> (pt_out, yt_swap_guess), swap_estimate(amount) -> pt_out.
+    Both legs are priced against the same market state, which is all router-static
+    eth_calls can do. On-chain the AMM leg runs after the mint leg has moved the
+    price, so this overstates the split's output when both legs trade on one curve.
+    """
+    def estimate_split(mint_amount, swap_amount):
+        mint_pt, yt_guess = mint_estimate(mint_amount) if mint_amount > 0 else (0, 0)
+        swap_pt = swap_estimate(swap_amount) if swap_amount > 0 else 0
+        return mint_pt, yt_guess, swap_pt
+
+    return estimate_split
+
+
+def best_mint_fraction(asset_amount, estimate_split, tolerance=ONE // 1000):
+    """
+    Finds the share of asset_amount (1e18 based) to send through the mint leg.
+
+    estimate_split(mint_amount, swap_amount) -> (mint_pt, yt_swap_guess, swap_pt), see
+    independent_legs(). Total PT out is concave in the split, so a ternary search narrows
+    it down to tolerance. The all-mint and all-swap ends are always considered as well,
+    ties go to the smaller mint share as the AMM leg is the cheaper one in gas.
+
+    Returns (mint_fraction, expected_pt_out).
+    """
+    if asset_amount == 0:
+        return 0, 0
+
+    def returns(mint_fraction):
+        mint_pt, _, swap_pt = estimate_split(*_leg_amounts(asset_amount, mint_fraction))
+        return mint_pt + swap_pt
+
+    lo, hi = 0, ONE
+    while hi - lo > tolerance:
+        m1 = lo + (hi - lo) // 3
+        m2 = hi - (hi - lo) // 3
+        if returns(m1) < returns(m2):
+            lo = m1
+        else:
+            hi = m2
+
+    best = max([0, ONE, (lo + hi) // 2], key=lambda f: (returns(f), -f))
+    return best, returns(best)
+
+
+def split_pregen_info(asset_amount, estimate_split, tolerance=ONE // 1000):
+    """
+    Builds PendleAdapter deposit pregen_info for asset_amount using the best mint/swap
+    split. Each leg's ApproxParams guess is taken at the amount that leg will actually
+    receive, so the router's binary search starts from the right place. mint_returns and
+    spot_returns hold each leg's expected PT rather than the whole amount's.
+    """
+    mint_fraction, _ = best_mint_fraction(asset_amount, estimate_split, tolerance)
+    mint_returns, yt_guess, spot_returns = estimate_split(*_leg_amounts(asset_amount, mint_fraction))
+
+    return PregenInfo(
+        asset_amount,
+        mint_returns,
+        spot_returns,
+        default_approx_params(yt_guess),
+        default_approx_params(spot_returns),
+        mint_fraction,
+    )
@@ -0,0 +1,61 @@
+#Calldata for PendleVaultFactory.deploy_pendle_vaults, the batched form of what
+#deploy_arbitrum.generate / deploy_mainnet.generate print for a single vault. Used when
+#Pendle lists a new maturity across several assets: the owner (multisig) submits one
+#transaction that deploys every adapter + vault pair.
+
+import json
+from decimal import Decimal
+
+import boa
+
+# Must match MAX_VAULTS in contracts/PendleVaultFactory.vy.
+MAX_VAULTS = 10
+DEFAULT_MAX_SLIPPAGE = Decimal(2.0)
+
+
+def vault_names(pt_name: str, pt_symbol: str) -> tuple:
+    """
+    Vault (name, symbol) for a Pendle PT, e.g. "PT Kelp rsETH 27JUN2024", "PT-rsETH-27JUN2024"
+    gives "Adapter PT Kelp rsETH", "aPT-rsETH".
+    """
+    symbol = "a" + "-".join(pt_symbol.split("-")[:2])
+    name = "Adapter " + " ".join(pt_name.split(" ")[:-1])
+    return name, symbol
+
+
+def market_vault_params(market: str, asset: str, init_mint_amount: int, max_slippage_percent: Decimal = DEFAULT_MAX_SLIPPAGE) -> tuple:
+    """
+    PendleVaultParams for a vault investing asset in market, named after the market's PT.
+    Reads the PT from the chain boa is connected to.
+    """
+    with open("contracts/vendor/IPMarketV3.json") as f:
+        j = json.load(f)
+        _market = boa.loads_abi(json.dumps(j["abi"]), name="IPMarketV3").at(market)
+    sy, pt, yt = _market.readTokens()
+    pt = boa.load_partial("contracts/test_helpers/ERC20.vy").at(pt)
+    name, symbol = vault_names(pt.name(), pt.symbol())
+    return (asset, market, name, symbol, pt.decimals(), max_slippage_percent, init_mint_amount)
+
+
+def batch_calldata(factory, params: list) -> str:
+    """
+    Hex calldata of factory.deploy_pendle_vaults(params), params
+    being PendleVaultParams tuples (asset, pendle_market, name, symbol, decimals,
+    max_slippage_percent, init_mint_amount). The sender must hold and have approved the
+    factory for the sum of init_mint_amount per asset.
+    """
+    assert 0 < len(params) <= MAX_VAULTS, "between 1 and %d vaults per batch" % MAX_VAULTS
+    return "0x" + factory.deploy_pendle_vaults.prepare_calldata(params).hex()
+
+
+def generate_batch(factory, vaults: list) -> str:
+    """
+    vaults is a list of (market, asset, init_mint_amount). Prints and returns the calldata
+    deploying all of them from factory.
+    """
+    params = [market_vault_params(market, asset, amount) for market, asset, amount in vaults]
+    for p in params:
+        print("args = ", list(p))
+    calldata = batch_calldata(factory, params)
+    print(calldata)
+    return calldata
@@ -0,0 +1,21 @@
+#Packs per-adapter pregen_info into the compact format AdapterVault expects:
+#   adapter index (1 byte) | payload length (2 bytes, big endian) | payload
+#repeated only for the adapters that actually have something to say.
+
+MAX_PREGEN_INFO = 4096 #Must match Bytes[4096] in AdapterVault.vy
+MAX_ADAPTERS = 5 #Must match MAX_ADAPTERS in AdapterVault.vy
+
+
+def pack_pregen_info(entries):
+    """
+    entries maps an adapter's position in vault.adapter_list() to the bytes
+    returned by that adapter's generate_pregen_info(). Adapters left out get
+    empty pregen_info. The vault rejects an index past the end of its adapter list.
+    """
+    packed = b""
+    for idx, payload in sorted(entries.items()):
+        assert 0 <= idx < MAX_ADAPTERS, "adapter index out of range"
+        assert len(payload) < 2**16, "pregen_info entry too large"
+        packed += bytes([idx]) + len(payload).to_bytes(2, "big") + payload
+    assert len(packed) <= MAX_PREGEN_INFO, "pregen_info too large"
+    return packed
@@ -1,4 +1,5 @@
 import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
 import math
 from decimal import Decimal
 #from titanoboa.debug import breakpoint
@@ -26,11 +27,11 @@ with boa.env.prank(owner):
 
     adapt_junk = boa.load("contracts/adapters/MockLPAdapter.vy", dai, junk)
  
-    gov = boa.load("contracts/Governance.vy",owner,21600)
+    gov = governance_factory().deploy(owner,21600)
 
-    alloc = boa.load("contracts/FundsAllocator.vy")
+    alloc = funds_allocator_factory().deploy(False)
     
-    vault = boa.load("contracts/AdapterVault.vy","BigVault","vlt",2, dai, gov, alloc, Decimal(2.0))
+    vault = vault_factory().deploy("BigVault","vlt",2, dai, gov, alloc, Decimal(2.0))
     vault.add_adapter(adapt_junk)
 
 strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS 
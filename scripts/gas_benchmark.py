@@ -0,0 +1,236 @@
+#Gas benchmarks for AdapterVault entry points.
+#
+#Deploys AdapterVault with 1-5 MockLPAdapter (and MockLPSlippageAdapter, with no slippage
+#plan) instances, runs every entry point once (add_adapter once per adapter, recorded as
+#add_adapter/1, add_adapter/2...) and records the gas each transaction is charged: the
+#intrinsic 21000, the calldata (4 per zero byte, 16 per other byte) and the execution gas,
+#less storage refunds capped at a fifth of that total as on chain (EIP-3529).
+#
+#   python scripts/gas_benchmark.py            compare against scripts/gas_baseline.json
+#   python scripts/gas_benchmark.py --update   rewrite the baseline
+#
+#Compare mode exits non-zero if any call costs more than --tolerance percent over its
+#baseline (or if a scenario/call is missing from it). Improvements are reported but never
+#fail, re-run with --update to lock them in.
+
+import argparse
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import boa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+
+MAX_ADAPTERS = 5
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+BASELINE = Path(__file__).with_name("gas_baseline.json")
+
+ADAPTER_KINDS = ["MockLPAdapter", "MockLPSlippageAdapter"]
+OPERATIONS = [
+    "set_strategy",
+    "deposit",
+    "mint",
+    "claim_yield_fees",
+    "claim_strategy_fees",
+    "claim_all_fees",
+    "set_strategy_replace",
+    "balanceAdapters",
+    "withdraw",
+    "redeem",
+    "swap_adapters",
+    "remove_adapter",
+]
+
+DEPOSIT = 10**21
+YIELD = 10**19
+TX_GAS = 21000
+
+
+def operations(adapter_count):
+    """
+    Names of the calls run_scenario measures with adapter_count adapters.
+    """
+    return ["add_adapter/%d" % (i + 1) for i in range(adapter_count)] + OPERATIONS
+
+
+def tx_gas(computation):
+    """
+    Gas a transaction running computation is charged, refunds included.
+    """
+    calldata = bytes(computation.msg.data)
+    used = TX_GAS + sum(16 if b else 4 for b in calldata) + computation.get_gas_used()
+    return used - min(computation.get_gas_refund(), used // 5)
+
+
+def _strategy(adapters, ratios):
+    strategy = [(ZERO_ADDRESS, 0)] * MAX_ADAPTERS
+    for i, (adapter, ratio) in enumerate(zip(adapters, ratios)):
+        strategy[i] = (adapter.address, ratio)
+    return strategy
+
+
+def run_scenario(kind, adapter_count):
+    """
+    Returns {operation: gas used} for a vault holding adapter_count adapters of kind.
+    """
+    deployer = boa.env.generate_address()
+    trader = boa.env.generate_address()
+    proposer = boa.env.generate_address()
+    gas = {}
+
+    def measure(name, contract):
+        gas[name] = tx_gas(contract._computation)
+
+    with boa.env.prank(deployer):
+        dai = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 10**30, deployer)
+        gov = governance_factory().deploy(deployer, 21600)
+        funds_alloc = funds_allocator_factory().deploy(False)
+        manager = boa.load("contracts/adapters/MockSlippageManager.vy")
+
+        #Each adapter needs its own LP token, the vault refuses to manage one twice.
+        def new_adapter(wrapped=None):
+            wrapped = wrapped or boa.load("contracts/test_helpers/ERC20.vy", "Wrapped DAI", "wDAI", 18, 0, deployer)
+            if kind == "MockLPSlippageAdapter":
+                return boa.load("contracts/adapters/MockLPSlippageAdapter.vy", dai, wrapped, manager)
+            return boa.load("contracts/adapters/MockLPAdapter.vy", dai, wrapped)
+
+        adapters = [new_adapter() for _ in range(adapter_count)]
+        replacement = new_adapter(adapters[-1].wrappedAsset())
+        vault = vault_factory().deploy("TestVault", "vault", 18, dai, gov, funds_alloc, Decimal(2.0))
+        dai.mint(trader, 10 * DEPOSIT)
+
+    #MockLP adapters keep their funds at their own address, the vault pulls them back out.
+    for adapter in adapters + [replacement]:
+        with boa.env.prank(adapter.address):
+            dai.approve(vault, 2**256 - 1)
+
+    with boa.env.prank(deployer):
+        for i, adapter in enumerate(adapters):
+            vault.add_adapter(adapter)
+            measure("add_adapter/%d" % (i + 1), vault)
+
+    with boa.env.prank(gov.address):
+        vault.set_strategy(proposer, _strategy(adapters, [1] * adapter_count), 0)
+        measure("set_strategy", vault)
+
+    with boa.env.prank(trader):
+        dai.approve(vault, 2**256 - 1)
+        vault.deposit(DEPOSIT, trader)
+        measure("deposit", vault)
+        vault.mint(DEPOSIT // 10, trader)
+        measure("mint", vault)
+
+    #Yield accrues in the adapters, so every fee claim has to pull funds out of them.
+    with boa.env.prank(deployer):
+        for name in ["claim_yield_fees", "claim_strategy_fees"]:
+            for adapter in adapters:
+                dai.mint(adapter, YIELD)
+            if name == "claim_yield_fees":
+                vault.claim_yield_fees()
+            else:
+                with boa.env.prank(proposer):
+                    vault.claim_strategy_fees()
+            measure(name, vault)
+
+    with boa.env.prank(gov.address):
+        vault.set_strategy(deployer, _strategy(adapters, [1] * adapter_count), 0)
+    with boa.env.prank(deployer):
+        for adapter in adapters:
+            dai.mint(adapter, YIELD)
+        vault.claim_all_fees()
+        measure("claim_all_fees", vault)
+
+    with boa.env.prank(gov.address):
+        vault.set_strategy(proposer, _strategy(adapters, range(1, adapter_count + 1)), 0)
+        measure("set_strategy_replace", vault)
+
+    with boa.env.prank(deployer):
+        dai.mint(adapters[0], DEPOSIT // 10)
+        vault.balanceAdapters(0)
+        measure("balanceAdapters", vault)
+
+    with boa.env.prank(trader):
+        vault.withdraw(DEPOSIT // 10, trader, trader)
+        measure("withdraw", vault)
+        vault.redeem(DEPOSIT // 10, trader, trader)
+        measure("redeem", vault)
+
+    #An adapter upgrade: the replacement takes over the same LP position.
+    old = adapters[-1]
+    with boa.env.prank(old.address):
+        dai.transfer(replacement, dai.balanceOf(old))
+    with boa.env.prank(deployer):
+        vault.swap_adapters(old, replacement)
+        measure("swap_adapters", vault)
+        vault.remove_adapter(replacement)
+        measure("remove_adapter", vault)
+
+    return gas
+
+
+def run_all(kinds=ADAPTER_KINDS, counts=range(1, MAX_ADAPTERS + 1)):
+    results = {}
+    for kind in kinds:
+        for count in counts:
+            with boa.env.anchor():
+                results["%s/%d" % (kind, count)] = run_scenario(kind, count)
+    return results
+
+
+def compare(baseline, results, tolerance=0.5):
+    """
+    Returns (regressions, improvements) as lists of (scenario, operation, baseline gas, gas).
+    A scenario or operation missing from the baseline counts as a regression with baseline gas None.
+    """
+    regressions, improvements = [], []
+    for scenario, gas in results.items():
+        for op, used in gas.items():
+            before = baseline.get(scenario, {}).get(op)
+            if before is None or used > before * (1 + tolerance / 100):
+                regressions.append((scenario, op, before, used))
+            elif used < before:
+                improvements.append((scenario, op, before, used))
+    return regressions, improvements
+
+
+def _report(title, rows):
+    if not rows:
+        return
+    print(title)
+    for scenario, op, before, used in rows:
+        if before is None:
+            print("  %-26s %-24s %10s -> %10d" % (scenario, op, "missing", used))
+        else:
+            print("  %-26s %-24s %10d -> %10d (%+.2f%%)" % (scenario, op, before, used, 100 * (used - before) / before))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", action="store_true", help="rewrite the baseline with this run")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed increase, in percent")
+    args = parser.parse_args(argv)
+
+    results = run_all()
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("wrote", args.baseline)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(baseline, results, args.tolerance)
+    _report("improvements:", improvements)
+    _report("REGRESSIONS:", regressions)
+    if not regressions:
+        print("no gas regressions over %.2f%%" % args.tolerance)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,7 +59,7 @@ def adapter_adapterX(project, deployer, dai):
 
 @pytest.fixture
 def funds_alloc(project, deployer):
-    f = deployer.deploy(project.FundsAllocator)
+    f = deployer.deploy(project.FundsAllocator, False)
     return f
 
 @pytest.fixture
@@ -54,7 +54,7 @@ def dai(project, owner, accounts):
 
 @pytest.fixture
 def funds_alloc(project, owner):
-    f = owner.deploy(project.FundsAllocator)
+    f = owner.deploy(project.FundsAllocator, False)
     return f
 
 # @pytest.fixture
@@ -158,8 +158,8 @@ def vault_contract_four(governance_contract, owner, project, accounts, dai, fund
 
 
 def test_submitStrategy(governance_contract, vault_contract_one, accounts, owner, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
-    BadStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
+    BadStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 10001)
     owner, operator, someoneelse, someone = accounts[:4]
 
     #Test if i can submit strategy with zero guards
@@ -178,6 +178,9 @@ def test_submitStrategy(governance_contract, vault_contract_one, accounts, owner
     with ape.reverts("Only Guards may submit strategies."):
         sp = governance_contract.submitStrategy(ProposedStrategy, vault_contract_one, sender=owner)
 
+    with ape.reverts("Drift band can't exceed 100%."):
+        governance_contract.submitStrategy(BadStrategy, vault_contract_one, sender=someone)
+
     sp = governance_contract.submitStrategy(ProposedStrategy, vault_contract_one, sender=someone)
 
     w3 = Web3()
@@ -188,6 +191,7 @@ def test_submitStrategy(governance_contract, vault_contract_one, accounts, owner
     assert len(logs) == 1
     assert [(x.adapter.lower(), x.ratio) for x in logs[0].args.strategy.LPRatios] == [tuple(w) for w in WEIGHTS]
     assert logs[0].args.strategy.min_proposer_payout == MIN_PROPOSER_PAYOUT
+    assert logs[0].args.strategy.drift_band_bps == 0
 
     print("Current timestamp %s" % datetime.fromtimestamp(ape.chain.pending_timestamp))
     print("TDelay %s" % datetime.fromtimestamp(int(governance_contract.TDelay())) )
@@ -208,7 +212,7 @@ def test_submitStrategy(governance_contract, vault_contract_one, accounts, owner
 
 
 def test_withdrawStrategy(governance_contract, vault_contract_one, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone = accounts[:4]
 
     #Add a guard
@@ -276,7 +280,7 @@ def test_withdrawStrategy(governance_contract, vault_contract_one, accounts, pro
 
 
 def test_endorseStrategy(governance_contract, vault_contract_one, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone = accounts[:4]
 
     #Add a guard
@@ -333,7 +337,7 @@ def test_endorseStrategy(governance_contract, vault_contract_one, accounts, proj
 
 
 def test_rejectStrategy(governance_contract, vault_contract_one, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone = accounts[:4]
 
     #Add a guard
@@ -374,7 +378,7 @@ def test_rejectStrategy(governance_contract, vault_contract_one, accounts, proje
 
 
 def test_activateStrategy(governance_contract, vault_contract_one, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone = accounts[:4]
 
     #Add a guard
@@ -710,8 +714,8 @@ def VaultsTable(governance_contract, vaults, prev={}):
 
 
 def test_governanceSetupDemo(prompt, governance_contract, vault_contract_one, vault_contract_two, vault_contract_three, vault_contract_four, governance_contract_two, accounts):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
-    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
+    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone, morgan, ben, sajal = accounts[:7]
 
     assert vault_contract_one != vault_contract_two, "Vaults seem to be the same."
@@ -973,10 +977,10 @@ def StrategyTable(governance_contract, vault, prev={}):
 
 
 def test_strategyDemo(prompt, governance_contract, vault_contract_one, vault_contract_two, vault_contract_three, vault_contract_four, governance_contract_two, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
-    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT)
-    ProposedStrategyThree = (WEIGHTSTHREE, MIN_PROPOSER_PAYOUT)
-    ProposedStrategyFour = (WEIGHTSFOUR, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
+    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT, 0)
+    ProposedStrategyThree = (WEIGHTSTHREE, MIN_PROPOSER_PAYOUT, 0)
+    ProposedStrategyFour = (WEIGHTSFOUR, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone, morgan, ben, sajal = accounts[:7]
 
     assert vault_contract_one != vault_contract_two, "Vaults seem to be the same."
@@ -1264,8 +1268,8 @@ def test_strategyDemo(prompt, governance_contract, vault_contract_one, vault_con
 
 
 def test_activateMultipleStrategies(governance_contract, vault_contract_one, vault_contract_two, vault_contract_three, vault_contract_four, governance_contract_two, accounts, project):
-    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT)
-    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT)
+    ProposedStrategy = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
+    ProposedStrategyTwo = (WEIGHTSTWO, MIN_PROPOSER_PAYOUT, 0)
     owner, operator, someoneelse, someone, morgan, ben, sajal = accounts[:7]
 
 
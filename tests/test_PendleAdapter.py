@@ -5,6 +5,7 @@ from tests.conftest import ensure_hardhat, reset_hardhat_fork
 from web3 import Web3
 import requests, json
 import eth_abi
+from deployment.pregen_info import pack_pregen_info
 
 PENDLE_ROUTER="0x00000000005BBB0EF59571E58418F9a4357b68A0"
 PENDLE_ROUTER_STATIC="0x263833d47eA3fA4a30f269323aba6a107f9eB14C"
@@ -48,23 +49,23 @@ def attacker(accounts):
 
 @pytest.fixture
 def pendle_adapter(project, hardhat_fork_block, deployer, steth, pendleOracle):
-    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE)
+    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
 @pytest.fixture
 def pendle_adapter_clone(project, hardhat_fork_block, deployer, steth, pendleOracle):
-    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE)
+    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
 @pytest.fixture
 def pendle_adapter_replacement(project, hardhat_fork_block, deployer, steth, pendleOracle):
-    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE)
+    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
 
 @pytest.fixture
 def pendle_adapter_future(project, hardhat_fork_block, deployer, steth, pendleOracle):
-    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET_FUTURE, PENDLE_ORACLE)
+    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET_FUTURE, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
 @pytest.fixture
@@ -113,7 +114,7 @@ def pendleOracle(project, hardhat_fork_block, deployer):
 
 @pytest.fixture
 def funds_alloc(project, deployer, hardhat_fork_block):
-    f = deployer.deploy(project.FundsAllocator)
+    f = deployer.deploy(project.FundsAllocator, False)
     return f
 
 @pytest.fixture
@@ -415,7 +416,7 @@ def test_pendle_adapter_mint(project, pendle_adapter, pendle_adapter_clone, pend
 
     steth.approve(adaptervault, 1*10**18, sender=trader)
     #Note we had to add _min_shares argument because it comes before pregen
-    recpt_optimized = adaptervault.deposit(1*10**18, trader, 0, [pregen_bytes], sender=trader, gas=30000000)
+    recpt_optimized = adaptervault.deposit(1*10**18, trader, 0, pack_pregen_info({0: pregen_bytes}), sender=trader, gas=30000000)
     print("optimized deposit gas: ", recpt_optimized.gas_used)
     assert recpt_optimized.gas_used < recpt.gas_used, "pregen should use less gas"
     
\ No newline at end of file
@@ -30,7 +30,7 @@ def trader(accounts):
 
 @pytest.fixture
 def pendle_adapter(project, hardhat_fork_block, deployer, steth, pendleOracle):
-    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE)
+    pa = deployer.deploy(project.PendleAdapter, steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE, "0x0000000000000000000000000000000000000000")
     return pa
 
 @pytest.fixture
@@ -60,7 +60,7 @@ def dai(project, deployer, trader):
 
 @pytest.fixture
 def funds_alloc(project, deployer):
-    f = deployer.deploy(project.FundsAllocator)
+    f = deployer.deploy(project.FundsAllocator, False)
     return f
 
 def _setup_single_adapter(_project, _AdapterVault, _deployer, _dai, _adapter, strategizer, ratio=1):
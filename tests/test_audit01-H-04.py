@@ -26,7 +26,7 @@ from  pytest import raises
 #from .test_Governance import owner, governance_contract, dai, funds_alloc, vault_contract_one
 from .test_Governance import WEIGHTS, MIN_PROPOSER_PAYOUT
 
-STRATEGY = (WEIGHTS, MIN_PROPOSER_PAYOUT)
+STRATEGY = (WEIGHTS, MIN_PROPOSER_PAYOUT, 0)
 
 # MUST match Governance.vy MAX_GUARDS
 MAX_GUARDS = 5
@@ -44,7 +44,7 @@ def dai(project, owner, accounts):
 
 @pytest.fixture
 def funds_alloc(project, owner):
-    f = owner.deploy(project.FundsAllocator)
+    f = owner.deploy(project.FundsAllocator, False)
     return f
 
 @pytest.fixture
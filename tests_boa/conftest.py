@@ -1,20 +1,98 @@
+import json
 import os
+import sqlite3
 
 import pytest
 
 import boa
+from boa.environment import Env
+from boa.rpc import RPC, EthereumRPC
 
+ALCHEMY_URLS = {
+    "mainnet": "https://eth-mainnet.g.alchemy.com/v2/",
+    "arbitrum": "https://arb-mainnet.g.alchemy.com/v2/",
+}
+RPC_CACHE_DIR = os.environ.get("BOA_RPC_CACHE_DIR", "~/.cache/adaptervault/rpc")
+
+
+class DiskCachedRPC(RPC):
+    """
+    RPC for a fork pinned at (chain, block). Every answer is kept in a sqlite file for that
+    pair, nothing at a fixed block can change, so once a test has run it can run again without
+    the network. Without WEB3_ALCHEMY_API_KEY only cached answers are available.
+    """
+
+    def __init__(self, chain: str, block_id: int):
+        self.chain = chain
+        self.block_id = block_id
+        alchemy_key = os.environ.get("WEB3_ALCHEMY_API_KEY")
+        self._rpc = EthereumRPC(ALCHEMY_URLS[chain] + alchemy_key) if alchemy_key else None
+
+        cache_dir = os.path.expanduser(RPC_CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "%s-%d.sqlite" % (chain, block_id)), isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS rpc (key TEXT PRIMARY KEY, value TEXT)")
+
+    @property
+    def identifier(self) -> str:
+        return "%s@%d" % (self.chain, self.block_id)
+
+    @property
+    def name(self) -> str:
+        return self.identifier
+
+    def _get(self, key):
+        row = self._db.execute("SELECT value FROM rpc WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _put(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO rpc VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _upstream(self):
+        assert self._rpc is not None, "%s not in the RPC cache, WEB3_ALCHEMY_API_KEY must be provided" % self.identifier
+        return self._rpc
+
+    def fetch(self, method, params):
+        key = json.dumps([method, params])
+        result = self._get(key)
+        if result is None:
+            result = self._upstream().fetch(method, params)
+            self._put(key, result)
+        return result
+
+    def fetch_multi(self, payloads):
+        keys = [json.dumps([method, params]) for method, params in payloads]
+        results = [self._get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fetched = self._upstream().fetch_multi([payloads[i] for i in missing])
+            for i, result in zip(missing, fetched):
+                self._put(keys[i], result)
+                results[i] = result
+        return results
+
+
+def forked_env(chain: str, block_id: int):
+    #boa's own cache sits in memory on top of the disk one
+    boa.env.fork_rpc(DiskCachedRPC(chain, block_id), block_identifier=block_id, cache_file=None)
 
 def forked_env_mainnet(block_id: int):
-    alchemy_key = os.environ.get("WEB3_ALCHEMY_API_KEY")
-    if alchemy_key == "":
-        raise "WEB3_ALCHEMY_API_KEY must be provided"
-    fork_uri =  "https://eth-mainnet.g.alchemy.com/v2/" + alchemy_key
-    boa.env.fork(fork_uri, block_identifier=block_id)        
+    forked_env("mainnet", block_id)
 
 def forked_env_arbitrum(block_id: int):
-    alchemy_key = os.environ.get("WEB3_ALCHEMY_API_KEY")
-    if alchemy_key == "":
-        raise "WEB3_ALCHEMY_API_KEY must be provided"
-    fork_uri =  "https://arb-mainnet.g.alchemy.com/v2/" + alchemy_key
-    boa.env.fork(fork_uri, block_identifier=block_id)        
+    forked_env("arbitrum", block_id)
+
+
+_shared_forks = {}
+
+def shared_fork(chain: str, block_id: int) -> Env:
+    """
+    Returns an Env forked at (chain, block_id), created once per test session. Callers
+    should wrap their use in boa.env.anchor() so they leave it as they found it.
+    """
+    if (chain, block_id) not in _shared_forks:
+        env = Env()
+        with boa.swap_env(env):
+            forked_env(chain, block_id)
+        _shared_forks[(chain, block_id)] = env
+    return _shared_forks[(chain, block_id)]
@@ -1,12 +1,13 @@
-from ..conftest import forked_env_mainnet
+from ..conftest import shared_fork
 import os
 import pytest
 import boa
+from deployment.artifacts import vault_factory, pendle_adapter_factory, funds_allocator_factory, pendle_vault_factory_factory
 import json
-from boa.environment import Env
 from web3 import Web3
 import eth_abi
 from decimal import Decimal
+from deployment.pregen_info import pack_pregen_info
 
 PENDLE_ROUTER="0x00000000005BBB0EF59571E58418F9a4357b68A0"
 PENDLE_ROUTER_STATIC="0x263833d47eA3fA4a30f269323aba6a107f9eB14C"
@@ -16,35 +17,42 @@ MAX_UINT256 = 115792089237316195423570985008687907853269984665640564039457584007
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
 
-@pytest.fixture
+#The fork and everything deployed on it by module scoped fixtures are built once, each test
+#runs against a snapshot of that state which is rolled back afterwards.
+@pytest.fixture(scope="module")
 def setup_chain():
-    with boa.swap_env(Env()):
-        #tests in this file require mainnet block 19850000: May-11-2024 11:13:47 PM +UTC
-        forked_env_mainnet(19850000)
+    #tests in this file require mainnet block 19850000: May-11-2024 11:13:47 PM +UTC
+    with boa.swap_env(shared_fork("mainnet", 19850000)):
+        with boa.env.anchor():
+            yield
+
+@pytest.fixture(autouse=True)
+def rollback(setup_chain):
+    with boa.env.anchor():
         yield
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def vault_blueprint(setup_chain):
-    f = boa.load_partial("contracts/AdapterVault.vy")
+    f = vault_factory()
     return f.deploy_as_blueprint()
 
 def access_vault(addr):
-    f = boa.load_partial("contracts/AdapterVault.vy")
+    f = vault_factory()
     return f.at(addr)
 
 def access_adapter(addr):
-    f = boa.load_partial("contracts/adapters/PendleAdapter.vy")
+    f = pendle_adapter_factory()
     return f.at(addr)
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def pendle_adapter_blueprint(setup_chain):
-    f = boa.load_partial("contracts/adapters/PendleAdapter.vy")
+    f = pendle_adapter_factory()
     return f.deploy_as_blueprint()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def pendle_factory(setup_chain, deployer, funds_alloc, vault_blueprint, pendle_adapter_blueprint):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/PendleVaultFactory.vy")
+        pa = pendle_vault_factory_factory().deploy()
         pa.update_blueprints(vault_blueprint, pendle_adapter_blueprint)
         pa.update_funds_allocator(funds_alloc)
         pa.update_governance(deployer)
@@ -56,13 +64,13 @@ def pendle_factory(setup_chain, deployer, funds_alloc, vault_blueprint, pendle_a
     return pa
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def deployer(setup_chain):
     acc = boa.env.generate_address(alias="deployer")
     boa.env.set_balance(acc, 1000*10**18)
     return acc
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def trader(setup_chain):
     acc = boa.env.generate_address(alias="trader")
     boa.env.set_balance(acc, 1000*10**18)
@@ -132,13 +140,13 @@ def pendle_Market(_pendle_market):
 
 def _pendle_adapter(deployer, asset, _pendle_market):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/adapters/PendleAdapter.vy", asset, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, _pendle_market, PENDLE_ORACLE)
+        pa = pendle_adapter_factory().deploy(asset, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, _pendle_market, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def funds_alloc(setup_chain, deployer):
     with boa.env.prank(deployer):
-        f = boa.load("contracts/FundsAllocator.vy")
+        f = funds_allocator_factory().deploy(False)
     return f
 
 
@@ -184,7 +192,7 @@ def market_test(_pendle_pt, asset, trader, deployer, _pendle_market, pendle_fact
         bal_pre = asset.balanceOf(trader)
         ex_rate = pendleOracle.getPtToAssetRate(_pendle_market, 1200)
         pregen_bytes = pendle_adapter.generate_pregen_info(10**18)
-        adaptervault.deposit(1*10**18, trader, 0, [pregen_bytes])
+        adaptervault.deposit(1*10**18, trader, 0, pack_pregen_info({0: pregen_bytes}))
         print("GAS USED FOR PENDLE DEPOSIT = ", adaptervault._computation.net_gas_used) 
         deducted = bal_pre - asset.balanceOf(trader)
         print(deducted)
@@ -0,0 +1,52 @@
+#Deploys the local Pendle stand-ins in contracts/test_helpers/MockPendle*.vy, so PendleAdapter
+#can be exercised without forking a chain. The market uses a constant product curve rather
+#than Pendle's, see MockPendleMarket.vy.
+
+from collections import namedtuple
+
+import boa
+
+ONE = 10**18
+DAY = 24 * 60 * 60
+
+PendleMock = namedtuple("PendleMock", ["sy", "pt", "yt", "market", "router", "router_static", "oracle", "limit_router"])
+
+
+def deploy_pendle_mock(deployer, asset, expiry=None, liquidity=10**24, pt_price=95 * 10**16, fee_bps=10, accounting_asset=None):
+    """
+    Deploys SY/PT/YT over asset, a market holding liquidity PT priced at pt_price SY each,
+    the router, router-static, oracle and a limit router (holding no PT or SY until funded,
+    it trades at pt_price too). deployer must be asset's minter. The SY's exchange
+    rate can be raised later with sy.set_exchange_rate, minting asset to the SY to back it.
+    With an accounting_asset the SY wraps asset 1:1 and reports its exchange rate in
+    accounting_asset instead, which needs no backing.
+    """
+    if accounting_asset is None:
+        accounting_asset = asset
+    if expiry is None:
+        expiry = boa.env.evm.patch.timestamp + 180 * DAY
+    with boa.env.prank(deployer):
+        sy = boa.load("contracts/test_helpers/MockPendleSY.vy", asset, accounting_asset, "SY Mock", "SY")
+        pt = boa.load("contracts/test_helpers/ERC20.vy", "PT Mock", "PT", 18, 0, deployer)
+        yt = boa.load("contracts/test_helpers/MockPendleYT.vy", sy, pt, expiry, "YT Mock", "YT")
+        pt.transferMinter(yt)
+        market = boa.load("contracts/test_helpers/MockPendleMarket.vy", sy, pt, yt, expiry, fee_bps)
+        router = boa.load("contracts/test_helpers/MockPendleRouter.vy")
+        router_static = boa.load("contracts/test_helpers/MockPendleRouterStatic.vy")
+        oracle = boa.load("contracts/test_helpers/MockPendleOracle.vy")
+        limit_router = boa.load("contracts/test_helpers/MockPendleLimitRouter.vy", pt_price)
+
+        #Mint the PT for the pool out of SY (the exchange rate starts at 1), then pair it with
+        #SY at pt_price.
+        sy_for_pool = liquidity * pt_price // ONE
+        asset.mint(deployer, liquidity + sy_for_pool)
+        asset.approve(sy, liquidity + sy_for_pool)
+        sy.deposit(yt, asset, liquidity, 0)
+        yt.mintPY(deployer, deployer)
+        sy.deposit(deployer, asset, sy_for_pool, 0)
+
+        pt.approve(market, liquidity)
+        sy.approve(market, sy_for_pool)
+        market.addLiquidity(liquidity, sy_for_pool)
+
+    return PendleMock(sy, pt, yt, market, router, router_static, oracle, limit_router)
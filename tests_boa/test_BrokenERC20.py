@@ -1,6 +1,7 @@
 import os
 import pytest
 import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
 from decimal import Decimal
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
@@ -35,13 +36,13 @@ def erc20(deployer, trader):
 @pytest.fixture
 def gov(deployer):
     with boa.env.prank(deployer):
-        g = boa.load("contracts/Governance.vy", deployer, 21600)
+        g = governance_factory().deploy(deployer, 21600)
     return g
 
 @pytest.fixture
 def funds_alloc(deployer):
     with boa.env.prank(deployer):
-        f = boa.load("contracts/FundsAllocator.vy")
+        f = funds_allocator_factory().deploy(False)
     return f
 
 @pytest.fixture
@@ -55,8 +56,7 @@ def adapter(deployer, broke_erc20, erc20):
 @pytest.fixture
 def vault(deployer, broke_erc20, funds_alloc, gov, adapter):
     with boa.env.prank(deployer):
-        v = boa.load(
-            "contracts/AdapterVault.vy",
+        v = vault_factory().deploy(
             "TestVault",
             "vault",
             18,
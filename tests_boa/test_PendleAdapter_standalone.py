@@ -1,6 +1,7 @@
 import os
 import pytest
 import boa
+from deployment.artifacts import pendle_adapter_factory
 import json
 from boa.environment import Env
 from web3 import Web3
@@ -101,7 +102,7 @@ def pendleOracle(setup_chain, pendleMarket):
 @pytest.fixture
 def pendle_adapter(setup_chain, deployer, steth, pendleOracle):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/adapters/PendleAdapter.vy", steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE)
+        pa = pendle_adapter_factory().deploy(steth, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, PENDLE_MARKET, PENDLE_ORACLE, "0x0000000000000000000000000000000000000000")
     return pa
 
 def test_pendle_adapter_standalone(pendle_adapter, pt, steth, pendleRouter, trader, pendleOracle):
@@ -0,0 +1,127 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+MAX_INT256 = 2**255 - 1
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+    return erc
+
+@pytest.fixture
+def erc20(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "ERC20", "Coin", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def wrapped(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "Wrapped", "WRP", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(False)
+    return f
+
+@pytest.fixture
+def adapter(deployer, dai, erc20):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/adapters/MockLPAdapter.vy", dai, erc20)
+    return a
+
+@pytest.fixture
+def legacy_adapter(deployer, dai, wrapped):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/test_helpers/LegacyLPAdapter.vy", dai, wrapped)
+    return a
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapter, legacy_adapter):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        v.add_adapter(adapter)
+        v.add_adapter(legacy_adapter)
+
+    # Adapters need to approve the vault for ERC20 transfers.
+    for a in [adapter, legacy_adapter]:
+        with boa.env.prank(a.address):
+            dai.approve(v.address, 10*10**18)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (adapter.address, 1)
+    strategy[1] = (legacy_adapter.address, 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    return v
+
+
+def test_adapter_state_matches_individual_calls(adapter, dai):
+    with boa.env.prank(dai.address):
+        assets, max_withdraw, max_deposit = adapter.state()
+        assert assets == adapter.totalAssets()
+        assert max_withdraw == adapter.maxWithdraw()
+        assert max_deposit == adapter.maxDeposit()
+
+
+def test_current_balances_with_and_without_state(vault, trader, dai, adapter, legacy_adapter):
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 10000)
+        vault.deposit(10000, trader)
+
+    assert dai.balanceOf(adapter) == 5000
+    assert dai.balanceOf(legacy_adapter) == 5000
+
+    local, adapters, total, ratios = vault.getCurrentBalances()
+    assert local == 0
+    assert total == 10000
+    assert ratios == 2
+
+    # Both the state() path and the legacy fallback report the same shape of data.
+    for pos, a in enumerate([adapter, legacy_adapter]):
+        assert adapters[pos][0] == a.address
+        assert adapters[pos][1] == 5000
+        assert adapters[pos][3] == MAX_INT256
+        assert adapters[pos][4] == -MAX_INT256
+
+    with boa.env.prank(trader):
+        vault.withdraw(6000, trader, trader)
+
+    assert vault.totalAssets() == 4000
+    assert dai.balanceOf(adapter) + dai.balanceOf(legacy_adapter) == 4000
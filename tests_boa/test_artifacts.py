@@ -0,0 +1,90 @@
+import pytest
+import boa
+
+from deployment import artifacts
+from deployment.artifacts import factory, fingerprint, vault_factory
+
+IFACE = """
+@external
+@view
+def count() -> uint256:
+    return 0
+"""
+
+CONTRACT = """
+#pragma version 0.3.10
+from interfaces.ICounter import Counter
+
+count: public(uint256)
+
+@external
+def bump(_other: address):
+    self.count = Counter(_other).count() + 1
+"""
+
+
+@pytest.fixture
+def contract_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    (tmp_path / "src" / "interfaces").mkdir(parents=True)
+    (tmp_path / "src" / "interfaces" / "ICounter.vy").write_text(IFACE)
+    (tmp_path / "src" / "Bumper.vy").write_text(CONTRACT)
+    return tmp_path
+
+
+def test_factory_shared_in_process():
+    assert vault_factory() is vault_factory()
+    assert vault_factory() is factory("contracts/AdapterVault.vy")
+
+
+def test_artifact_written_and_reused(contract_dir, monkeypatch):
+    path = contract_dir / "src" / "Bumper.vy"
+    f = factory(path)
+    written = list((contract_dir / "artifacts").glob("Bumper-*.pickle"))
+    assert len(written) == 1
+
+    #A new process finds it on disk rather than compiling
+    monkeypatch.setattr(artifacts, "_factories", {})
+    monkeypatch.setattr(artifacts, "_compile", lambda *args: pytest.fail("compiled again"))
+    g = factory(path)
+    assert g is not f
+    assert g.compiler_data.bytecode == f.compiler_data.bytecode
+
+    a = g.deploy()
+    b = g.deploy()
+    a.bump(b)
+    b.bump(a)
+    assert b.count() == 2
+
+
+def test_only_private_artifacts_are_read(contract_dir, monkeypatch):
+    path = contract_dir / "src" / "Bumper.vy"
+    factory(path)
+    (artifact,) = (contract_dir / "artifacts").glob("Bumper-*.pickle")
+    assert artifact.stat().st_mode & 0o777 == 0o600
+    assert (contract_dir / "artifacts").stat().st_mode & 0o777 == 0o700
+
+    #Anyone in the group could have replaced it, compile (and rewrite it) rather than unpickle
+    artifact.chmod(0o660)
+    monkeypatch.setattr(artifacts, "_factories", {})
+    monkeypatch.setattr(artifacts.pickle, "load", lambda f: pytest.fail("unpickled"))
+    assert factory(path).compiler_data.bytecode
+    assert artifact.stat().st_mode & 0o777 == 0o600
+
+    #Nor is anything read from or written to a shared directory
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", str(contract_dir / "shared"))
+    monkeypatch.setattr(artifacts, "_factories", {})
+    (contract_dir / "shared").mkdir(mode=0o777)
+    (contract_dir / "shared").chmod(0o777)
+    with pytest.warns(UserWarning, match="isn't private"):
+        factory(path)
+    assert list((contract_dir / "shared").iterdir()) == []
+
+
+def test_fingerprint_covers_imports_and_settings(contract_dir):
+    path = contract_dir / "src" / "Bumper.vy"
+    before = fingerprint(path)
+    assert fingerprint(path, {"no_bytecode_metadata": True}) != before
+
+    (contract_dir / "src" / "interfaces" / "ICounter.vy").write_text(IFACE + "\n@external\ndef reset():\n    pass\n")
+    assert fingerprint(path) != before
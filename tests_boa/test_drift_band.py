@@ -0,0 +1,116 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(False)
+    return f
+
+@pytest.fixture
+def adapters(deployer, dai):
+    result = []
+    for name in ["A", "B"]:
+        with boa.env.prank(deployer):
+            wrapped = boa.load("contracts/test_helpers/ERC20.vy", name, name, 18, 0, deployer)
+            result.append(boa.load("contracts/adapters/MockLPAdapter.vy", dai, wrapped))
+    return result
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapters):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        for adapter in adapters:
+            v.add_adapter(adapter)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    for pos, adapter in enumerate(adapters):
+        # Adapters need to approve the vault for ERC20 transfers.
+        with boa.env.prank(adapter.address):
+            dai.approve(v.address, 10*10**18)
+        strategy[pos] = (adapter.address, 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0, 100)
+
+    return v
+
+
+def test_no_txs_within_drift_band(vault, deployer, trader, dai, adapters):
+    a, b = adapters
+    assert vault.drift_band_bps() == 100
+
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+        vault.deposit(10000, trader)
+    assert [dai.balanceOf(x) for x in adapters] == [5000, 5000]
+
+    # Some yield lands in a, both adapters stay within 1% of their target.
+    with boa.env.prank(trader):
+        dai.transfer(a, 30)
+
+    with boa.env.prank(deployer):
+        vault.balanceAdapters(0)
+    assert [dai.balanceOf(x) for x in adapters] == [5030, 5000]
+
+    # Small deposits wait in the vault rather than paying for dust txs.
+    with boa.env.prank(trader):
+        vault.deposit(40, trader)
+    assert [dai.balanceOf(x) for x in adapters] == [5030, 5000]
+    assert dai.balanceOf(vault) == 40
+
+    # A larger one pushes b out of the band, a stays put.
+    with boa.env.prank(trader):
+        vault.deposit(60, trader)
+    assert [dai.balanceOf(x) for x in adapters] == [5030, 5065]
+    assert dai.balanceOf(vault) == 35
+
+    # Without a band every drift is corrected.
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (a.address, 1)
+    strategy[1] = (b.address, 1)
+    with boa.env.prank(vault.governance()):
+        vault.set_strategy(deployer, strategy, 0)
+    assert vault.drift_band_bps() == 0
+
+    with boa.env.prank(deployer):
+        vault.balanceAdapters(0)
+    assert [dai.balanceOf(x) for x in adapters] == [5065, 5065]
@@ -0,0 +1,119 @@
+import pytest
+import boa
+from deployment.artifacts import funds_allocator_factory
+import numpy as np
+from hypothesis import given, settings, HealthCheck, strategies as st
+
+from deployment.funds_allocator import (
+    MAX_ADAPTERS,
+    ZERO_ADDRESS,
+    FundsAllocatorRevert,
+    BalanceAdapter,
+    get_target_balances,
+    get_target_balances_batch,
+)
+
+ADAPTERS = ["0x%040x" % (i + 1) for i in range(MAX_ADAPTERS)]
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["proportional", "route_deposits"])
+def funds_alloc(request):
+    return funds_allocator_factory().deploy(request.param)
+
+
+# Small amounts make ties and edge cases likely, large ones exercise the rounding.
+amounts = st.one_of(st.integers(0, 1000), st.integers(0, 10**24))
+
+# max_deposit of zero is how matured adapters show up.
+adapter_state = st.tuples(amounts, amounts, st.one_of(st.just(0), amounts), amounts, st.integers(0, 3))
+
+
+@st.composite
+def scenarios(draw):
+    states = draw(st.lists(adapter_state, min_size=0, max_size=MAX_ADAPTERS))
+    adapters = [
+        BalanceAdapter(ADAPTERS[i], current, last_value, max_deposit, -max_withdraw, ratio, 0, 0)
+        for i, (current, last_value, max_deposit, max_withdraw, ratio) in enumerate(states)
+    ]
+    adapters += [BalanceAdapter(ZERO_ADDRESS, 0, 0, 0, 0, 0, 0, 0)] * (MAX_ADAPTERS - len(adapters))
+    vault_balance = draw(amounts)
+    total_assets = vault_balance + sum(a.current for a in adapters)
+    total_assets = draw(st.sampled_from([total_assets, total_assets + draw(amounts)]))
+    d4626_asset_target = draw(st.integers(0, total_assets + 1))
+    total_ratios = draw(st.sampled_from([sum(a.ratio for a in adapters), draw(st.integers(0, 10))]))
+    drift_band_bps = draw(st.sampled_from([0, 1, 50, 10000]))
+    return vault_balance, d4626_asset_target, total_assets, total_ratios, adapters, draw(amounts), draw(st.booleans()), drift_band_bps
+
+
+def _contract_result(funds_alloc, args):
+    try:
+        d4626_delta, tx_count, adapters, blocked = funds_alloc.getTargetBalances(*args)
+    except boa.BoaError:
+        return "revert"
+    return d4626_delta, tx_count, [BalanceAdapter(*a) for a in adapters], list(blocked)
+
+
+def _model_result(args, route_deposits=False):
+    try:
+        return get_target_balances(*args, route_deposits=route_deposits)
+    except FundsAllocatorRevert:
+        return "revert"
+
+
+@settings(max_examples=300, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(scenario=scenarios())
+def test_model_matches_contract(funds_alloc, scenario):
+    assert _model_result(scenario, funds_alloc.route_deposits()) == _contract_result(funds_alloc, scenario)
+
+
+def test_breaks_loss_point_decimal_bounds(funds_alloc):
+    biggest = (2**167 - 1) // 10**10
+    for last_value in [19, 20, 21, 10**18 + 19, biggest, biggest + 1]:
+        adapters = [BalanceAdapter(ADAPTERS[0], last_value - last_value // 20 - 1, last_value, 2**200, 0, 1, 0, 0)]
+        adapters += [BalanceAdapter(ZERO_ADDRESS, 0, 0, 0, 0, 0, 0, 0)] * (MAX_ADAPTERS - 1)
+        args = (0, 0, 2**200, 1, adapters, 0, False, 0)
+        assert _model_result(args, funds_alloc.route_deposits()) == _contract_result(funds_alloc, args)
+
+
+@pytest.mark.parametrize("drift_band_bps", [0, 100])
+@pytest.mark.parametrize("route_deposits", [False, True])
+@pytest.mark.parametrize("withdraw_only", [False, True])
+@pytest.mark.parametrize("high", [10**6, 10**24])
+def test_batch_matches_model(withdraw_only, route_deposits, drift_band_bps, high):
+    rng = np.random.default_rng(1234)
+    rows = 2000
+    # Python ints so the 10**24 case stays exact.
+    draw = lambda *shape: np.array([int(x) for x in rng.integers(0, 2**62, size=shape).ravel()], dtype=object).reshape(shape) % high
+
+    current, last_value, max_deposit, max_withdraw = (draw(rows, MAX_ADAPTERS) for _ in range(4))
+    max_withdraw = -max_withdraw
+    max_deposit = max_deposit * rng.integers(0, 2, size=(rows, MAX_ADAPTERS))
+    ratio = rng.integers(0, 4, size=(rows, MAX_ADAPTERS))
+    adapter_count = rng.integers(0, MAX_ADAPTERS + 1, size=rows)
+    vault_balance = draw(rows)
+    total_assets = vault_balance + current.sum(axis=1) + draw(rows) * rng.integers(0, 2, size=rows)
+    d4626_asset_target = np.array([int(rng.integers(0, 2**62)) % (int(t) + 2) for t in total_assets], dtype=object)
+    total_ratios = np.where(rng.integers(0, 4, size=rows) > 0, ratio.sum(axis=1), rng.integers(0, 3, size=rows))
+    min_outgoing_tx = draw(rows) // 10
+
+    batch = get_target_balances_batch(vault_balance, d4626_asset_target, total_assets, total_ratios, current, last_value,
+                                      max_deposit, max_withdraw, ratio, min_outgoing_tx, adapter_count, withdraw_only, drift_band_bps, route_deposits)
+
+    for row in range(rows):
+        adapters = [
+            BalanceAdapter(ADAPTERS[i], int(current[row, i]), int(last_value[row, i]), int(max_deposit[row, i]),
+                           int(max_withdraw[row, i]), int(ratio[row, i]), 0, 0)
+            for i in range(adapter_count[row])
+        ]
+        expected = _model_result((int(vault_balance[row]), int(d4626_asset_target[row]), int(total_assets[row]),
+                                  int(total_ratios[row]), adapters, int(min_outgoing_tx[row]), withdraw_only, drift_band_bps), route_deposits)
+        assert batch.reverted[row] == (expected == "revert")
+        if expected == "revert":
+            continue
+        d4626_delta, tx_count, txs, blocked = expected
+        assert batch.d4626_delta[row] == d4626_delta
+        assert batch.tx_count[row] == tx_count
+        assert [ADAPTERS[i] if i >= 0 else ZERO_ADDRESS for i in batch.tx_adapter[row]] == [tx.adapter for tx in txs]
+        assert list(batch.tx_target[row]) == [tx.target for tx in txs]
+        assert list(batch.tx_delta[row]) == [tx.delta for tx in txs]
+        assert [ADAPTERS[i] for i in range(MAX_ADAPTERS) if batch.blocked[row, i]] == [b for b in blocked if b != ZERO_ADDRESS]
@@ -0,0 +1,43 @@
+import importlib.util
+import json
+
+spec = importlib.util.spec_from_file_location("gas_benchmark", "scripts/gas_benchmark.py")
+gas_benchmark = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gas_benchmark)
+
+
+def test_baseline_covers_every_scenario():
+    baseline = json.load(open(gas_benchmark.BASELINE))
+    assert sorted(baseline) == sorted(
+        "%s/%d" % (kind, count)
+        for kind in gas_benchmark.ADAPTER_KINDS
+        for count in range(1, gas_benchmark.MAX_ADAPTERS + 1)
+    )
+    for scenario, gas in baseline.items():
+        count = int(scenario.split("/")[1])
+        assert sorted(gas) == sorted(gas_benchmark.operations(count))
+        assert all(used > 0 for used in gas.values())
+
+
+def test_no_gas_regressions():
+    baseline = json.load(open(gas_benchmark.BASELINE))
+    results = gas_benchmark.run_all(["MockLPAdapter"], [1, gas_benchmark.MAX_ADAPTERS])
+    regressions, _ = gas_benchmark.compare(baseline, results)
+    assert regressions == []
+
+
+def test_tx_gas_counts_intrinsic_and_calldata():
+    results = gas_benchmark.run_all(["MockLPAdapter"], [2])["MockLPAdapter/2"]
+    #Every call pays the 21000 base, and the second add_adapter is measured too
+    assert sorted(results) == sorted(gas_benchmark.operations(2))
+    assert all(used > gas_benchmark.TX_GAS for used in results.values())
+
+
+def test_compare_flags_regressions():
+    baseline = {"MockLPAdapter/1": {"deposit": 1000, "withdraw": 1000}}
+    results = {"MockLPAdapter/1": {"deposit": 1004, "withdraw": 990, "redeem": 10}}
+    regressions, improvements = gas_benchmark.compare(baseline, results, tolerance=0.5)
+    assert regressions == [("MockLPAdapter/1", "redeem", None, 10)]
+    assert improvements == [("MockLPAdapter/1", "withdraw", 1000, 990)]
+    regressions, _ = gas_benchmark.compare(baseline, results, tolerance=0.1)
+    assert ("MockLPAdapter/1", "deposit", 1000, 1004) in regressions
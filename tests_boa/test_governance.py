@@ -0,0 +1,335 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from deployment.governance_signatures import endorsement_digest, sign_endorsement
+from decimal import Decimal
+from eth_account import Account
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+TDELAY = 21600
+
+#Field positions in Governance's Strategy struct
+NONCE, PROPOSER, LP_RATIOS, VOTES_ENDORSE, VOTES_REJECT = 0, 1, 2, 9, 10
+
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def guards():
+    return [boa.env.generate_address(alias="guard%d" % i) for i in range(5)]
+
+@pytest.fixture
+def dai(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def gov(deployer, guards):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, TDELAY)
+        for guard in guards[:3]:
+            g.addGuard(guard)
+    return g
+
+@pytest.fixture
+def vault_and_adapter(deployer, dai, gov):
+    return add_vault(deployer, dai, gov)
+
+@pytest.fixture
+def vault(vault_and_adapter):
+    return vault_and_adapter[0]
+
+@pytest.fixture
+def adapter(vault_and_adapter):
+    return vault_and_adapter[1]
+
+
+def add_vault(deployer, dai, gov):
+    with boa.env.prank(deployer):
+        wrapped = boa.load("contracts/test_helpers/ERC20.vy", "Wrapped DAI", "wDAI", 18, 0, deployer)
+        adapter = boa.load("contracts/adapters/MockLPAdapter.vy", dai, wrapped)
+        funds_alloc = funds_allocator_factory().deploy(False)
+        v = vault_factory().deploy("TestVault", "vault", 18, dai, gov, funds_alloc, Decimal(2.0))
+        v.add_adapter(adapter)
+        gov.addVault(v)
+    return v, adapter
+
+
+def proposal(adapter, ratio=1):
+    ratios = [(ZERO_ADDRESS, 0)] * MAX_ADAPTERS
+    ratios[0] = (adapter.address, ratio)
+    return (ratios, 0, 0)
+
+
+def test_guard_index(gov, deployer, guards):
+    g0, g1, g2, g3, g4 = guards
+    with boa.env.prank(deployer):
+        gov.removeGuard(g0)
+        assert gov.guards() == [g2, g1]
+        assert not gov.checkGuard(g0)
+        with boa.reverts("GuardAddress not a current Guard."):
+            gov.removeGuard(g0)
+
+        gov.swapGuard(g2, g3)
+        assert gov.guards() == [g3, g1]
+        assert gov.checkGuard(g3) and not gov.checkGuard(g2)
+        with boa.reverts("New Guard is already a Guard."):
+            gov.swapGuard(g1, g3)
+        with boa.reverts("OldGuardAddress not a current Guard."):
+            gov.swapGuard(g2, g4)
+
+        gov.removeGuard(g1)
+        gov.removeGuard(g3)
+        assert gov.guards() == []
+        gov.addGuard(g4)
+        with boa.reverts("Guard already exists"):
+            gov.addGuard(g4)
+
+
+def test_vault_index(gov, deployer):
+    vaults = [boa.env.generate_address() for _ in range(4)]
+    with boa.env.prank(deployer):
+        for v in vaults[:3]:
+            gov.addVault(v)
+        with boa.reverts():
+            gov.addVault(vaults[0])
+
+        gov.removeVault(vaults[0])
+        assert [gov.VaultList(i) for i in range(2)] == [vaults[2], vaults[1]]
+        assert not gov.checkVault(vaults[0])
+        with boa.reverts("vault not a current vault."):
+            gov.removeVault(vaults[0])
+
+        gov.swapVault(vaults[2], vaults[3])
+        assert gov.checkVault(vaults[3]) and not gov.checkVault(vaults[2])
+        with boa.reverts():
+            gov.swapVault(vaults[2], vaults[0])
+
+        #The vault moved by removeVault can still be removed
+        gov.removeVault(vaults[1])
+        gov.removeVault(vaults[3])
+        assert not any(gov.checkVault(v) for v in vaults)
+
+
+def test_endorse_and_activate(gov, vault, adapter, guards):
+    g0, g1, g2 = guards[:3]
+    with boa.env.prank(g0):
+        nonce = gov.submitStrategy(proposal(adapter), vault)
+    with boa.env.prank(g1):
+        gov.endorseStrategy(nonce, vault)
+        with boa.reverts("Guard has already voted."):
+            gov.endorseStrategy(nonce, vault)
+        with boa.reverts("Guard has already voted."):
+            gov.rejectStrategy(nonce, vault)
+    with boa.env.prank(g0):
+        with boa.reverts("Premature activation with insufficience endorsements."):
+            gov.activateStrategy(nonce, vault)
+    with boa.env.prank(g2):
+        gov.endorseStrategy(nonce, vault)
+
+    pending = gov.PendingStrategyByVault(vault)
+    assert pending[NONCE] == nonce
+    assert pending[PROPOSER] == g0
+    assert pending[VOTES_ENDORSE] == [g1, g2]
+    assert pending[VOTES_REJECT] == []
+
+    with boa.env.prank(g0):
+        gov.activateStrategy(nonce, vault)
+    assert vault.strategy(adapter)[0] == 1
+    assert vault.current_proposer() == g0
+    current = gov.CurrentStrategyByVault(vault)
+    assert current[NONCE] == nonce
+    assert current[VOTES_ENDORSE] == [g1, g2]
+
+
+def test_votes_follow_guard_changes(gov, vault, adapter, deployer, guards):
+    g0, g1, g2, g3, g4 = guards
+    with boa.env.prank(g0):
+        nonce = gov.submitStrategy(proposal(adapter), vault)
+    for guard in (g0, g2):
+        with boa.env.prank(guard):
+            gov.endorseStrategy(nonce, vault)
+
+    with boa.env.prank(deployer):
+        #g2 moves into g0's place in LGov, its vote stays
+        gov.removeGuard(g0)
+        assert gov.PendingStrategyByVault(vault)[VOTES_ENDORSE] == [g2]
+        #g3 gets g0's vote slot but not its vote
+        gov.addGuard(g3)
+        assert gov.PendingStrategyByVault(vault)[VOTES_ENDORSE] == [g2]
+        #g4 takes over g2's slot, its vote is dropped
+        gov.swapGuard(g2, g4)
+        assert gov.PendingStrategyByVault(vault)[VOTES_ENDORSE] == []
+
+    with boa.env.prank(g4):
+        gov.endorseStrategy(nonce, vault)
+    with boa.env.prank(g1):
+        with boa.reverts("Premature activation with insufficience endorsements."):
+            gov.activateStrategy(nonce, vault)
+    with boa.env.prank(g3):
+        gov.endorseStrategy(nonce, vault)
+    with boa.env.prank(g1):
+        gov.activateStrategy(nonce, vault)
+    assert gov.CurrentStrategyByVault(vault)[VOTES_ENDORSE] == [g4, g3]
+
+
+def test_reject_with_replacement(gov, vault, adapter, guards):
+    g0, g1, g2 = guards[:3]
+    with boa.env.prank(g0):
+        nonce = gov.submitStrategy(proposal(adapter), vault)
+    with boa.env.prank(g1):
+        gov.rejectStrategy(nonce, vault)
+    assert gov.PendingStrategyByVault(vault)[VOTES_REJECT] == [g1]
+    with boa.env.prank(g2):
+        gov.rejectStrategy(nonce, vault, proposal(adapter, 2))
+
+    #The second rejection reached a majority and submitted the replacement, with no votes
+    pending = gov.PendingStrategyByVault(vault)
+    assert pending[NONCE] == nonce + 1
+    assert pending[PROPOSER] == g2
+    assert pending[LP_RATIOS][0][1] == 2
+    assert pending[VOTES_REJECT] == []
+
+    boa.env.time_travel(seconds=TDELAY + 1)
+    with boa.env.prank(g0):
+        gov.activateStrategy(nonce + 1, vault)
+    assert vault.strategy(adapter)[0] == 2
+
+
+def test_packed_strategy_round_trip(gov, vault, adapter, guards):
+    g0, g1, g2 = guards[:3]
+    other = boa.env.generate_address()
+    ratios = [(adapter.address, 3), (ZERO_ADDRESS, 0), (other, 2**96 - 1)] + [(ZERO_ADDRESS, 0)] * 2
+    assert gov.NextNonceByVault(vault) == 0
+    with boa.env.prank(g0):
+        nonce = gov.submitStrategy((ratios, 10**30, 250), vault)
+    submitted = boa.env.evm.patch.timestamp
+    assert gov.NextNonceByVault(vault) == nonce + 1
+
+    assert gov.PendingStrategyByVault(vault) == (nonce, g0, ratios, 10**30, 250, submitted, 0, False, 3, [], [], vault.address)
+    assert gov.CurrentStrategyByVault(vault)[NONCE] == 0
+
+    #The next strategy uses fewer LPRatios, what the longer one left behind isn't read
+    with boa.env.prank(g0):
+        gov.withdrawStrategy(nonce, vault)
+    assert gov.PendingStrategyByVault(vault)[7]
+    with boa.env.prank(g1):
+        nonce = gov.submitStrategy(proposal(adapter), vault)
+    pending = gov.PendingStrategyByVault(vault)
+    assert pending[LP_RATIOS] == proposal(adapter)[0]
+    assert pending[7] is False
+
+    boa.env.time_travel(seconds=TDELAY + 1)
+    with boa.env.prank(g2):
+        gov.activateStrategy(nonce, vault)
+    current = gov.CurrentStrategyByVault(vault)
+    assert current[:6] == pending[:6]
+    assert current[6] == boa.env.evm.patch.timestamp
+    assert gov.PendingStrategyByVault(vault)[6] == 0
+
+    ratios[0] = (adapter.address, 2**96)
+    with boa.env.prank(g0):
+        with boa.reverts("Ratio too large."):
+            gov.submitStrategy((ratios, 0, 0), vault)
+        with boa.reverts("min_proposer_payout too large."):
+            gov.submitStrategy((proposal(adapter)[0], 2**128, 0), vault)
+
+
+def test_batched_strategies(gov, deployer, dai, guards):
+    g0, g1, g2 = guards[:3]
+    vaults = [add_vault(deployer, dai, gov) for _ in range(3)]
+
+    with boa.env.prank(g0):
+        nonces = gov.submitStrategies([(v, proposal(a, i + 1)) for i, (v, a) in enumerate(vaults)])
+    assert len(gov.get_logs()) == 3
+    assert nonces == [gov.PendingStrategyByVault(v)[NONCE] for v, _ in vaults]
+
+    batch = [(v, n) for (v, _), n in zip(vaults, nonces)]
+    for guard in (g1, g2):
+        with boa.env.prank(guard):
+            gov.endorseStrategies(batch)
+        assert len(gov.get_logs()) == 3
+
+    #A bad entry reverts the whole batch
+    with boa.env.prank(g0):
+        with boa.reverts("Incorrect strategy nonce."):
+            gov.activateStrategies(batch[:2] + [(vaults[2][0], nonces[2] + 1)])
+        gov.activateStrategies(batch)
+    for i, (v, a) in enumerate(vaults):
+        assert v.strategy(a)[0] == i + 1
+        assert gov.CurrentStrategyByVault(v)[VOTES_ENDORSE] == [g1, g2]
+
+
+@pytest.fixture
+def signers(gov, deployer, guards):
+    #guards[0] stays to submit strategies
+    accounts = [Account.create() for _ in range(3)]
+    with boa.env.prank(deployer):
+        gov.removeGuard(guards[1])
+        gov.removeGuard(guards[2])
+        for acc in accounts:
+            gov.addGuard(acc.address)
+    return accounts
+
+
+def endorsement(acc, gov, nonce, vault, strategy):
+    return sign_endorsement(acc.key, gov.address, boa.env.evm.patch.chain_id, nonce, vault.address, strategy)
+
+
+def test_endorsement_digest(gov, vault, adapter, guards):
+    strategy = proposal(adapter)
+    with boa.env.prank(guards[0]):
+        nonce = gov.submitStrategy(strategy, vault)
+    chain_id = boa.env.evm.patch.chain_id
+    assert gov.endorsementDigest(nonce, vault) == endorsement_digest(gov.address, chain_id, nonce, vault.address, strategy)
+    assert gov.endorsementDigest(nonce, vault) != endorsement_digest(gov.address, chain_id, nonce, vault.address, proposal(adapter, 2))
+
+
+def test_endorse_with_signatures(gov, vault, adapter, guards, signers):
+    relayer = boa.env.generate_address()
+    strategy = proposal(adapter)
+    with boa.env.prank(guards[0]):
+        nonce = gov.submitStrategy(strategy, vault)
+
+    with boa.env.prank(relayer):
+        #Not a guard
+        with boa.reverts("Sender is not eligible to vote"):
+            gov.endorseWithSignatures(nonce, vault, [endorsement(Account.create(), gov, nonce, vault, strategy)])
+        #Signed for another strategy, so it recovers to someone else
+        with boa.reverts("Sender is not eligible to vote"):
+            gov.endorseWithSignatures(nonce, vault, [endorsement(signers[0], gov, nonce + 1, vault, strategy)])
+        #Signed for other terms under the same nonce, so it recovers to someone else
+        with boa.reverts("Sender is not eligible to vote"):
+            gov.endorseWithSignatures(nonce, vault, [endorsement(signers[0], gov, nonce, vault, proposal(adapter, 2))])
+        with boa.reverts("Guard has already voted."):
+            gov.endorseWithSignatures(nonce, vault, [endorsement(signers[0], gov, nonce, vault, strategy)] * 2)
+
+        #2 of 4 guards isn't a majority, the votes are recorded but it isn't activated
+        sigs = [endorsement(acc, gov, nonce, vault, strategy) for acc in signers]
+        assert gov.endorseWithSignatures(nonce, vault, sigs[:2], True) is False
+        assert gov.PendingStrategyByVault(vault)[VOTES_ENDORSE] == [acc.address for acc in signers[:2]]
+        assert vault.strategy(adapter)[0] == 0
+
+        assert gov.endorseWithSignatures(nonce, vault, sigs[2:], True) is True
+    assert vault.strategy(adapter)[0] == 1
+    assert gov.CurrentStrategyByVault(vault)[VOTES_ENDORSE] == [acc.address for acc in signers]
+
+
+def test_endorse_with_malleable_signature(gov, vault, adapter, guards, signers):
+    secp256k1n = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+    with boa.env.prank(guards[0]):
+        nonce = gov.submitStrategy(proposal(adapter), vault)
+    sig = endorsement(signers[0], gov, nonce, vault, proposal(adapter))
+    r, s, v = sig[:32], int.from_bytes(sig[32:64], "big"), sig[64]
+    #(r, n - s, v ^ 1) recovers the same address
+    flipped = r + (secp256k1n - s).to_bytes(32, "big") + bytes([55 - v])
+    with boa.reverts("Invalid signature."):
+        gov.endorseWithSignatures(nonce, vault, [flipped])
+    gov.endorseWithSignatures(nonce, vault, [sig])
+    assert gov.PendingStrategyByVault(vault)[VOTES_ENDORSE] == [signers[0].address]
@@ -0,0 +1,287 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def keeper():
+    acc = boa.env.generate_address(alias="keeper")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+    return erc
+
+@pytest.fixture
+def erc20(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "ERC20", "Coin", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(False)
+    return f
+
+@pytest.fixture
+def adapter(deployer, dai, erc20):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/adapters/MockLPAdapter.vy", dai, erc20)
+    return a
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapter):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        v.add_adapter(adapter)
+
+    # Adapters need to approve the vault for ERC20 transfers.
+    with boa.env.prank(adapter.address):
+        dai.approve(v.address, 10*10**18)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (adapter.address, 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    return v
+
+
+def test_set_idle_buffer(vault, deployer, trader):
+    assert vault.max_idle_assets() == 0
+
+    with boa.env.prank(trader):
+        with boa.reverts("Only owner can set idle buffer."):
+            vault.set_idle_buffer(5000)
+
+    with boa.env.prank(deployer):
+        with boa.reverts("Idle ratio above 100%."):
+            vault.set_idle_buffer(5000, 10001)
+        assert vault.set_idle_buffer(5000)
+
+    assert vault.max_idle_assets() == 5000
+    assert vault.idle_ratio_bps() == 0
+
+
+def test_deposits_buffered_until_flush(vault, deployer, trader, keeper, dai, adapter):
+    # Without a buffer every deposit goes straight to the adapter.
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+        vault.deposit(10000, trader)
+
+    assert dai.balanceOf(adapter) == 10000
+    assert dai.balanceOf(vault) == 0
+
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(3000)
+
+    with boa.env.prank(trader):
+        vault.deposit(1000, trader)
+        vault.deposit(1500, trader)
+
+    assert dai.balanceOf(adapter) == 10000
+    assert dai.balanceOf(vault) == 2500
+    assert vault.totalAssets() == 12500
+    assert vault.balanceOf(trader) == 12500
+
+    # Cash within the buffer stays put.
+    with boa.env.prank(deployer):
+        vault.replaceKeeper(keeper)
+    with boa.env.prank(keeper):
+        with boa.reverts("Nothing to flush."):
+            vault.flush()
+
+    # Once the buffer shrinks the keeper moves the excess into the adapters.
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(1000)
+    with boa.env.prank(keeper):
+        assert vault.flush() == 1000
+
+    assert dai.balanceOf(adapter) == 11500
+    assert dai.balanceOf(vault) == 1000
+
+    # A deposit overflowing the buffer moves its own assets above the buffer into the adapters.
+    with boa.env.prank(trader):
+        vault.deposit(1000, trader)
+
+    assert dai.balanceOf(adapter) == 12500
+    assert dai.balanceOf(vault) == 1000
+
+    # Withdrawals are served from the adapters as usual.
+    with boa.env.prank(trader):
+        vault.withdraw(1000, trader, trader)
+
+    assert vault.totalAssets() == 12500
+
+
+def test_flush_restricted(vault, deployer, trader, keeper, dai):
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+        vault.deposit(10000, trader)
+
+    with boa.env.prank(deployer):
+        with boa.reverts("Idle buffer disabled."):
+            vault.flush()
+        vault.set_idle_buffer(3000)
+
+    with boa.env.prank(trader):
+        vault.deposit(2000, trader)
+        with boa.reverts("Only owner or keeper can flush."):
+            vault.flush()
+        with boa.reverts("Only owner can replace the keeper."):
+            vault.replaceKeeper(trader)
+
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(500)
+        with boa.reverts("Desired assets cannot be less than minimum assets!"):
+            vault.flush(1501)
+        assert vault.flush(1500) == 500
+
+
+def test_flush_leaves_other_adapters_alone(vault, deployer, trader, gov, dai, adapter):
+    with boa.env.prank(deployer):
+        wrapped = boa.load("contracts/test_helpers/ERC20.vy", "Wrapped", "WRP", 18, 1000*10**18, deployer)
+        other = boa.load("contracts/adapters/MockLPAdapter.vy", dai, wrapped)
+        vault.add_adapter(other)
+    with boa.env.prank(other.address):
+        dai.approve(vault.address, 10*10**18)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (adapter.address, 1)
+    strategy[1] = (other.address, 1)
+    with boa.env.prank(gov.address):
+        vault.set_strategy(deployer, strategy, 0)
+
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+        vault.deposit(10000, trader)
+    assert dai.balanceOf(adapter) == 5000
+    assert dai.balanceOf(other) == 5000
+
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(3000)
+    with boa.env.prank(trader):
+        vault.deposit(2000, trader)
+
+    # Now other should hold three quarters but adapter is left over its target.
+    strategy[1] = (other.address, 3)
+    with boa.env.prank(gov.address):
+        vault.set_strategy(deployer, strategy, 0)
+
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(500)
+        assert vault.flush() == 500
+
+    assert dai.balanceOf(adapter) == 5000
+    assert dai.balanceOf(other) == 6500
+
+
+def test_idle_ratio(vault, deployer, trader, dai, adapter):
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+        vault.deposit(10000, trader)
+
+    with boa.env.prank(deployer):
+        vault.set_idle_buffer(3000, 1000)
+    assert vault.idle_ratio_bps() == 1000
+
+    with boa.env.prank(trader):
+        vault.deposit(2500, trader)
+    assert dai.balanceOf(vault) == 2500
+
+    # 10% of the 12500 total is kept as cash, below the 3000 cap.
+    with boa.env.prank(deployer):
+        assert vault.flush() == 1250
+    assert dai.balanceOf(adapter) == 11250
+
+    # An overflowing deposit also only leaves the target cash behind.
+    with boa.env.prank(trader):
+        vault.deposit(2000, trader)
+    assert dai.balanceOf(vault) == 1450
+    assert dai.balanceOf(adapter) == 13050
+
+
+def test_overflowing_deposit_pays_for_own_assets(deployer, trader, dai, erc20, gov, funds_alloc):
+    with boa.env.prank(deployer):
+        m = boa.load("contracts/adapters/MockSlippageManager.vy")
+        slippage_adapter = boa.load("contracts/adapters/MockLPSlippageAdapter.vy", dai, erc20, m)
+        slippage_adapter.set_slippage(Decimal(2.0))
+        v = vault_factory().deploy("TestVault", "vault", 18, dai, gov, funds_alloc, Decimal(2.0))
+        v.add_adapter(slippage_adapter)
+    with boa.env.prank(slippage_adapter.address):
+        dai.approve(v.address, 10*10**18)
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (slippage_adapter.address, 1)
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    with boa.env.prank(trader):
+        dai.approve(v.address, 100000)
+        v.deposit(10000, trader)
+    with boa.env.prank(deployer):
+        v.set_idle_buffer(3000)
+    with boa.env.prank(trader):
+        v.deposit(2500, trader)
+    # Lowering the buffer leaves 1500 of earlier deposits above it.
+    with boa.env.prank(deployer):
+        v.set_idle_buffer(1000)
+
+    depositor = boa.env.generate_address(alias="depositor")
+    with boa.env.prank(deployer):
+        dai.transfer(depositor, 1000)
+    with boa.env.prank(depositor):
+        dai.approve(v.address, 1000)
+
+    def deposit():
+        starting_assets = v.totalAssetsCached()
+        # What 980, the deposit less 2% slippage on its own 1000, buys at the current price.
+        expected_shares = v.convertToShares(980)
+        with boa.env.prank(depositor):
+            shares = v.deposit(1000, depositor)
+        assert shares == expected_shares
+        return v.totalAssetsCached() - starting_assets
+
+    with boa.env.anchor():
+        crossed = deposit()
+    with boa.env.anchor():
+        with boa.env.prank(deployer):
+            v.flush()
+        flushed = deposit()
+
+    # Either way the depositor only pays the 2% for moving their own 1000.
+    assert crossed == flushed == 980
@@ -2,6 +2,7 @@
 import os
 import pytest
 import boa
+from deployment.artifacts import vault_factory, migration_router_factory
 import json
 from boa.environment import Env
 from web3 import Web3
@@ -44,7 +45,7 @@ def trader(setup_chain):
 @pytest.fixture
 def pendle_migrator(setup_chain, deployer):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/PTMigrationRouter.vy", PENDLE_ROUTER, UNISWAP_ROUTER)
+        pa = migration_router_factory().deploy(PENDLE_ROUTER, UNISWAP_ROUTER)
     return pa
 
 
@@ -77,7 +78,7 @@ def _generic_erc20(trader, addr, slot):
 def test_pt_migration_eeth_zap_uni(setup_chain, trader, pendleRouter, pendle_migrator):
     #testing PT-eeth to adapter-rsweth zap using migration contract
     #init live rswETH vault
-    vault = boa.load_partial("contracts/AdapterVault.vy").at(VAULT_RSWETH)
+    vault = vault_factory().at(VAULT_RSWETH)
     #"airdrop" WEETH to trader..
     WEETH = "0xCd5fE23C85820F7B72D0926FC9b05b43E359b7ee"
     weeth = _generic_erc20(trader, WEETH, 101)
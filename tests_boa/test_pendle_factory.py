@@ -1,6 +1,7 @@
 import os
 import pytest
 import boa
+from deployment.artifacts import vault_factory, pendle_adapter_factory, funds_allocator_factory, pendle_vault_factory_factory, migration_router_factory
 import json
 from boa.environment import Env
 from web3 import Web3
@@ -8,6 +9,7 @@ import eth_abi
 from decimal import Decimal
 
 from tests_boa.conftest import forked_env_mainnet
+from deployment.pregen_info import pack_pregen_info
 
 PENDLE_ROUTER="0x00000000005BBB0EF59571E58418F9a4357b68A0"
 NOTHING="0x0000000000000000000000000000000000000000"
@@ -116,40 +118,40 @@ def pendleOracle(setup_chain, pendleMarket):
 
 @pytest.fixture
 def vault_blueprint(setup_chain):
-    f = boa.load_partial("contracts/AdapterVault.vy")
+    f = vault_factory()
     return f.deploy_as_blueprint()
 
 def access_vault(addr):
-    f = boa.load_partial("contracts/AdapterVault.vy")
+    f = vault_factory()
     return f.at(addr)
 
 def access_adapter(addr):
-    f = boa.load_partial("contracts/adapters/PendleAdapter.vy")
+    f = pendle_adapter_factory()
     return f.at(addr)
 
 @pytest.fixture
 def pendle_adapter_blueprint(setup_chain):
-    f = boa.load_partial("contracts/adapters/PendleAdapter.vy")
+    f = pendle_adapter_factory()
     return f.deploy_as_blueprint()
 
 
 @pytest.fixture
 def pendle_factory(setup_chain, deployer, steth, pendleOracle):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/PendleVaultFactory.vy")
+        pa = pendle_vault_factory_factory().deploy()
     return pa
 
 @pytest.fixture
 def pendle_migrator(setup_chain, deployer):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/PTMigrationRouter.vy", PENDLE_ROUTER, UNISWAP_ROUTER)
+        pa = migration_router_factory().deploy(PENDLE_ROUTER, UNISWAP_ROUTER)
     return pa
 
 
 @pytest.fixture
 def funds_alloc(setup_chain, deployer):
     with boa.env.prank(deployer):
-        f = boa.load("contracts/FundsAllocator.vy")
+        f = funds_allocator_factory().deploy(False)
     return f
 
 
@@ -300,7 +302,7 @@ def test_pt_migration(setup_chain, pendle_factory, deployer, steth, trader, vaul
         pregen = pendle_adapter.generate_pregen_info(10* 10**18)
         #Do migration
         pt.approve(pendle_migrator, pt_bal)
-        shares_got = pendle_migrator.migrate(PENDLE_MARKET, pt_bal, steth, minTokenOut, limit, vault, 0, [pregen])
+        shares_got = pendle_migrator.migrate(PENDLE_MARKET, pt_bal, steth, minTokenOut, limit, vault, 0, pack_pregen_info({0: pregen}))
         #Fetch logs...
         logs = pendle_migrator.get_logs(include_child_logs=False)
         assert len(logs) == 1
@@ -0,0 +1,113 @@
+import pytest
+import boa
+from decimal import Decimal
+
+from deployment.artifacts import vault_factory, pendle_adapter_factory, governance_factory, funds_allocator_factory, pendle_vault_factory_factory
+from deployment.pendle_vault_batch import batch_calldata, vault_names
+from tests_boa.pendle_mock import deploy_pendle_mock
+
+INIT_MINT = 10**9
+
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def assets(deployer):
+    with boa.env.prank(deployer):
+        steth = boa.load("contracts/test_helpers/ERC20.vy", "Staked ETH", "stETH", 18, 0, deployer)
+        weeth = boa.load("contracts/test_helpers/ERC20.vy", "Wrapped eETH", "weETH", 18, 0, deployer)
+    return [steth, weeth]
+
+@pytest.fixture
+def markets(deployer, assets):
+    #A second stETH maturity alongside the first, as when Pendle lists a new expiry
+    return [deploy_pendle_mock(deployer, asset) for asset in assets + assets[:1]]
+
+@pytest.fixture
+def governance(deployer):
+    with boa.env.prank(deployer):
+        return governance_factory().deploy(deployer, 21600)
+
+@pytest.fixture
+def pendle_factory(deployer, markets, governance):
+    #Every mock router/oracle serves any mock market, use the first set for the factory.
+    pendle = markets[0]
+    with boa.env.prank(deployer):
+        f = pendle_vault_factory_factory().deploy()
+        f.update_blueprints(vault_factory().deploy_as_blueprint(), pendle_adapter_factory().deploy_as_blueprint())
+        f.update_funds_allocator(funds_allocator_factory().deploy(False))
+        f.update_governance(governance)
+        f.update_pendle_contracts(pendle.router, pendle.router_static, pendle.oracle, pendle.limit_router)
+    return f
+
+
+def batch(assets, markets):
+    #Two stETH vaults (one per maturity) and one weETH vault, so an asset is shared within the batch.
+    return [
+        (assets[0].address, markets[0].market.address, "Adapter PT stETH", "aPT-stETH", 18, Decimal(2.0), INIT_MINT),
+        (assets[1].address, markets[1].market.address, "Adapter PT weETH", "aPT-weETH", 18, Decimal(2.0), INIT_MINT),
+        (assets[0].address, markets[2].market.address, "Adapter PT stETH 2", "aPT-stETH-2", 18, Decimal(1.5), 2 * INIT_MINT),
+    ]
+
+
+def test_deploy_pendle_vaults(deployer, assets, markets, governance, pendle_factory):
+    params = batch(assets, markets)
+    with boa.env.prank(deployer):
+        for asset in assets:
+            asset.mint(deployer, 3 * INIT_MINT)
+            asset.approve(pendle_factory, 3 * INIT_MINT)
+        vaults = pendle_factory.deploy_pendle_vaults(params)
+    assert len(vaults) == len(params)
+    assert len(set(vaults)) == len(params)
+
+    logs = pendle_factory.get_logs(include_child_logs=False)
+    assert len(logs) == len(params)
+    for log, vault_addr, p in zip(logs, vaults, params):
+        assert log.topics[0] == vault_addr, "event mismatch"
+        assert log.topics[1] == p[0], "event mismatch"
+        assert log.args[0] == p[1], "event mismatch"
+
+        vault = vault_factory().at(vault_addr)
+        assert vault.asset() == p[0]
+        assert vault.name() == p[2]
+        assert vault.symbol() == p[3]
+        assert vault.eval("MAX_SLIPPAGE_PERCENT") == p[5]
+        assert vault.owner() == deployer
+        assert vault.governance() == governance.address
+        assert vault.current_proposer() == deployer
+        assert vault.totalSupply() == pytest.approx(p[6], 0.02)
+        assert vault.balanceOf(pendle_factory) == 0
+        adapter = pendle_adapter_factory().at(vault.adapters(0))
+        assert adapter.eval("pendleMarket") == p[1]
+        assert adapter.eval("pendleLimitRouter") == markets[0].limit_router.address
+    #Everything approved was deposited
+    assert assets[0].balanceOf(deployer) == 0
+    assert assets[1].balanceOf(deployer) == 2 * INIT_MINT
+    assert assets[0].balanceOf(pendle_factory) == 0
+
+    #The helper builds the same call
+    assert batch_calldata(pendle_factory, params) == "0x" + pendle_factory.deploy_pendle_vaults.prepare_calldata(params).hex()
+
+
+def test_deploy_pendle_vaults_checks(deployer, assets, markets, pendle_factory):
+    params = batch(assets, markets)
+    attacker = boa.env.generate_address(alias="attacker")
+    with boa.env.prank(attacker):
+        with boa.reverts("Only owner may deploy a vault"):
+            pendle_factory.deploy_pendle_vaults(params)
+    with boa.env.prank(deployer):
+        with boa.reverts("No vaults to deploy"):
+            pendle_factory.deploy_pendle_vaults([])
+        with boa.reverts("Some amount shares must be burned"):
+            pendle_factory.deploy_pendle_vaults([params[0][:6] + (0,)] + params[1:])
+        pendle_factory.update_pendle_contracts(markets[0].router, markets[0].router_static, "0x0000000000000000000000000000000000000000")
+        with boa.reverts("pendle_oracle must be defined"):
+            pendle_factory.deploy_pendle_vaults(params)
+
+
+def test_vault_names():
+    assert vault_names("PT Kelp rsETH 27JUN2024", "PT-rsETH-27JUN2024") == ("Adapter PT Kelp rsETH", "aPT-rsETH")
@@ -0,0 +1,144 @@
+import math
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from deployment.pendle_pregen import default_approx_params, encode_pregen_info, decode_pregen_info
+from deployment.pendle_math import (
+    ONE,
+    DAY,
+    MarketState,
+    Market,
+    market_state,
+    PendleMarketModel,
+    PendleMathError,
+    exp,
+    ln,
+    calc_trade,
+)
+
+NOW = 1_700_000_000
+INDEX = 11 * 10**17
+
+#Roughly a 1M PT / 1.1M asset market, 5% implied, 6 months to expiry.
+STATE = MarketState(
+    total_pt=10**24,
+    total_sy=10**24,
+    scalar_root=20 * ONE,
+    expiry=NOW + 180 * DAY,
+    ln_fee_rate_root=ln(ONE + 5 * 10**14),
+    reserve_fee_percent=80,
+    last_ln_implied_rate=ln(105 * 10**16),
+)
+
+
+@pytest.fixture(scope="module")
+def market():
+    return Market(STATE, INDEX, NOW)
+
+
+@pytest.mark.parametrize("x", [1, 10**10, 5 * 10**17, 95 * 10**16, ONE, 105 * 10**16, 3 * ONE, 10**30])
+def test_ln(x):
+    assert ln(x) / ONE == pytest.approx(math.log(x / ONE), rel=1e-15, abs=1e-17)
+
+
+@pytest.mark.parametrize("x", [-40 * ONE, -ONE, 0, 10**15, ONE, 5 * ONE, 100 * ONE])
+def test_exp(x):
+    assert exp(x) / ONE == pytest.approx(math.exp(x / ONE), rel=1e-15, abs=1e-18)
+
+
+def test_market_state_from_read_state():
+    read_state = (STATE.total_pt, STATE.total_sy, 10**24, "0x" + "00" * 20, STATE.scalar_root, STATE.expiry,
+                  STATE.ln_fee_rate_root, STATE.reserve_fee_percent, STATE.last_ln_implied_rate)
+    assert market_state(read_state) == STATE
+
+
+def test_expired_market_reverts():
+    with pytest.raises(PendleMathError):
+        Market(STATE, INDEX, STATE.expiry)
+
+
+@settings(max_examples=200, deadline=None)
+@given(sy_in=st.integers(1, 10**25))
+def test_swap_exact_sy_for_pt_is_exact(market, sy_in):
+    net_pt_out, _ = market.swap_exact_sy_for_pt(sy_in)
+    assert market._sy_in(net_pt_out)[0] <= sy_in
+    if net_pt_out < market.max_pt_out:
+        more = market._sy_in(net_pt_out + 1)
+        assert more is None or more[0] > sy_in
+
+
+@pytest.mark.parametrize("sy_in", [10**16, ONE, 10**21, 10**23])
+def test_router_takes_exact_guess_first_try(market, sy_in):
+    net_pt_out, _ = market.swap_exact_sy_for_pt(sy_in)
+    searched = market.approx_swap_exact_sy_for_pt(sy_in, default_approx_params())
+    guessed = market.approx_swap_exact_sy_for_pt(sy_in, market.approx_params(net_pt_out))
+    assert guessed == (net_pt_out, guessed[1], 1)
+    assert searched[2] > 10
+    assert searched[0] <= net_pt_out
+
+
+@pytest.mark.parametrize("yt_in", [10**16, ONE, 10**21])
+def test_yt_for_pt_router_takes_exact_guess_first_try(market, yt_in):
+    net_pt_out, total_pt_swapped, _ = market.swap_exact_yt_for_pt(yt_in)
+    assert total_pt_swapped > yt_in
+    guessed = market.approx_swap_exact_yt_for_pt(yt_in, market.approx_params(total_pt_swapped))
+    assert guessed[:2] == (net_pt_out, total_pt_swapped)
+    assert guessed[3] == 1
+    assert market.approx_swap_exact_yt_for_pt(yt_in, default_approx_params())[3] > 10
+
+
+def test_stale_guess_still_converges(market):
+    net_pt_out, _ = market.swap_exact_sy_for_pt(ONE)
+    #Market moved a little since the guess was made: the narrow bounds still hold the answer.
+    moved = Market(STATE._replace(total_sy=STATE.total_sy + 10**20), INDEX, NOW)
+    exact, _ = moved.swap_exact_sy_for_pt(ONE)
+    assert exact != net_pt_out
+    result = moved.approx_swap_exact_sy_for_pt(ONE, market.approx_params(net_pt_out, slack=10**16))
+    assert result[0] <= exact
+    assert result[2] < 30
+
+
+def test_split_trades_price_off_moved_market(market):
+    first, _ = market.swap_exact_sy_for_pt(50 * ONE)
+    second, _ = market.after_trade(first).swap_exact_sy_for_pt(50 * ONE)
+    single, _ = market.swap_exact_sy_for_pt(100 * ONE)
+    assert second < first
+    #Each trade is priced at its post-trade rate, so two halves beat one whole.
+    assert single < first + second
+
+
+@pytest.mark.parametrize("asset_amount", [ONE, 1000 * ONE, 50000 * ONE])
+def test_model_pregen_info(market, asset_amount):
+    model = PendleMarketModel(market, lambda amount: amount * ONE // INDEX)
+    pg = model.pregen_info(asset_amount)
+    assert decode_pregen_info(encode_pregen_info(pg)) == pg
+    assert 0 < pg.mint_fraction < ONE
+    assert pg.mint_returns + pg.spot_returns > model.estimate_spot_returns(asset_amount)
+
+    mint_amount = asset_amount * pg.mint_fraction // ONE
+    mint_pt, yt_guess = model.estimate_mint_returns(mint_amount)
+    assert (pg.mint_returns, pg.approx_params_swapExactYtForPt.guessOffchain) == (mint_pt, yt_guess)
+    moved = PendleMarketModel(market.after_trade(yt_guess), model.asset_to_sy)
+    assert pg.spot_returns == pg.approx_params_swapExactTokenForPt.guessOffchain == moved.estimate_spot_returns(asset_amount - mint_amount)
+    for approx in (pg.approx_params_swapExactYtForPt, pg.approx_params_swapExactTokenForPt):
+        assert approx.guessMin < approx.guessOffchain < approx.guessMax
+        assert approx.guessMax - approx.guessMin < approx.guessOffchain // 10**5
+
+
+@settings(max_examples=100, deadline=None)
+@given(sy_out=st.integers(1, 10**23))
+def test_swap_pt_for_exact_sy_is_exact(market, sy_out):
+    pt_in = market.swap_pt_for_exact_sy(sy_out)
+    assert calc_trade(market.state, market.comp, market.index, -pt_in)[0] >= sy_out
+    assert calc_trade(market.state, market.comp, market.index, -(pt_in - 1))[0] < sy_out
+
+
+def test_model_withdraw_pregen_info(market):
+    model = PendleMarketModel(market, lambda amount: amount * ONE // INDEX, lambda amount: -(-amount * ONE // INDEX))
+    wp = model.withdraw_pregen_info(1000 * ONE)
+    assert wp.assumed_asset_amount == 1000 * ONE
+    assert wp.pt_amount == market.swap_pt_for_exact_sy(-(-1000 * ONE * ONE // INDEX))
+    #PT trades below asset before expiry
+    assert wp.pt_amount > 1000 * ONE
+    with pytest.raises(PendleMathError):
+        model.withdraw_pregen_info(10**26)
@@ -0,0 +1,362 @@
+import pytest
+import boa
+from eth_utils import keccak
+from deployment.artifacts import vault_factory, pendle_adapter_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+
+from deployment.pendle_pregen import decode_pregen_info, encode_pregen_info, encode_withdraw_pregen_info, WithdrawPregenInfo, LimitOrderData, FillOrderParams, Order
+from deployment.pregen_info import pack_pregen_info
+from tests_boa.pendle_mock import ONE, DAY, deploy_pendle_mock
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+#Pendle's OrderType
+SY_FOR_PT = 0
+PT_FOR_SY = 1
+GET_PT_TO_SY_RATE = keccak(text="getPtToSyRate(address,uint32)")[:4]
+
+RATE_READER = """
+#pragma version 0.3.10
+#pragma evm-version cancun
+
+interface Adapter:
+    def state() -> (uint256, uint256, uint256): nonpayable
+
+@external
+def state_twice(_adapter: address):
+    Adapter(_adapter).state()
+    Adapter(_adapter).state()
+
+@external
+@view
+def static_state(_adapter: address) -> uint256:
+    response: Bytes[96] = raw_call(_adapter, method_id("state()"), max_outsize=96, is_static_call=True)
+    return convert(slice(response, 0, 32), uint256)
+"""
+
+
+def calls_to(computation, address, selector):
+    """
+    Number of calls to selector on address made anywhere during the given call.
+    """
+    count = 0
+    for child in computation.children:
+        if child.msg.code_address == boa.util.abi.Address(address.address).canonical_address and child.msg.data[:4] == selector:
+            count += 1
+        count += calls_to(child, address, selector)
+    return count
+
+
+def limit_order(limit_router, pendle, order_type, making, fills=1):
+    #making split evenly over fills orders, each with a full size signature
+    making //= fills
+    order = Order(0, 2**255, 0, order_type, pendle.sy.address, pendle.yt.address, limit_router.address, ZERO_ADDRESS, making, 0, 0, b"")
+    return LimitOrderData(limit_router.address, 0, [FillOrderParams(order._replace(salt=i), b"\x01" * 65, making) for i in range(fills)], [], b"")
+
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def steth(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "Staked ETH", "stETH", 18, 0, deployer)
+        erc.mint(trader, 10**23)
+    return erc
+
+@pytest.fixture
+def pendle(deployer, steth):
+    return deploy_pendle_mock(deployer, steth)
+
+@pytest.fixture
+def pendle_adapter(deployer, steth, pendle):
+    with boa.env.prank(deployer):
+        pa = pendle_adapter_factory().deploy(steth, pendle.router, pendle.router_static, pendle.market, pendle.oracle, pendle.limit_router)
+    return pa
+
+def deploy_vault(deployer, steth, pendle_adapter):
+    with boa.env.prank(deployer):
+        gov = governance_factory().deploy(deployer, 21600)
+        funds_alloc = funds_allocator_factory().deploy(False)
+        v = vault_factory().deploy("pendle_stETH", "pstETH", 18, steth, gov, funds_alloc, Decimal(2.0))
+        v.add_adapter(pendle_adapter)
+    strategy = [(ZERO_ADDRESS, 0)] * MAX_ADAPTERS
+    strategy[0] = (pendle_adapter.address, 1)
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+    return v
+
+@pytest.fixture
+def vault(deployer, steth, pendle_adapter):
+    return deploy_vault(deployer, steth, pendle_adapter)
+
+
+def test_oracle_state_checked(deployer, steth, pendle):
+    pendle.oracle.set_oracle_state(True, True)
+    with boa.env.prank(deployer):
+        with boa.reverts("Oracle requires cardinality increase"):
+            pendle_adapter_factory().deploy(steth, pendle.router, pendle.router_static, pendle.market, pendle.oracle, pendle.limit_router)
+
+
+def test_router_matches_router_static(trader, steth, pendle):
+    static_pt, _, _, _, _ = pendle.router_static.swapExactTokenForPtStatic(pendle.market, steth, 10**21)
+    static_py = pendle.router_static.mintPyFromTokenStatic(pendle.yt, steth, 10**21)
+    with boa.env.prank(trader):
+        steth.approve(pendle.router, 2 * 10**21)
+        inp = (steth.address, 10**21, steth.address, ZERO_ADDRESS, (0, ZERO_ADDRESS, b"", False))
+        limit = (ZERO_ADDRESS, 0, [], [], b"")
+        pt_out, _, _ = pendle.router.swapExactTokenForPt(trader, pendle.market, 0, (0, 0, 0, 0, 0), inp, limit)
+        assert pt_out == static_pt > 10**21
+        py_out, _ = pendle.router.mintPyFromToken(trader, pendle.yt, 0, inp)
+        assert py_out == static_py == 10**21
+
+        yt_pt, total_swapped, _, _, _ = pendle.router_static.swapExactYtForPtStatic(pendle.market, py_out)
+        pendle.yt.approve(pendle.router, py_out)
+        assert pendle.router.swapExactYtForPt(trader, pendle.market, py_out, 0, (0, 0, 0, 0, 0))[0] == yt_pt
+        assert total_swapped == py_out + yt_pt
+        assert pendle.pt.balanceOf(trader) == pt_out + py_out + yt_pt
+        assert pendle.yt.balanceOf(trader) == 0
+
+
+def test_deposit_withdraw(vault, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    pt_balance = pendle.pt.balanceOf(vault)
+    #PT trades below asset before expiry
+    assert pt_balance > 10**21
+    assert vault.totalAssets() == pytest.approx(10**21, rel=1e-3)
+
+    #Hold the oracle still, the withdrawal should sell PT at about that rate
+    pendle.oracle.set_pt_to_sy_rate(pendle.market, pendle.market.spotPtToSyRate())
+    with boa.env.prank(trader):
+        vault.withdraw(5 * 10**20, trader, trader)
+    assert pendle.pt.balanceOf(vault) == pytest.approx(pt_balance // 2, rel=1e-2)
+    assert steth.balanceOf(trader) == pytest.approx(10**23 - 5 * 10**20, rel=1e-5)
+
+
+@pytest.mark.parametrize("mint_fraction", [0, ONE // 2, ONE])
+def test_deposit_with_pregen_info(vault, trader, steth, pendle, pendle_adapter, mint_fraction):
+    pg = decode_pregen_info(pendle_adapter.generate_pregen_info(10**21))._replace(mint_fraction=mint_fraction)
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader, 0, pack_pregen_info({0: encode_pregen_info(pg)}))
+    assert pendle.pt.balanceOf(vault) > 10**21
+    #Every route leaves nothing behind in the vault or the router
+    assert steth.balanceOf(vault) == 0
+    assert pendle.yt.balanceOf(vault) == 0
+    assert pendle.pt.balanceOf(pendle.router) == pendle.yt.balanceOf(pendle.router) == 0
+
+
+def test_withdraw_with_limit_orders(vault, deployer, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    rate = pendle.market.spotPtToSyRate()
+    pendle.oracle.set_pt_to_sy_rate(pendle.market, rate)
+    #A maker buying PT 1% above the market
+    with boa.env.prank(deployer):
+        steth.mint(deployer, 10**20)
+        steth.approve(pendle.sy, 10**20)
+        pendle.sy.deposit(pendle.limit_router, steth, 10**20, 0)
+        pendle.limit_router.set_pt_price(rate * 101 // 100)
+
+    pt_balance = pendle.pt.balanceOf(vault)
+    pt_amount = 5 * 10**20 * ONE // rate
+    wp = WithdrawPregenInfo(5 * 10**20, pt_amount, limit_order(pendle.limit_router, pendle, SY_FOR_PT, 10**20, fills=2))
+    with boa.env.prank(trader):
+        vault.withdraw(5 * 10**20, trader, trader, 0, pack_pregen_info({0: encode_withdraw_pregen_info(wp)}))
+    assert pendle.pt.balanceOf(vault) == pt_balance - pt_amount
+    #The orders were filled ahead of the AMM
+    assert pendle.sy.balanceOf(pendle.limit_router) == 0
+    assert pendle.pt.balanceOf(pendle.limit_router) == pytest.approx(10**20 * ONE // (rate * 101 // 100), rel=1e-12)
+    assert steth.balanceOf(trader) == 10**23 - 5 * 10**20
+
+
+def test_withdraw_pregen_info_checked(vault, deployer, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    rate = pendle.market.spotPtToSyRate()
+    pendle.oracle.set_pt_to_sy_rate(pendle.market, rate)
+
+    #Only the limit router the adapter was deployed with
+    with boa.env.prank(trader):
+        other_router = boa.load("contracts/test_helpers/MockPendleLimitRouter.vy", rate)
+    wp = WithdrawPregenInfo(10**20, 10**20 * ONE // rate, limit_order(other_router, pendle, SY_FOR_PT, 10**19))
+    with boa.env.prank(trader):
+        with boa.reverts("limitRouter not allowed"):
+            vault.withdraw(10**20, trader, trader, 0, pack_pregen_info({0: encode_withdraw_pregen_info(wp)}))
+
+    #Selling far more PT than the oracle asks for is capped, the excess stays in the vault as asset
+    pt_balance = pendle.pt.balanceOf(vault)
+    pt_estimate = 10**20 * ONE // rate
+    wp = WithdrawPregenInfo(10**20, 10 * pt_estimate, limit_order(pendle.limit_router, pendle, SY_FOR_PT, 0)._replace(normalFills=[]))
+    with boa.env.prank(trader):
+        vault.withdraw(10**20, trader, trader, 0, pack_pregen_info({0: encode_withdraw_pregen_info(wp)}))
+    assert pendle.pt.balanceOf(vault) == pt_balance - pt_estimate * 102 // 100
+    assert steth.balanceOf(trader) == 10**23 - 10**21 + 10**20
+
+
+def test_deposit_with_limit_orders(vault, deployer, trader, steth, pendle, pendle_adapter):
+    #A maker selling PT 1% below the market
+    rate = pendle.market.spotPtToSyRate()
+    with boa.env.prank(deployer):
+        steth.mint(deployer, 10**20)
+        steth.approve(pendle.sy, 10**20)
+        pendle.sy.deposit(pendle.yt, steth, 10**20, 0)
+        pendle.yt.mintPY(pendle.limit_router, deployer)
+        pendle.limit_router.set_pt_price(rate * 99 // 100)
+
+    pg = decode_pregen_info(pendle_adapter.generate_pregen_info(10**21))._replace(
+        mint_fraction=0,
+        limit=limit_order(pendle.limit_router, pendle, PT_FOR_SY, 10**20, fills=2),
+    )
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader, 0, pack_pregen_info({0: encode_pregen_info(pg)}))
+    #The orders were filled ahead of the AMM
+    assert pendle.pt.balanceOf(pendle.limit_router) == 0
+    assert pendle.sy.balanceOf(pendle.limit_router) == pytest.approx(10**20 * (rate * 99 // 100) // ONE, rel=1e-12)
+    assert pendle.pt.balanceOf(vault) > 10**21 + 10**20 // 100
+    assert steth.balanceOf(vault) == 0
+
+    #Only the limit router the adapter was deployed with
+    with boa.env.prank(trader):
+        other_router = boa.load("contracts/test_helpers/MockPendleLimitRouter.vy", rate)
+        steth.approve(vault, 10**20)
+        pg = pg._replace(limit=limit_order(other_router, pendle, PT_FOR_SY, 10**19))
+        with boa.reverts("limitRouter not allowed"):
+            vault.deposit(10**20, trader, 0, pack_pregen_info({0: encode_pregen_info(pg)}))
+
+
+def test_matured_withdraw_redeems(vault, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    pt_balance = pendle.pt.balanceOf(vault)
+
+    boa.env.time_travel(seconds=181 * DAY)
+    assert pendle_adapter.maxDeposit() == 0
+    #1 PT redeems for 1 asset at a constant exchange rate
+    assert vault.totalAssets() == pt_balance
+    with boa.env.prank(trader):
+        vault.redeem(vault.balanceOf(trader), trader, trader)
+    #Only the unclaimed yield fees are left
+    fees = vault.totalAssets()
+    assert pendle.pt.balanceOf(vault) == fees < pt_balance // 100
+    assert steth.balanceOf(trader) == pytest.approx(10**23 - 10**21 + pt_balance - fees)
+
+
+def test_matured_after_slashing(vault, deployer, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    pt_balance = pendle.pt.balanceOf(vault)
+
+    #The YT stored index stays at 1.0 while the SY loses 10%
+    with boa.env.prank(deployer):
+        pendle.sy.slash_exchange_rate(9 * ONE // 10)
+    boa.env.time_travel(seconds=181 * DAY)
+    assert pendle.yt.pyIndexStored() == ONE > pendle.sy.exchangeRate()
+    #Each PT redeems for 1/pyIndex SY worth 0.9 asset, not 1 asset
+    assert vault.totalAssets() == pt_balance * 9 // 10
+    assert pendle_adapter.totalAssets(sender=vault.address) == pt_balance * 9 // 10
+
+    with boa.env.prank(trader):
+        assets = vault.redeem(vault.balanceOf(trader), trader, trader)
+    assert steth.balanceOf(trader) == 10**23 - 10**21 + assets
+    #What was reported could actually be redeemed
+    assert assets + vault.totalAssets() == pytest.approx(pt_balance * 9 // 10, rel=1e-9)
+
+
+def test_sy_with_other_accounting_asset(deployer, trader, steth):
+    #Like SY-wstETH: wraps the vault asset 1:1 while its exchange rate is in another token, so
+    #the adapter has to convert with previewDeposit/previewRedeem instead of the exchange rate.
+    with boa.env.prank(deployer):
+        eth = boa.load("contracts/test_helpers/ERC20.vy", "Ether", "ETH", 18, 0, deployer)
+    #Priced for the 1.2 exchange rate set below, 1 SY mints 1.2 PT
+    pendle = deploy_pendle_mock(deployer, steth, pt_price=79 * 10**16, accounting_asset=eth)
+    with boa.env.prank(deployer):
+        pendle.sy.set_exchange_rate(12 * ONE // 10)
+        pendle_adapter = pendle_adapter_factory().deploy(steth, pendle.router, pendle.router_static, pendle.market, pendle.oracle, pendle.limit_router)
+    assert pendle_adapter.eval("exchange_rate_conversion") == False
+    vault = deploy_vault(deployer, steth, pendle_adapter)
+
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    pt_balance = pendle.pt.balanceOf(vault)
+    rate = pendle.market.spotPtToSyRate()
+    pendle.oracle.set_pt_to_sy_rate(pendle.market, rate)
+    #1 SY = 1 stETH, the 1.2 exchange rate (in ETH) doesn't come into it
+    assert pendle_adapter.totalAssets(sender=vault.address) == pt_balance * rate // ONE
+    assert vault.totalAssets() == pytest.approx(10**21, rel=1e-3)
+
+    with boa.env.prank(trader):
+        vault.withdraw(5 * 10**20, trader, trader)
+    assert pendle.pt.balanceOf(vault) == pytest.approx(pt_balance // 2, rel=1e-2)
+    assert steth.balanceOf(trader) == pytest.approx(10**23 - 5 * 10**20, rel=1e-5)
+    trader_balance = steth.balanceOf(trader)
+
+    #Once matured each PT redeems for 1 / 1.2 SY, worth as much stETH
+    boa.env.time_travel(seconds=181 * DAY)
+    pt_balance = pendle.pt.balanceOf(vault)
+    assert vault.totalAssets() == pt_balance * (ONE * ONE // (12 * ONE // 10)) // ONE
+    with boa.env.prank(trader):
+        assets = vault.redeem(vault.balanceOf(trader), trader, trader)
+    assert steth.balanceOf(trader) == trader_balance + assets
+    assert assets + vault.totalAssets() == pytest.approx(pt_balance * 10 // 12, rel=1e-9)
+
+
+def test_claim_rewards(vault, deployer, pendle, pendle_adapter):
+    with boa.env.prank(deployer):
+        reward = boa.load("contracts/test_helpers/ERC20.vy", "Pendle", "PENDLE", 18, 1000, deployer)
+        reward.approve(pendle.market, 10**20)
+        pendle.market.addRewards(reward, vault, 10**20)
+        vault.claimRewards(pendle_adapter, deployer)
+    assert reward.balanceOf(deployer) == 1000 * 10**18
+
+
+def test_pt_rate_memoized_per_transaction(vault, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+
+    #A new block with a new rate: whatever was memoized before is stale
+    boa.env.time_travel(seconds=60)
+    rate = pendle.market.spotPtToSyRate() * 99 // 100
+    pendle.oracle.set_pt_to_sy_rate(pendle.market, rate)
+    pt_balance = pendle.pt.balanceOf(vault)
+    with boa.env.prank(trader):
+        vault.withdraw(10**20, trader, trader)
+    #The withdraw gathers state() for balancing, prices the withdrawal and re-reads
+    #totalAssets, all from a single oracle read
+    assert calls_to(vault._computation, pendle.oracle, GET_PT_TO_SY_RATE) == 1
+    assert pendle_adapter.totalAssets(sender=vault.address) == pendle.pt.balanceOf(vault) * rate // ONE
+    assert pendle.pt.balanceOf(vault) < pt_balance
+
+
+def test_pt_rate_not_memoized_outside_vault(vault, trader, steth, pendle, pendle_adapter):
+    with boa.env.prank(trader):
+        steth.approve(vault, 10**21)
+        vault.deposit(10**21, trader)
+    reader = boa.loads(RATE_READER)
+    with boa.env.prank(vault.address):
+        pendle.pt.transfer(reader, 10**18)
+
+    #Called directly the adapter never writes to (its own) transient storage, so a
+    #STATICCALL works and every call reads the oracle
+    boa.env.time_travel(seconds=60)
+    assert reader.static_state(pendle_adapter) == pendle_adapter.totalAssets(sender=reader.address) > 0
+    reader.state_twice(pendle_adapter)
+    assert calls_to(reader._computation, pendle.oracle, GET_PT_TO_SY_RATE) == 2
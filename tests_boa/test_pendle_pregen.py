@@ -0,0 +1,116 @@
+import json
+import pytest
+
+from deployment.pendle_pregen import (
+    ONE,
+    PregenInfo,
+    WithdrawPregenInfo,
+    LimitOrderData,
+    FillOrderParams,
+    Order,
+    ZERO_ADDRESS,
+    EMPTY_LIMIT_ORDER_DATA,
+    MAX_LIMIT_FILLS,
+    PREGEN_INFO_SIZE,
+    WITHDRAW_PREGEN_INFO_SIZE,
+    best_mint_fraction,
+    independent_legs,
+    split_pregen_info,
+    encode_pregen_info,
+    decode_pregen_info,
+    encode_withdraw_pregen_info,
+    decode_withdraw_pregen_info,
+    default_approx_params,
+)
+
+
+#Toy legs with diminishing returns: price impact grows with the amount pushed through.
+def mint_estimate(amount):
+    pt = 2 * amount - amount * amount // (400 * 10**18)
+    return pt, pt // 2
+
+
+def swap_estimate(amount):
+    return 2 * amount - amount * amount // (100 * 10**18)
+
+
+estimate_split = independent_legs(mint_estimate, swap_estimate)
+
+
+def _limit():
+    order = Order(1, 2, 3, 0, ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 5, 6, 7, b"")
+    return LimitOrderData("0x" + "11" * 20, 3, [FillOrderParams(order, b"\x01" * 65, 4)], [], b"")
+
+
+def _abi_components(name):
+    abi = json.load(open("abis/PendleAdapter.abi.json"))
+    return [e for e in abi if e.get("name") == name][0]["outputs"][0]["components"]
+
+
+def test_pregen_info_layout_matches_adapter():
+    assert [c["name"] for c in _abi_components("abi_helper")] == list(PregenInfo._fields[:-1])
+    pg = PregenInfo(1, 2, 3, default_approx_params(4), default_approx_params(5), ONE // 3)
+    assert pg.limit == EMPTY_LIMIT_ORDER_DATA
+    #Without fills there is nothing trailing the fixed size struct
+    assert len(encode_pregen_info(pg)) == PREGEN_INFO_SIZE
+    assert len(encode_pregen_info(pg._replace(limit=_limit()._replace(normalFills=[])))) == PREGEN_INFO_SIZE
+    for pg in [pg, pg._replace(limit=_limit())]:
+        data = encode_pregen_info(pg)
+        assert decode_pregen_info(data) == pg
+
+
+def test_pregen_info_fits_several_fills():
+    limit = _limit()
+    fills = limit.normalFills * MAX_LIMIT_FILLS
+    pg = PregenInfo(1, 2, 3, default_approx_params(4), default_approx_params(5), ONE // 3, limit._replace(normalFills=fills, flashFills=fills))
+    data = encode_pregen_info(pg)
+    assert len(data) < 4096 - 3 #has to fit a single pack_pregen_info entry
+    assert decode_pregen_info(data) == pg
+
+
+def test_withdraw_pregen_info_layout_matches_adapter():
+    assert [c["name"] for c in _abi_components("withdraw_abi_helper")] == list(WithdrawPregenInfo._fields[:-1])
+    limit = _abi_components("limit_abi_helper")
+    assert [c["name"] for c in limit] == list(LimitOrderData._fields)
+    fill = limit[2]["components"]
+    assert [c["name"] for c in fill] == list(FillOrderParams._fields)
+    assert [c["name"] for c in fill[0]["components"]] == list(Order._fields)
+
+    limit = _limit()
+    assert len(encode_withdraw_pregen_info(WithdrawPregenInfo(10, 20))) == WITHDRAW_PREGEN_INFO_SIZE
+    for wp in [WithdrawPregenInfo(10, 20, limit), WithdrawPregenInfo(10, 20, EMPTY_LIMIT_ORDER_DATA)]:
+        assert decode_withdraw_pregen_info(encode_withdraw_pregen_info(wp)) == wp
+    with pytest.raises(AssertionError):
+        encode_withdraw_pregen_info(WithdrawPregenInfo(10, 20, limit._replace(flashFills=limit.normalFills * (MAX_LIMIT_FILLS + 1))))
+
+
+def test_small_deposit_has_no_price_impact():
+    #Marginal return of both legs is 2 at zero.
+    fraction, pt = best_mint_fraction(10**12, estimate_split)
+    assert pt == pytest.approx(2 * 10**12, rel=1e-6)
+
+
+@pytest.mark.parametrize("asset_amount", [10**18, 50 * 10**18, 99 * 10**18])
+def test_large_deposit_is_split(asset_amount):
+    fraction, pt = best_mint_fraction(asset_amount, estimate_split, tolerance=10**9)
+    #Marginals 2 - 2m/400 and 2 - 2s/100 meet at m = 4s, so 80% goes through the mint leg.
+    assert fraction == pytest.approx(ONE * 4 // 5, rel=1e-6)
+    assert pt >= mint_estimate(asset_amount)[0]
+    assert pt >= swap_estimate(asset_amount)
+
+
+def test_one_sided_market():
+    no_amm = lambda amount: 0
+    assert best_mint_fraction(10**18, independent_legs(mint_estimate, no_amm)) == (ONE, mint_estimate(10**18)[0])
+    no_mint = lambda amount: (0, 0)
+    assert best_mint_fraction(10**18, independent_legs(no_mint, swap_estimate)) == (0, swap_estimate(10**18))
+    assert best_mint_fraction(0, estimate_split) == (0, 0)
+
+
+def test_split_pregen_info_guesses_each_leg():
+    asset_amount = 50 * 10**18
+    pg = split_pregen_info(asset_amount, estimate_split)
+    mint_amount = asset_amount * pg.mint_fraction // ONE
+    assert pg.assumed_asset_amount == asset_amount
+    assert (pg.mint_returns, pg.approx_params_swapExactYtForPt.guessOffchain) == mint_estimate(mint_amount)
+    assert pg.spot_returns == pg.approx_params_swapExactTokenForPt.guessOffchain == swap_estimate(asset_amount - mint_amount)
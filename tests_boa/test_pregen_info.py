@@ -0,0 +1,148 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+from deployment.pregen_info import pack_pregen_info
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+    return erc
+
+@pytest.fixture
+def erc20(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "ERC20", "Coin", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def wrapped(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "Wrapped", "WRP", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(False)
+    return f
+
+@pytest.fixture
+def adapter_a(deployer, dai, erc20):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/adapters/MockLPPregenAdapter.vy", dai, erc20, b"")
+    return a
+
+@pytest.fixture
+def adapter_b(deployer, dai, wrapped):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/adapters/MockLPPregenAdapter.vy", dai, wrapped, b"adapter b pregen")
+    return a
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapter_a, adapter_b):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        v.add_adapter(adapter_a)
+        v.add_adapter(adapter_b)
+
+    # Adapters need to approve the vault for ERC20 transfers.
+    for a in [adapter_a, adapter_b]:
+        with boa.env.prank(a.address):
+            dai.approve(v.address, 10*10**18)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (adapter_a.address, 1)
+    strategy[1] = (adapter_b.address, 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    return v
+
+
+def test_pack_pregen_info():
+    assert pack_pregen_info({}) == b""
+    assert pack_pregen_info({1: b"ab", 0: b""}) == b"\x00\x00\x00" + b"\x01\x00\x02ab"
+    with pytest.raises(AssertionError):
+        pack_pregen_info({5: b""})
+
+
+def test_pregen_info_only_for_touched_adapters(vault, trader, dai, adapter_a, adapter_b):
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+
+        # adapter_b insists on its pregen_info so leaving it out fails.
+        with boa.reverts():
+            vault.deposit(10000, trader)
+
+        # Sending it to the wrong adapter fails as well.
+        with boa.reverts():
+            vault.deposit(10000, trader, 0, pack_pregen_info({0: b"adapter b pregen"}))
+
+        # Only adapter_b needs an entry, adapter_a gets empty pregen_info.
+        vault.deposit(10000, trader, 0, pack_pregen_info({1: b"adapter b pregen"}))
+
+    assert dai.balanceOf(adapter_a) == 5000
+    assert dai.balanceOf(adapter_b) == 5000
+
+    with boa.env.prank(trader):
+        vault.withdraw(8000, trader, trader, 0, pack_pregen_info({0: b"", 1: b"adapter b pregen"}))
+
+    assert vault.totalAssets() == 2000
+
+
+def test_malformed_pregen_info(vault, trader, dai):
+    entry = pack_pregen_info({1: b"adapter b pregen"})
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+
+        # Only two adapters.
+        with boa.reverts("pregen_info adapter index out of range."):
+            vault.deposit(10000, trader, 0, entry + pack_pregen_info({2: b""}))
+        # Out of order or repeated.
+        with boa.reverts("pregen_info adapter index out of range."):
+            vault.deposit(10000, trader, 0, entry + pack_pregen_info({0: b""}))
+        with boa.reverts("pregen_info adapter index out of range."):
+            vault.deposit(10000, trader, 0, entry + entry)
+        # The length runs past the end, or the next header is cut short.
+        with boa.reverts("pregen_info entry overruns the buffer."):
+            vault.deposit(10000, trader, 0, entry[:-1])
+        with boa.reverts("pregen_info entry overruns the buffer."):
+            vault.deposit(10000, trader, 0, b"\x00\x00" + entry)
+        with boa.reverts("pregen_info entry overruns the buffer."):
+            vault.deposit(10000, trader, 0, entry + b"\x02")
+
+        vault.deposit(10000, trader, 0, entry)
+    assert vault.totalAssets() == 10000
@@ -0,0 +1,125 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory
+from decimal import Decimal
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(True)
+    return f
+
+@pytest.fixture
+def adapters(deployer, dai):
+    result = []
+    for name in ["A", "B", "C"]:
+        with boa.env.prank(deployer):
+            wrapped = boa.load("contracts/test_helpers/ERC20.vy", name, name, 18, 0, deployer)
+            result.append(boa.load("contracts/adapters/MockLPAdapter.vy", dai, wrapped))
+    return result
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapters):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        for adapter in adapters:
+            v.add_adapter(adapter)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    for pos, adapter in enumerate(adapters):
+        # Adapters need to approve the vault for ERC20 transfers.
+        with boa.env.prank(adapter.address):
+            dai.approve(v.address, 10*10**18)
+        strategy[pos] = (adapter.address, pos + 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    return v
+
+
+def test_each_deposit_fills_most_underweight_adapter(vault, trader, deployer, gov, dai, adapters):
+    a, b, c = adapters
+
+    with boa.env.prank(trader):
+        dai.approve(vault.address, 100000)
+
+        # Empty vault: every adapter is short, each gets exactly its deficit.
+        vault.deposit(6000, trader)
+        assert [dai.balanceOf(x) for x in adapters] == [1000, 2000, 3000]
+
+    # Flip the strategy, c (now ratio 1) is left over its target.
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    for pos, adapter in enumerate(adapters):
+        strategy[pos] = (adapter.address, 3 - pos)
+    with boa.env.prank(gov.address):
+        vault.set_strategy(deployer, strategy, 0)
+
+    with boa.env.prank(trader):
+        # Targets are 3600/2400/1200, a is furthest behind and takes the whole deposit.
+        vault.deposit(1200, trader)
+        assert [dai.balanceOf(x) for x in adapters] == [2200, 2000, 3000]
+
+        # Targets are 5100/3400/1700: a only takes its deficit, the rest goes to b.
+        vault.deposit(3000, trader)
+        assert [dai.balanceOf(x) for x in adapters] == [5100, 2100, 3000]
+
+        # Withdraws are unaffected, they come out of the adapter furthest above its target.
+        vault.withdraw(2000, trader, trader)
+        assert [dai.balanceOf(x) for x in adapters] == [5100, 2100, 1000]
+
+    assert dai.balanceOf(vault) == 0
+    assert vault.totalAssets() == 8200
+
+
+def test_routed_cash_beyond_deficits_stays_in_vault(funds_alloc, adapters):
+    a, b, c = adapters
+    # a is over its target, b and c can only take part of their deficits.
+    states = [
+        (a.address, 2500, 2500, 10**18, -2500, 1, 0, 0),
+        (b.address, 0, 0, 200, 0, 1, 0, 0),
+        (c.address, 500, 500, 10**18, -500, 1, 0, 0),
+    ]
+    states += [(ZERO_ADDRESS, 0, 0, 0, 0, 0, 0, 0)] * (MAX_ADAPTERS - len(states))
+    # Targets are 1500 each: b is short 1500 but takes 200, c takes its 1000 deficit and the
+    # remaining 300 of the vault's 1500 stay where they are.
+    d4626_delta, tx_count, txs, blocked = funds_alloc.getTargetBalances(1500, 0, 4500, 3, states, 0)
+    assert tx_count == 2
+    assert [(tx[0], tx[7]) for tx in txs[:2]] == [(b.address, 200), (c.address, 1000)]
+    assert d4626_delta == -1200
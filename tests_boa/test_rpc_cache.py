@@ -0,0 +1,34 @@
+import pytest
+
+from tests_boa import conftest
+from tests_boa.conftest import DiskCachedRPC
+
+
+@pytest.fixture
+def offline_rpc(tmp_path, monkeypatch):
+    monkeypatch.delenv("WEB3_ALCHEMY_API_KEY", raising=False)
+    monkeypatch.setattr(conftest, "RPC_CACHE_DIR", str(tmp_path))
+    return DiskCachedRPC("mainnet", 19850000)
+
+
+def test_cache_is_keyed_by_chain_and_block(offline_rpc, tmp_path):
+    assert offline_rpc.identifier == "mainnet@19850000"
+    assert (tmp_path / "mainnet-19850000.sqlite").exists()
+
+
+def test_offline_serves_cached_answers(offline_rpc):
+    offline_rpc._put('["eth_chainId", []]', "0x1")
+    offline_rpc._put('["eth_getCode", ["0x00", "0x12eee90"]]', "0x")
+    assert offline_rpc.fetch("eth_chainId", []) == "0x1"
+    assert offline_rpc.fetch_multi([("eth_getCode", ["0x00", "0x12eee90"]), ("eth_chainId", [])]) == ["0x", "0x1"]
+
+    #Survives a new process (connection)
+    assert DiskCachedRPC("mainnet", 19850000).fetch("eth_chainId", []) == "0x1"
+    #but not another block
+    with pytest.raises(AssertionError, match="not in the RPC cache"):
+        DiskCachedRPC("mainnet", 19850001).fetch("eth_chainId", [])
+
+
+def test_offline_miss(offline_rpc):
+    with pytest.raises(AssertionError, match="WEB3_ALCHEMY_API_KEY"):
+        offline_rpc.fetch_multi([("eth_getBalance", ["0x00", "0x12eee90"])])
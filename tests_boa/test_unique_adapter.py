@@ -2,6 +2,7 @@ from tests_boa.conftest import forked_env_mainnet
 import os
 import pytest
 import boa
+from deployment.artifacts import vault_factory, pendle_adapter_factory, funds_allocator_factory
 import json
 from boa.environment import Env
 from web3 import Web3
@@ -33,18 +34,17 @@ def deployer(setup_chain):
 @pytest.fixture
 def funds_alloc(setup_chain, deployer):
     with boa.env.prank(deployer):
-        f = boa.load("contracts/FundsAllocator.vy")
+        f = funds_allocator_factory().deploy(False)
     return f
 
 def _pendle_adapter(deployer, asset, _pendle_market):
     with boa.env.prank(deployer):
-        pa = boa.load("contracts/adapters/PendleAdapter.vy", asset, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, _pendle_market, PENDLE_ORACLE)
+        pa = pendle_adapter_factory().deploy(asset, PENDLE_ROUTER, PENDLE_ROUTER_STATIC, _pendle_market, PENDLE_ORACLE, ZERO_ADDRESS)
     return pa
 
 def _adaptervault(deployer, asset, funds_alloc):
     with boa.env.prank(deployer):
-        v = boa.load(
-            "contracts/AdapterVault.vy",
+        v = vault_factory().deploy(
             "ena-Pendle",
             "pena",
             18,
@@ -0,0 +1,49 @@
+import pytest
+import boa
+from deployment.artifacts import funds_allocator_factory
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from FundsAllocator.vy
+MAX_INT256 = 2**255 - 1
+
+A, B, C = ["0x%040x" % (i + 1) for i in range(3)]
+
+@pytest.fixture
+def funds_alloc():
+    return funds_allocator_factory().deploy(False)
+
+
+def balance_adapter(adapter, current, ratio, max_deposit=MAX_INT256):
+    return (adapter, current, current, max_deposit, -current, ratio, 0, 0)
+
+
+def planned_withdraws(funds_alloc, vault_balance, target, adapters):
+    adapters = adapters + [(ZERO_ADDRESS, 0, 0, 0, 0, 0, 0, 0)] * (MAX_ADAPTERS - len(adapters))
+    total_assets = vault_balance + sum(a[1] for a in adapters)
+    total_ratios = sum(a[5] for a in adapters)
+    d4626_delta, tx_count, txs, blocked = funds_alloc.getTargetBalances(vault_balance, target, total_assets, total_ratios, adapters, 0, True)
+    return [(tx[0], tx[7]) for tx in txs[:tx_count]]
+
+
+def test_idle_cash_first(funds_alloc):
+    adapters = [balance_adapter(A, 1000, 1), balance_adapter(B, 1000, 1)]
+    assert planned_withdraws(funds_alloc, 500, 500, adapters) == []
+
+
+def test_most_over_target_first(funds_alloc):
+    # c has left the strategy, so it is furthest over its (zero) target and gets emptied.
+    adapters = [balance_adapter(A, 500, 1), balance_adapter(B, 300, 1), balance_adapter(C, 1000, 0)]
+    assert planned_withdraws(funds_alloc, 0, 400, adapters) == [(C, -1000)]
+
+    adapters = [balance_adapter(A, 500, 1), balance_adapter(B, 900, 1)]
+    assert planned_withdraws(funds_alloc, 100, 700, adapters) == [(B, -600)]
+
+    # Drains the most over target adapter before moving on to the next one.
+    assert planned_withdraws(funds_alloc, 0, 1100, adapters) == [(B, -900), (A, -200)]
+
+
+def test_matured_adapters_first(funds_alloc):
+    # b no longer takes deposits (a matured Pendle market) so it is cheapest to withdraw from,
+    # even though a is further over its target.
+    adapters = [balance_adapter(A, 2000, 1), balance_adapter(B, 500, 1, 0), balance_adapter(C, 500, 1)]
+    assert planned_withdraws(funds_alloc, 0, 800, adapters) == [(B, -500), (A, -300)]
@@ -0,0 +1,185 @@
+import pytest
+import boa
+from deployment.artifacts import vault_factory, governance_factory, funds_allocator_factory, withdrawal_queue_factory
+from decimal import Decimal
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_ADAPTERS = 5 # Must match the value from AdapterVault.vy
+
+@pytest.fixture
+def deployer():
+    acc = boa.env.generate_address(alias="deployer")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def trader():
+    acc = boa.env.generate_address(alias="trader")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def whale():
+    acc = boa.env.generate_address(alias="whale")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def keeper():
+    acc = boa.env.generate_address(alias="keeper")
+    boa.env.set_balance(acc, 1000*10**18)
+    return acc
+
+@pytest.fixture
+def dai(deployer, trader, whale):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "DAI Token", "DAI", 18, 1000*10**18, deployer)
+        erc.mint(trader, 100000)
+        erc.mint(whale, 100000)
+    return erc
+
+@pytest.fixture
+def erc20(deployer):
+    with boa.env.prank(deployer):
+        erc = boa.load("contracts/test_helpers/ERC20.vy", "ERC20", "Coin", 18, 1000*10**18, deployer)
+    return erc
+
+@pytest.fixture
+def gov(deployer):
+    with boa.env.prank(deployer):
+        g = governance_factory().deploy(deployer, 21600)
+    return g
+
+@pytest.fixture
+def funds_alloc(deployer):
+    with boa.env.prank(deployer):
+        f = funds_allocator_factory().deploy(False)
+    return f
+
+@pytest.fixture
+def adapter(deployer, dai, erc20):
+    with boa.env.prank(deployer):
+        a = boa.load("contracts/adapters/MockLPAdapter.vy", dai, erc20)
+    return a
+
+@pytest.fixture
+def vault(deployer, dai, funds_alloc, gov, adapter):
+    with boa.env.prank(deployer):
+        v = vault_factory().deploy(
+            "TestVault",
+            "vault",
+            18,
+            dai,
+            gov,
+            funds_alloc,
+            Decimal(2.0)
+        )
+        v.add_adapter(adapter)
+
+    # Adapters need to approve the vault for ERC20 transfers.
+    with boa.env.prank(adapter.address):
+        dai.approve(v.address, 10*10**18)
+
+    strategy = [(ZERO_ADDRESS,0)] * MAX_ADAPTERS
+    strategy[0] = (adapter.address, 1)
+
+    with boa.env.prank(gov.address):
+        v.set_strategy(deployer, strategy, 0)
+
+    return v
+
+
+@pytest.fixture
+def queue(deployer, vault, keeper):
+    with boa.env.prank(deployer):
+        q = withdrawal_queue_factory().deploy(vault, keeper)
+    return q
+
+
+def _deposit(vault, dai, who, amount):
+    with boa.env.prank(who):
+        dai.approve(vault.address, amount)
+        vault.deposit(amount, who)
+
+
+def _request(vault, queue, who, shares):
+    with boa.env.prank(who):
+        vault.approve(queue.address, shares)
+        return queue.requestWithdraw(shares)
+
+
+def test_queue_settles_epoch_in_one_redeem(vault, queue, trader, whale, keeper, dai, adapter):
+    assert queue.vault() == vault.address
+    assert queue.asset() == dai.address
+
+    _deposit(vault, dai, trader, 10000)
+    _deposit(vault, dai, whale, 30000)
+
+    assert _request(vault, queue, trader, 4000) == 0
+    assert _request(vault, queue, whale, 30000) == 0
+
+    # Shares are locked in the queue until settlement.
+    assert vault.balanceOf(trader) == 6000
+    assert vault.balanceOf(whale) == 0
+    assert vault.balanceOf(queue) == 34000
+    assert queue.epochs(0) == (34000, 0)
+    assert queue.claimable(trader, 0) == 0
+
+    with boa.env.prank(trader):
+        with boa.reverts("Epoch not settled yet."):
+            queue.claim(0, trader)
+        with boa.reverts("Only owner or keeper can settle."):
+            queue.settle()
+
+    with boa.env.prank(keeper):
+        assert queue.settle(34000) == 34000
+
+    assert queue.current_epoch() == 1
+    assert queue.epochs(0) == (34000, 34000)
+    assert vault.balanceOf(queue) == 0
+    assert vault.totalAssets() == 6000
+    assert dai.balanceOf(adapter) == 6000
+
+    assert queue.claimable(trader, 0) == 4000
+    assert queue.claimable(whale, 0) == 30000
+
+    with boa.env.prank(whale):
+        assert queue.claim(0, whale) == 30000
+        with boa.reverts("Nothing to claim."):
+            queue.claim(0, whale)
+
+    with boa.env.prank(trader):
+        assert queue.claim(0, trader) == 4000
+
+    assert dai.balanceOf(whale) == 100000
+    assert dai.balanceOf(trader) == 94000
+    assert dai.balanceOf(queue) == 0
+
+    # The next epoch starts out empty.
+    with boa.env.prank(keeper):
+        with boa.reverts("Nothing to settle."):
+            queue.settle()
+
+
+def test_queue_cancel_before_settlement(vault, queue, deployer, trader, dai):
+    _deposit(vault, dai, trader, 10000)
+    _request(vault, queue, trader, 5000)
+
+    with boa.env.prank(trader):
+        with boa.reverts("Not enough shares requested."):
+            queue.cancelWithdraw(6000)
+        assert queue.cancelWithdraw(2000) == 3000
+
+    assert vault.balanceOf(trader) == 7000
+    assert queue.requests(trader, 0) == 3000
+    assert queue.epochs(0) == (3000, 0)
+
+    # Owner may settle as well as the keeper.
+    with boa.env.prank(deployer):
+        assert queue.settle() == 3000
+
+    with boa.env.prank(trader):
+        assert queue.claim(0, trader) == 3000
+        # Nothing to cancel in the new epoch.
+        with boa.reverts("Not enough shares requested."):
+            queue.cancelWithdraw(1)